@@ -1,27 +1,44 @@
 """Breadth-First Search pathfinding generator for grid.
-Yields expansions as sets of visited coordinates and current frontier.
+Yields each expansion with the cells it visited and queued; parents are kept
+in a flat array, and the goal frame highlights the reconstructed path.
 """
-from typing import List, Tuple, Generator, Dict
+from typing import List, Tuple, Generator, Optional
 from collections import deque
 
+from utils.frame import GridFrame, GOAL, NOT_FOUND, START, VISIT
+from utils.pathfinding import flatten, neighbors, new_parents, reconstruct_path, NO_PARENT
 
-def bfs_pathfinding(grid: List[List[int]], start: Tuple[int, int], goal: Tuple[int, int]) -> Generator[Dict, None, None]:
-    rows = len(grid)
-    cols = len(grid[0]) if rows else 0
-    visited = set()
-    q = deque()
-    q.append((start, [start]))
-    visited.add(start)
-    yield {"state": grid, "highlight": [start], "info": "start"}
+ALGORITHM = {
+    "name": "BFS Pathfinding",
+    "entry": "bfs_pathfinding",
+    "category": "pathfinding",
+    "input": "grid",
+    "complexity": "O(V + E)",
+}
+
+
+def bfs_pathfinding(grid: List[List[int]], start: Tuple[int, int], goal: Tuple[int, int]) -> Generator[GridFrame, None, Optional[List[Tuple[int, int]]]]:
+    rows, cols, cells = flatten(grid)
+    s = start[0] * cols + start[1]
+    g = goal[0] * cols + goal[1]
+    parents = new_parents(rows * cols)
+    parents[s] = s
+    q = deque([s])
+    yield GridFrame(grid, [start], START, queued=[start])
     while q:
-        (r, c), path = q.popleft()
-        yield {"state": grid, "highlight": path, "info": f"visit {r},{c}"}
-        if (r, c) == goal:
-            yield {"state": grid, "highlight": path, "info": "goal"}
-            return
-        for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
-            nr, nc = r+dr, c+dc
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == 0 and (nr, nc) not in visited:
-                visited.add((nr, nc))
-                q.append(((nr, nc), path+[(nr, nc)]))
-    yield {"state": grid, "highlight": [], "info": "not found"}
+        idx = q.popleft()
+        cell = divmod(idx, cols)
+        if idx == g:
+            yield GridFrame(grid, [cell], VISIT, cell, visited=[cell])
+            path = reconstruct_path(parents, cols, g)
+            yield GridFrame(grid, path, GOAL)
+            return path
+        queued = []
+        for nb in neighbors(idx, rows, cols):
+            if cells[nb] == 0 and parents[nb] == NO_PARENT:
+                parents[nb] = idx
+                q.append(nb)
+                queued.append(divmod(nb, cols))
+        yield GridFrame(grid, [cell], VISIT, cell, visited=[cell], queued=queued)
+    yield GridFrame(grid, [], NOT_FOUND)
+    return None
@@ -1,26 +1,133 @@
 """Binary Search (generator)
 
-Yields search range updates.
+Yields search range updates. ``batch_binary_search`` answers many targets at
+once with NumPy and reports how the probes were spread instead of frames.
 """
-from typing import List, Generator, Dict, Optional
+from typing import Dict, List, Generator, Optional, Sequence
 
+import numpy as np
 
-def binary_search(arr: List[int], target: int) -> Generator[Dict, None, Optional[int]]:
-    a = arr
+from utils.frame import Frame, FrameGate, CHECK, FOUND, MOVE_LEFT, MOVE_RIGHT, NOT_FOUND, START
+
+ALGORITHM = {
+    "name": "Binary Search",
+    "entry": "binary_search",
+    "category": "search",
+    "input": "sorted array + target",
+    "complexity": "O(log n)",
+}
+
+
+def binary_search(arr: List[int], target: int, granularity="all") -> Generator[Frame, None, Optional[int]]:
+    """Binary search frames. With ``granularity="passes"`` each probe is one
+    frame showing the narrowed range; ``"mutations"`` keeps only start and end.
+
+    The array never changes, so it is copied once and every frame shares
+    that one list; consumers must not modify ``frame.state``.
+    """
+    a = list(arr)
     lo = 0
     hi = len(a) - 1
-    yield {"state": a.copy(), "highlight": (lo, hi), "info": "start"}
+    gate = FrameGate(granularity)
+    yield gate.frame(a, (lo, hi), START)
     while lo <= hi:
         mid = (lo + hi) // 2
-        yield {"state": a.copy(), "highlight": (mid,), "info": f"check {mid}"}
+        if gate.step():
+            yield gate.frame(a, (mid,), CHECK, (mid, mid))
         if a[mid] == target:
-            yield {"state": a.copy(), "highlight": (mid,), "info": "found"}
+            yield gate.frame(a, (mid,), FOUND)
             return mid
         elif a[mid] < target:
             lo = mid + 1
-            yield {"state": a.copy(), "highlight": (lo, hi), "info": "move right"}
+            if gate.step() or gate.pass_end():
+                yield gate.frame(a, (lo, hi), MOVE_RIGHT)
         else:
             hi = mid - 1
-            yield {"state": a.copy(), "highlight": (lo, hi), "info": "move left"}
-    yield {"state": a.copy(), "highlight": (), "info": "not found"}
+            if gate.step() or gate.pass_end():
+                yield gate.frame(a, (lo, hi), MOVE_LEFT)
+    yield gate.frame(a, (), NOT_FOUND)
     return None
+
+
+class BatchSearchResult:
+    """Per-query outcome of :func:`batch_binary_search`, in target order.
+
+    ``index`` is the leftmost position of each target (-1 when absent),
+    ``probes`` how many elements the one-target search would have checked,
+    and ``heat[i]`` how many of all those checks landed on index ``i``.
+    """
+
+    def __init__(self, targets: np.ndarray, index: np.ndarray, probes: np.ndarray, heat: np.ndarray):
+        self.targets = targets
+        self.index = index
+        self.probes = probes
+        self.heat = heat
+
+    @property
+    def found(self) -> np.ndarray:
+        return self.index >= 0
+
+    def depth_counts(self) -> np.ndarray:
+        """``depth_counts()[d]`` is the number of queries that took ``d`` probes."""
+        return np.bincount(self.probes, minlength=1)
+
+    def summary(self) -> Dict[str, float]:
+        queries = len(self.probes)
+        return {
+            "queries": queries,
+            "found": int(self.found.sum()),
+            "mean_probes": float(self.probes.mean()) if queries else 0.0,
+            "max_probes": int(self.probes.max()) if queries else 0,
+            "total_probes": int(self.probes.sum()),
+        }
+
+
+def batch_binary_search(arr: Sequence[int], targets: Sequence[int]) -> BatchSearchResult:
+    """Search a sorted ``arr`` for every value in ``targets`` at once.
+
+    ``np.searchsorted`` places each target between its ``left`` and
+    ``right`` insertion points, which decide every comparison of its search:
+    ``a[mid] < t`` exactly when ``mid < left`` and ``a[mid] > t`` exactly
+    when ``mid >= right``. The probe paths of :func:`binary_search` are then
+    replayed on those integer bounds, all queries in lockstep and each
+    distinct ``(left, right)`` pair once, so probe counts and the heatmap
+    match the one-target search without touching the array again.
+    """
+    a = np.asarray(arr)
+    t = np.asarray(targets)
+    n = len(a)
+    left = np.searchsorted(a, t, side="left")
+    right = np.searchsorted(a, t, side="right")
+    index = np.where(left < right, left, -1)
+
+    # Targets with the same bounds (repeats, or misses in the same gap) share a path
+    keys, inverse, weight = np.unique(left.astype(np.int64) * (n + 1) + right,
+                                      return_inverse=True, return_counts=True)
+    lo_bound, hi_bound = keys // (n + 1), keys % (n + 1)
+    path_probes = np.zeros(len(keys), dtype=np.int64)
+    probed, probed_weight = [], []
+
+    ids = np.arange(len(keys))
+    lo = np.zeros(len(keys), dtype=np.int64)
+    hi = np.full(len(keys), n - 1, dtype=np.int64)
+    while ids.size:
+        live = lo <= hi
+        ids, lo, hi = ids[live], lo[live], hi[live]
+        if not ids.size:
+            break
+        mid = (lo + hi) // 2
+        path_probes[ids] += 1
+        probed.append(mid)
+        probed_weight.append(weight[ids])
+        go_right = mid < lo_bound[ids]
+        go_left = mid >= hi_bound[ids]
+        lo = np.where(go_right, mid + 1, lo)
+        hi = np.where(go_left, mid - 1, hi)
+        # Queries whose probe hit an equal element are done
+        keep = go_right | go_left
+        ids, lo, hi = ids[keep], lo[keep], hi[keep]
+
+    # One bincount over every probe instead of an n-sized pass per level
+    heat = np.bincount(np.concatenate(probed), weights=np.concatenate(probed_weight),
+                       minlength=n) if probed else np.zeros(n)
+    return BatchSearchResult(t, index, path_probes[inverse.ravel()], heat.astype(np.int64))
@@ -1,21 +1,63 @@
 """Bubble Sort (generator)
 
-Yields dicts with:
+Yields :class:`~utils.frame.Frame` objects with:
 - state: list of numbers
 - highlight: tuple of indices being compared or swapped
-- info: short string
+- info: short string, formatted from the frame code when read
+- op: the operation this frame performed, for delta-encoded traces
+
+``granularity`` picks which steps become frames: ``"all"``, ``"mutations"``
+(swaps only), ``"passes"`` (one frame per outer pass) or an int k (every
+k-th step). Start and done frames are always kept.
 """
+from time import perf_counter
 from typing import List, Generator, Dict
 
+from utils.frame import Frame, FrameGate, COMPARE, DONE, PASS, START, SWAP
+
+ALGORITHM = {
+    "name": "Bubble Sort",
+    "entry": "bubble_sort",
+    "category": "sorting",
+    "input": "array",
+    "complexity": "O(n^2)",
+    "stats": "bubble_sort_stats",
+}
+
 
-def bubble_sort(arr: List[int]) -> Generator[Dict, None, None]:
+def bubble_sort(arr: List[int], granularity="all") -> Generator[Frame, None, None]:
     a = arr.copy()
     n = len(a)
-    yield {"state": a.copy(), "highlight": (), "info": "start"}
+    gate = FrameGate(granularity)
+    yield gate.frame(a.copy(), (), START)
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            if gate.step():
+                pair = (j, j + 1)
+                yield gate.frame(a.copy(), pair, COMPARE, pair)
+            if a[j] > a[j + 1]:
+                a[j], a[j + 1] = a[j + 1], a[j]
+                if gate.step(mutating=True):
+                    pair = (j, j + 1)
+                    yield gate.frame(a.copy(), pair, SWAP, pair)
+        if gate.pass_end():
+            # Pass i bubbles the largest remaining value into place
+            yield gate.frame(a.copy(), (n - i - 1,), PASS, (i,))
+    yield gate.frame(a.copy(), (), DONE)
+
+
+def bubble_sort_stats(arr: List[int]) -> Dict[str, float]:
+    """Run bubble sort without frames; same counts as ``count_ops`` on its trace."""
+    a = list(arr)
+    n = len(a)
+    swaps = 0
+    start = perf_counter()
     for i in range(n):
         for j in range(0, n - i - 1):
-            yield {"state": a.copy(), "highlight": (j, j + 1), "info": f"compare {j} and {j+1}"}
             if a[j] > a[j + 1]:
                 a[j], a[j + 1] = a[j + 1], a[j]
-                yield {"state": a.copy(), "highlight": (j, j + 1), "info": f"swapped {j} & {j+1}"}
-    yield {"state": a.copy(), "highlight": (), "info": "done"}
+                swaps += 1
+    seconds = perf_counter() - start
+    comparisons = n * (n - 1) // 2
+    return {"comparisons": comparisons, "swaps": swaps, "writes": 0,
+            "frames": 2 + comparisons + swaps, "seconds": seconds}
@@ -0,0 +1,21 @@
+"""Dijkstra pathfinding generator for weighted grids.
+Same frame protocol as ``bfs_pathfinding``; ``weights`` gives the cost of
+entering each cell (default 1). Uses ``heapq`` with a flat parent array.
+"""
+from typing import List, Tuple, Generator, Optional
+
+from utils.frame import GridFrame
+from utils.pathfinding import weighted_search
+
+ALGORITHM = {
+    "name": "Dijkstra Pathfinding",
+    "entry": "dijkstra_pathfinding",
+    "category": "pathfinding",
+    "input": "weighted grid",
+    "complexity": "O((V + E) log V)",
+}
+
+
+def dijkstra_pathfinding(grid: List[List[int]], start: Tuple[int, int], goal: Tuple[int, int],
+                         weights=None) -> Generator[GridFrame, None, Optional[List[Tuple[int, int]]]]:
+    return (yield from weighted_search(grid, start, goal, weights))
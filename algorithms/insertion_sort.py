@@ -1,19 +1,64 @@
 """Insertion Sort (generator)
 """
+from time import perf_counter
 from typing import List, Generator, Dict
 
+from utils.frame import Frame, FrameGate, COMPARE_KEY, DONE, PASS, PLACE, SHIFT, START, TAKE
 
-def insertion_sort(arr: List[int]) -> Generator[Dict, None, None]:
+ALGORITHM = {
+    "name": "Insertion Sort",
+    "entry": "insertion_sort",
+    "category": "sorting",
+    "input": "array",
+    "complexity": "O(n^2)",
+    "stats": "insertion_sort_stats",
+}
+
+
+def insertion_sort(arr: List[int], granularity="all") -> Generator[Frame, None, None]:
+    """Insertion sort frames; ``granularity`` as for ``bubble_sort``."""
     a = arr.copy()
-    yield {"state": a.copy(), "highlight": (), "info": "start"}
+    gate = FrameGate(granularity)
+    yield gate.frame(a.copy(), (), START)
+    for i in range(1, len(a)):
+        key = a[i]
+        j = i - 1
+        if gate.step():
+            yield gate.frame(a.copy(), (i,), TAKE, (i,))
+        while j >= 0:
+            if gate.step():
+                yield gate.frame(a.copy(), (j,), COMPARE_KEY, (j, j + 1, key))
+            if a[j] <= key:
+                break
+            a[j + 1] = a[j]
+            j -= 1
+            if gate.step(mutating=True):
+                yield gate.frame(a.copy(), (j + 1,), SHIFT, (j + 2, a[j + 1]))
+        a[j + 1] = key
+        if gate.step(mutating=True):
+            yield gate.frame(a.copy(), (j + 1,), PLACE, (j + 1, key))
+        if gate.pass_end():
+            yield gate.frame(a.copy(), (j + 1,), PASS, (i,))
+    yield gate.frame(a.copy(), (), DONE)
+
+
+def insertion_sort_stats(arr: List[int]) -> Dict[str, float]:
+    """Run insertion sort without frames; same counts as ``count_ops`` on its trace."""
+    a = list(arr)
+    comparisons = writes = 0
+    start = perf_counter()
     for i in range(1, len(a)):
         key = a[i]
         j = i - 1
-        yield {"state": a.copy(), "highlight": (i,), "info": f"take {i}"}
-        while j >= 0 and a[j] > key:
+        while j >= 0:
+            comparisons += 1
+            if a[j] <= key:
+                break
             a[j + 1] = a[j]
             j -= 1
-            yield {"state": a.copy(), "highlight": (j + 1,), "info": "shift"}
         a[j + 1] = key
-        yield {"state": a.copy(), "highlight": (j + 1,), "info": f"placed at {j+1}"}
-    yield {"state": a.copy(), "highlight": (), "info": "done"}
+        writes += i - j
+    seconds = perf_counter() - start
+    takes = max(len(a) - 1, 0)
+    return {"comparisons": comparisons, "swaps": 0, "writes": writes,
+            "frames": 2 + takes + comparisons + writes, "seconds": seconds}
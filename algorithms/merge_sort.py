@@ -1,30 +1,57 @@
 """Merge Sort (generator)
 """
-from typing import List, Generator, Dict
+from time import perf_counter
+from typing import List, Generator, Dict, Optional
 
+from utils.frame import Frame, FrameGate, COMPARE, INSERT, MERGED
 
-def merge_sort(arr: List[int]) -> Generator[Dict, None, None]:
-    a = arr.copy()
-    yield from _merge_sort(a, 0, len(a) - 1)
+ALGORITHM = {
+    "name": "Merge Sort",
+    "entry": "merge_sort",
+    "category": "sorting",
+    "input": "array",
+    "complexity": "O(n log n)",
+    "stats": "merge_sort_stats",
+}
 
 
-def _merge_sort(a: List[int], left: int, right: int) -> Generator[Dict, None, None]:
-    if left >= right:
-        return
+def merge_sort(arr: List[int], granularity="all") -> Generator[Frame, None, None]:
+    """Merge sort frames; ``granularity`` as for ``bubble_sort``, where each
+    completed merge is a pass."""
+    a = arr.copy()
+    gate = FrameGate(granularity)
+    # Explicit stack instead of recursion: frames pass through at most one
+    # nested generator (_merge) whatever the input size.
+    # Entries are (left, right, children_sorted).
+    stack = [(0, len(a) - 1, False)]
+    while stack:
+        left, right, children_sorted = stack.pop()
+        if left >= right:
+            continue
 
-    mid = (left + right) // 2
-    yield from _merge_sort(a, left, mid)
-    yield from _merge_sort(a, mid + 1, right)
-    yield from _merge(a, left, mid, right)
-    yield {"state": a.copy(), "highlight": (), "info": f"merged {left}-{right}"}
+        mid = (left + right) // 2
+        if not children_sorted:
+            # Revisit this range after both halves; left half is popped first
+            stack.append((left, right, True))
+            stack.append((mid + 1, right, False))
+            stack.append((left, mid, False))
+            continue
+        yield from _merge(a, left, mid, right, gate)
+        # The last merge always shows, so coarse runs still end sorted
+        if gate.step() or gate.pass_end() or not stack:
+            yield gate.frame(a.copy(), (), MERGED, (left, right))
 
 
-def _merge(a: List[int], left: int, mid: int, right: int) -> Generator[Dict, None, None]:
+def _merge(a: List[int], left: int, mid: int, right: int,
+           gate: Optional[FrameGate] = None) -> Generator[Frame, None, None]:
+    gate = gate or FrameGate()
     merged = []
     i, j = left, mid + 1
 
     while i <= mid and j <= right:
-        yield {"state": a.copy(), "highlight": (i, j), "info": f"compare {i} and {j}"}
+        if gate.step():
+            pair = (i, j)
+            yield gate.frame(a.copy(), pair, COMPARE, pair)
         if a[i] <= a[j]:
             merged.append(a[i])
             i += 1
@@ -42,4 +69,42 @@ def _merge(a: List[int], left: int, mid: int, right: int) -> Generator[Dict, Non
 
     for idx, val in enumerate(merged):
         a[left + idx] = val
-        yield {"state": a.copy(), "highlight": (left + idx,), "info": f"inserted {val} at {left + idx}"}
+        if gate.step(mutating=True):
+            yield gate.frame(a.copy(), (left + idx,), INSERT, (left + idx, val))
+
+
+def merge_sort_stats(arr: List[int]) -> Dict[str, float]:
+    """Run merge sort without frames; same counts as ``count_ops`` on its trace."""
+    a = list(arr)
+    counts = [0, 0, 0]  # comparisons, writes, merges
+    start = perf_counter()
+    _merge_sort_count(a, 0, len(a) - 1, counts)
+    seconds = perf_counter() - start
+    comparisons, writes, merges = counts
+    return {"comparisons": comparisons, "swaps": 0, "writes": writes,
+            "frames": comparisons + writes + merges, "seconds": seconds}
+
+
+def _merge_sort_count(a: List[int], left: int, right: int, counts: List[int]) -> None:
+    if left >= right:
+        return
+    mid = (left + right) // 2
+    _merge_sort_count(a, left, mid, counts)
+    _merge_sort_count(a, mid + 1, right, counts)
+    merged = []
+    i, j = left, mid + 1
+    comparisons = 0
+    while i <= mid and j <= right:
+        comparisons += 1
+        if a[i] <= a[j]:
+            merged.append(a[i])
+            i += 1
+        else:
+            merged.append(a[j])
+            j += 1
+    merged.extend(a[i:mid + 1])
+    merged.extend(a[j:right + 1])
+    a[left:right + 1] = merged
+    counts[0] += comparisons
+    counts[1] += len(merged)
+    counts[2] += 1
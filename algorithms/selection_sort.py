@@ -1,20 +1,63 @@
 """Selection Sort (generator)
 """
+from time import perf_counter
 from typing import List, Generator, Dict
 
+from utils.frame import Frame, FrameGate, COMPARE, DONE, NEW_MIN, PASS, START, SWAP
 
-def selection_sort(arr: List[int]) -> Generator[Dict, None, None]:
+ALGORITHM = {
+    "name": "Selection Sort",
+    "entry": "selection_sort",
+    "category": "sorting",
+    "input": "array",
+    "complexity": "O(n^2)",
+    "stats": "selection_sort_stats",
+}
+
+
+def selection_sort(arr: List[int], granularity="all") -> Generator[Frame, None, None]:
+    """Selection sort frames; ``granularity`` as for ``bubble_sort``."""
     a = arr.copy()
     n = len(a)
-    yield {"state": a.copy(), "highlight": (), "info": "start"}
+    gate = FrameGate(granularity)
+    yield gate.frame(a.copy(), (), START)
+    for i in range(n):
+        min_idx = i
+        for j in range(i + 1, n):
+            if gate.step():
+                pair = (min_idx, j)
+                yield gate.frame(a.copy(), pair, COMPARE, pair)
+            if a[j] < a[min_idx]:
+                min_idx = j
+                if gate.step():
+                    single = (min_idx,)
+                    yield gate.frame(a.copy(), single, NEW_MIN, single)
+        if min_idx != i:
+            a[i], a[min_idx] = a[min_idx], a[i]
+            if gate.step(mutating=True):
+                pair = (i, min_idx)
+                yield gate.frame(a.copy(), pair, SWAP, pair)
+        if gate.pass_end():
+            yield gate.frame(a.copy(), (i,), PASS, (i,))
+    yield gate.frame(a.copy(), (), DONE)
+
+
+def selection_sort_stats(arr: List[int]) -> Dict[str, float]:
+    """Run selection sort without frames; same counts as ``count_ops`` on its trace."""
+    a = list(arr)
+    n = len(a)
+    swaps = new_mins = 0
+    start = perf_counter()
     for i in range(n):
         min_idx = i
         for j in range(i + 1, n):
-            yield {"state": a.copy(), "highlight": (min_idx, j), "info": f"compare {min_idx} and {j}"}
             if a[j] < a[min_idx]:
                 min_idx = j
-                yield {"state": a.copy(), "highlight": (min_idx,), "info": f"new min {min_idx}"}
+                new_mins += 1
         if min_idx != i:
             a[i], a[min_idx] = a[min_idx], a[i]
-            yield {"state": a.copy(), "highlight": (i, min_idx), "info": f"swapped {i} & {min_idx}"}
-    yield {"state": a.copy(), "highlight": (), "info": "done"}
+            swaps += 1
+    seconds = perf_counter() - start
+    comparisons = n * (n - 1) // 2
+    return {"comparisons": comparisons, "swaps": swaps, "writes": 0,
+            "frames": 2 + comparisons + new_mins + swaps, "seconds": seconds}
@@ -0,0 +1,255 @@
+"""Benchmarks for trace generation, trace memory and frame rendering.
+
+Runs every registered algorithm (``ALGOS`` plus binary search, BFS
+pathfinding and the quicksort demo) over several input sizes and
+distributions, and records:
+
+- ``frames_per_sec``: frames the generator yields per second
+- ``list_peak_bytes`` / ``trace_peak_bytes``: peak memory to hold the run as
+  a list of frames and as a :class:`DeltaTrace`
+- ``draw_state_fig_ms`` / ``bar_figure_ms``: per-frame render time through
+  ``draw_state_fig`` and the persistent ``BarFigure``. The CLI's
+  ``draw_state`` is not timed: its fixed 50 ms ``plt.pause`` would swamp
+  the rendering cost.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_traces --quick --save
+    python -m benchmarks.bench_traces --check --threshold 1.25 --time-threshold 2
+
+``--save`` writes the results as the JSON baseline; ``--check`` compares a
+fresh run against it and exits non-zero if any metric regressed by more than
+its threshold: ``--threshold`` (default 1.25, i.e. 25% larger) for memory
+and ``--time-threshold`` (default 2) for throughput and render times. Timings
+are medians of repeated runs, but they still vary run to run by more than
+memory peaks do, hence the looser default. The committed
+``benchmarks/baseline.json`` covers the default sizes; timings depend on the
+machine, so re-save it on yours before relying on ``--check``.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from algorithms.binary_search import binary_search
+from algorithms.bfs_pathfinding import bfs_pathfinding
+from quick_sort_visualization import quicksort
+from utils.algo_interface import ALGOS, collect_generator
+from utils.draw_helpers import BarFigure, draw_state_fig
+from utils.ingest import generate
+from utils.trace import DeltaTrace
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DISTRIBUTIONS = ("random", "sorted", "reversed", "few-unique")
+SIZES = (50, 200, 500)
+QUICK_SIZES = (20, 100)
+RENDER_SAMPLE = 5
+RENDER_MAX_N = 200
+# Generation is timed as the median of at least MIN_REPEATS runs lasting at
+# least MIN_TIMING_SECONDS in total, so tiny cases and one-off stalls are not noise
+MIN_REPEATS = 7
+MIN_TIMING_SECONDS = 0.2
+# Render samples are drawn this many times; each frame's median counts
+RENDER_REPEATS = 3
+# Metrics where bigger is better; every other metric is a cost
+HIGHER_IS_BETTER = {"frames_per_sec"}
+# Wall-clock metrics, checked against --time-threshold instead of --threshold
+TIMING_METRICS = {"frames_per_sec", "draw_state_fig_ms", "bar_figure_ms"}
+DEFAULT_THRESHOLD = 1.25
+DEFAULT_TIME_THRESHOLD = 2.0
+
+
+def make_input(distribution: str, n: int, seed: int = 0) -> List[int]:
+    """Deterministic input array of size ``n``, from the same generators as the web demo."""
+    return generate(distribution, n, seed).tolist()
+
+
+def make_grid(n: int, seed: int = 0) -> List[List[int]]:
+    """Square grid of roughly ``n`` cells with 20% walls and open corners."""
+    side = max(2, int(n ** 0.5))
+    rng = random.Random(f"grid-{n}-{seed}")
+    grid = [[1 if rng.random() < 0.2 else 0 for _ in range(side)] for _ in range(side)]
+    grid[0][0] = grid[-1][-1] = 0
+    return grid
+
+
+def _quicksort_frames(arr: List[int]) -> Iterable[Dict]:
+    # quicksort yields tuples; adapt them to frame dicts so they can be drawn
+    random.seed(0)
+    for state, pivot, left, right, _start, _end, message in quicksort(arr):
+        yield {"state": state, "highlight": (pivot, left, right), "info": message}
+
+
+def benchmark_cases(sizes: Iterable[int]) -> List[Tuple[str, Callable[[], Iterable[Dict]]]]:
+    """(case name, generator factory) for every algorithm, size and distribution.
+
+    Names are ``algorithm|distribution|size``.
+    """
+    cases = []
+    for n in sizes:
+        for dist in DISTRIBUTIONS:
+            arr = make_input(dist, n)
+            for name, func in ALGOS.items():
+                cases.append((f"{name}|{dist}|{n}", lambda func=func, arr=arr: func(list(arr))))
+            cases.append((f"Quick Sort|{dist}|{n}", lambda arr=arr: _quicksort_frames(list(arr))))
+            target = sorted(arr)[len(arr) // 3]
+            cases.append((f"Binary Search|{dist}|{n}",
+                          lambda arr=arr, target=target: binary_search(sorted(arr), target)))
+        grid = make_grid(n)
+        goal = (len(grid) - 1, len(grid) - 1)
+        cases.append((f"BFS Pathfinding|grid|{n}", lambda grid=grid, goal=goal: bfs_pathfinding(grid, (0, 0), goal)))
+    return cases
+
+
+def _render_ms(frames: List[Dict], draw: Callable[[Dict], None]) -> float:
+    per_frame = []
+    for _ in range(RENDER_REPEATS):
+        for frame in frames:
+            start = time.perf_counter()
+            draw(frame)
+            per_frame.append(time.perf_counter() - start)
+    return statistics.median(per_frame) * 1000 if per_frame else 0.0
+
+
+def _png(fig) -> None:
+    fig.savefig(io.BytesIO(), format="png")
+
+
+def measure(factory: Callable[[], Iterable[Dict]], render: bool = True) -> Dict[str, float]:
+    """All metrics for one case."""
+    times = []
+    while len(times) < MIN_REPEATS or sum(times) < MIN_TIMING_SECONDS:
+        start = time.perf_counter()
+        frames = 0
+        for _ in factory():
+            frames += 1
+        times.append(time.perf_counter() - start)
+    typical = statistics.median(times)
+    result = {"frames": frames, "frames_per_sec": frames / typical if typical > 0 else float("inf")}
+
+    tracemalloc.start()
+    held = collect_generator(factory())
+    result["list_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    del held
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    trace = DeltaTrace.record(factory())
+    result["trace_peak_bytes"] = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    sample = [trace[i] for i in range(min(RENDER_SAMPLE, len(trace)))]
+    state = sample[0]["state"] if sample else []
+    if render and sample and isinstance(state, list) and len(state) <= RENDER_MAX_N \
+            and not isinstance(state[0], list):
+        def old(frame):
+            fig = draw_state_fig(frame["state"], frame["highlight"], frame["info"])
+            _png(fig)
+            plt.close(fig)
+
+        bar_figure = BarFigure(state)
+        result["draw_state_fig_ms"] = _render_ms(sample, old)
+        result["bar_figure_ms"] = _render_ms(
+            sample, lambda frame: _png(bar_figure.update(frame["state"], frame["highlight"], frame["info"])))
+        plt.close("all")
+    return result
+
+
+def run(sizes: Iterable[int], render: bool = True, only: str = "") -> Dict:
+    results = {}
+    for name, factory in benchmark_cases(sizes):
+        if only and only.lower() not in name.lower():
+            continue
+        # Render cost does not depend on the input distribution; measure it once per size
+        results[name] = measure(factory, render=render and "|random|" in name)
+        print(f"{name:40s} {results[name]['frames']:>9} frames "
+              f"{results[name]['frames_per_sec']:>12,.0f} frames/s", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD,
+            time_threshold: float = DEFAULT_TIME_THRESHOLD) -> List[str]:
+    """Human-readable regressions of ``current`` against ``baseline``.
+
+    Timing metrics are held to ``time_threshold``, everything else to ``threshold``.
+    """
+    regressions = []
+    for name, metrics in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        for metric, value in metrics.items():
+            if metric == "frames" or metric not in old or not old[metric]:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                ratio = old[metric] / value if value else float("inf")
+            else:
+                ratio = value / old[metric]
+            if ratio > (time_threshold if metric in TIMING_METRICS else threshold):
+                regressions.append(f"{name} {metric}: {old[metric]:.4g} -> {value:.4g} ({ratio:.2f}x worse)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", help="input sizes (default: %s)" % (SIZES,))
+    parser.add_argument("--quick", action="store_true", help="small sizes only, for a fast smoke run")
+    parser.add_argument("--only", default="", help="run only cases whose name contains this text")
+    parser.add_argument("--no-render", action="store_true", help="skip the rendering benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--save", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail if slower than the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed memory growth ratio before --check fails (default %(default)s)")
+    parser.add_argument("--time-threshold", type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help="allowed slowdown ratio of timing metrics (default %(default)s)")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    if args.check and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; record one first with --save")
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    current = run(sizes, render=not args.no_render, only=args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    status = 0
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold, args.time_threshold)
+        for line in regressions:
+            print("REGRESSION " + line)
+        if regressions:
+            status = 1
+        else:
+            print(f"No regressions beyond {args.threshold:.2f}x (memory) / {args.time_threshold:.2f}x (time) "
+                  f"against {args.baseline}")
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
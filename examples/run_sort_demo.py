@@ -5,7 +5,7 @@ from algorithms.bubble_sort import bubble_sort
 
 def main():
     arr = [5, 2, 4, 1, 3]
-    visualize_sort(bubble_sort(arr), arr)
+    visualize_sort(bubble_sort(arr), arr, speed=4)
 
 
 if __name__ == '__main__':
@@ -1,59 +1,246 @@
+import os
 import time
 import random
+import uuid
+from functools import partial
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import streamlit as st
+import streamlit.components.v1 as components
 import matplotlib.pyplot as plt
 
-from algorithms.bubble_sort import bubble_sort
-from algorithms.insertion_sort import insertion_sort
-from algorithms.selection_sort import selection_sort
-from algorithms.binary_search import binary_search
-from algorithms.merge_sort import merge_sort
+from algorithms.binary_search import batch_binary_search
+from utils.algo_interface import ALGOS, tally_ops
+from utils.registry import default_registry
+from utils.trace import LazyTrace, keyframe_interval_for
+from utils.draw_helpers import FrameRenderer, RaceFigure, draw_probe_heatmap_fig, draw_state_fig, is_bar_state
+from utils.frame_cache import FrameImageCache
+from utils.ingest import DISTRIBUTIONS, generate, load_file, parse_text
+from utils.playback import PlaybackClock
+from utils.race import RaceTrace, record_race
+from utils.session_store import SessionStore
+from utils.trace_file import TraceFile, list_trace_files, resolve_trace_path
+from utils.timing import Timings
+from utils.web_player import render_player_html
+from utils.trace_cache import TraceCache, make_key
 
 
-ALGOS = {
-    "Bubble Sort": bubble_sort,
-    "Insertion Sort": insertion_sort,
-    "Selection Sort": selection_sort,
-    "Merge Sort": merge_sort,
+# Frames generated past the current one on each rerun so the progress bar
+# has something to show before the run is complete
+READ_AHEAD = 256
+
+# Arrays up to this size get one bar per value; larger ones need large-array mode
+MAX_ARRAY_SIZE = 50
+LARGE_MAX_ARRAY_SIZE = 1_000_000
+
+# Longest trace the browser playback mode will embed in the page
+MAX_BROWSER_FRAMES = 200_000
+
+PLAYBACK_MODES = ["Server (frame by frame)", "Browser (smooth)"]
+
+# Shortest interval between playback ticks; faster speeds skip frames instead
+MIN_TICK_SECONDS = 0.05
+
+INPUT_SOURCES = ["Type numbers", "Upload a file", "Generate"]
+
+# Most random targets a batched binary search may be asked for at once
+MAX_BATCH_TARGETS = 100_000
+
+# Detail levels offered in the sidebar -> generator granularity (None: every k-th step)
+DETAIL_LEVELS = {
+    "Every step": "all",
+    "Mutations only": "mutations",
+    "Per pass": "passes",
+    "Every k-th step": None,
 }
 
+# Rendered frame images kept per session, and how far ahead they are drawn
+IMAGE_CACHE_MB = int(os.environ.get("ALGO_VIZ_IMAGE_CACHE_MB", "64"))
+PREFETCH_FRAMES = 16
+RENDER_WORKERS = 2
 
-def draw_state_fig(state, highlight=(), info="", bar_color="#4C78A8", highlight_color="#EE994F"):
-    """Draws a bar chart with axis labels, title, and highlight indices."""
-    plt.style.use('seaborn-v0_8-darkgrid')
-    fig, ax = plt.subplots(figsize=(9, 4))
-    # If state is a grid (list of lists), flatten for now
-    if not isinstance(state, (list, tuple)) or (len(state) and isinstance(state[0], (list, tuple))):
-        # Fallback: show a simple text when non-list state
-        ax.text(0.5, 0.5, str(state), ha='center', va='center')
-        ax.set_xticks([])
-        ax.set_yticks([])
-    else:
-        # Updated colored bars: Replaced the gradient colors with a uniform color based on bar_color:
-        bars = ax.bar(range(len(state)), state, color=bar_color, edgecolor='black')
-
-        if highlight:
-            for idx in (highlight if isinstance(highlight, (list, tuple)) else [highlight]):
-                if isinstance(idx, int) and 0 <= idx < len(bars):
-                    bars[idx].set_color(highlight_color)
-        ax.set_xlabel('Index')
-        ax.set_ylabel('Value')
-        ax.set_xticks(range(len(state)))
-        ax.set_xlim(-0.5, max(len(state) - 0.5, 0.5))
-        ax.set_ylim(0, max(state) * 1.1 if state else 1)
-        # annotate bar values for clarity
-        for rect, val in zip(bars, state):
-            height = rect.get_height()
-            ax.annotate(f'{val}', xy=(rect.get_x() + rect.get_width() / 2, height),
-                        xytext=(0, 3), textcoords='offset points', ha='center', va='bottom', fontsize=8)
-    ax.set_title(info, fontsize=12)
-    plt.tight_layout()
-    return fig
+# Shared trace cache budget, and an optional directory evicted traces spill to
+TRACE_CACHE_MB = int(os.environ.get("ALGO_VIZ_TRACE_CACHE_MB", "256"))
+TRACE_CACHE_DIR = os.environ.get("ALGO_VIZ_TRACE_CACHE_DIR") or None
 
+# Budget for every session's trace together; past it, traces of sessions idle
+# for SESSION_IDLE_SECONDS are evicted (spilled to the directory, if set)
+SESSION_MEMORY_MB = int(os.environ.get("ALGO_VIZ_SESSION_MEMORY_MB", "512"))
+SESSION_SPILL_DIR = os.environ.get("ALGO_VIZ_SESSION_SPILL_DIR") or None
+SESSION_IDLE_SECONDS = float(os.environ.get("ALGO_VIZ_SESSION_IDLE_SECONDS", "60"))
+# Sessions unused this long are forgotten, spill files included
+SESSION_EXPIRE_SECONDS = float(os.environ.get("ALGO_VIZ_SESSION_EXPIRE_SECONDS", "3600"))
+# Directory trace files are replayed from; replay is off when unset, so
+# visitors cannot make the server open arbitrary paths
+TRACE_DIR = os.environ.get("ALGO_VIZ_TRACE_DIR") or None
 
+
+script_start = time.perf_counter()
 st.set_page_config(page_title="Algorithm Visualizer", layout="wide")
 st.title("Algorithm Visualizer — Web Demo")
 
+# Per-session phase latencies: generate -> rebuild -> draw -> encode, and whole playback ticks
+if "timings" not in st.session_state:
+    st.session_state.timings = Timings()
+timings = st.session_state.timings
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# Built once per process from the algorithms' metadata; modules load on first use
+REGISTRY = default_registry()
+
+def read_input(source, text, upload=None, distribution="random", size=0, seed=0):
+    """The input array for the chosen source, built once per distinct input per session.
+
+    Text, CSV and .npy inputs are parsed by NumPy (see utils/ingest.py) and
+    generated inputs are seeded, then converted to a list once; reruns (one
+    per played frame) reuse it. Raises ValueError for malformed input.
+    """
+    if source == INPUT_SOURCES[1]:
+        if upload is None:
+            raise ValueError("choose a .csv or .npy file to upload")
+        key = (source, upload.file_id)
+    elif source == INPUT_SOURCES[2]:
+        key = (source, distribution, int(size), int(seed))
+    else:
+        key = (source, text)
+    cached = st.session_state.get("input_array")
+    if cached is None or cached[0] != key:
+        try:
+            if source == INPUT_SOURCES[1]:
+                values = load_file(upload, upload.name)
+            elif source == INPUT_SOURCES[2]:
+                values = generate(distribution, int(size), int(seed))
+            else:
+                values = parse_text(text)
+            cached = (key, values.tolist(), None)
+        except ValueError as e:
+            cached = (key, None, e)
+        st.session_state.input_array = cached
+    if cached[2] is not None:
+        raise cached[2]
+    return cached[1]
+
+def preview(arr, limit=20):
+    """Short text preview of an array that may have a million elements."""
+    if len(arr) <= limit:
+        return str(arr)
+    return f"[{', '.join(map(str, arr[:limit]))}, ... ({len(arr):,} total)]"
+
+@st.cache_resource
+def get_trace_cache():
+    """One trace cache per server process, shared by every session."""
+    return TraceCache(max_bytes=TRACE_CACHE_MB * 1024 * 1024, spill_dir=TRACE_CACHE_DIR)
+
+def held_by_trace_cache(frames):
+    """Whether every finished trace behind ``frames`` is the trace cache's own copy."""
+    traces = getattr(frames, "traces", None) or [getattr(frames, "trace", frames)]
+    cache = get_trace_cache()
+    return all(cache.holds(trace) for trace in traces)
+
+@st.cache_resource
+def get_session_store():
+    """Every session's trace, held under one process-wide memory budget.
+
+    Traces the trace cache also holds are not charged twice.
+    """
+    return SessionStore(max_bytes=SESSION_MEMORY_MB * 1024 * 1024, spill_dir=SESSION_SPILL_DIR,
+                        idle_seconds=SESSION_IDLE_SECONDS, expire_seconds=SESSION_EXPIRE_SECONDS,
+                        shared=held_by_trace_cache)
+
+def session_frames():
+    """The session's trace, reloaded or rebuilt if the session store evicted it.
+
+    Traces live in the shared store, not in st.session_state, which keeps
+    only the recipe to rebuild one. Don't bind the result to a module-level
+    name: stored fragments keep the script's globals, and the trace with them.
+    """
+    store = get_session_store()
+    sid = st.session_state.session_id
+    frames = store.get(sid)
+    if frames is None:
+        recipe = st.session_state.get("frames_recipe")
+        if recipe is None:
+            return []
+        with timings.phase("generate"):
+            frames = recipe()
+        store.put(sid, frames)
+    return frames
+
+def set_session_frames(frames, recipe=None):
+    """Make ``frames`` the session's trace; ``recipe()`` rebuilds it after an eviction."""
+    st.session_state.frames_recipe = recipe
+    get_session_store().put(st.session_state.session_id, frames)
+
+@st.cache_resource
+def get_render_pool():
+    """Threads that rasterize upcoming frames for every session's image cache."""
+    return ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="frame-render")
+
+@st.cache_resource
+def get_race_pool():
+    """Worker processes that record race traces, started once per server process.
+
+    Spawned rather than forked, since the server runs threads.
+    """
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+
+def reset_image_cache():
+    """Drop the session's rendered images, e.g. when a new trace is loaded."""
+    cache = st.session_state.pop("image_cache", None)
+    if cache is not None:
+        cache.close()
+    st.session_state.pop("image_cache_key", None)
+
+def open_trace(algo_name, func, arr, target=None, keyframe_interval=None, granularity="all"):
+    """Serve a finished trace from the shared cache, or start one that fills it when done."""
+    cache = get_trace_cache()
+    key = make_key(algo_name, func, arr, target, granularity)
+    cached = cache.get(key)
+    if cached is not None:
+        return LazyTrace.from_trace(cached)
+    if target is None:
+        gen = func(list(arr), granularity=granularity)
+    else:
+        gen = func(list(arr), target, granularity=granularity)
+    return LazyTrace(gen, keyframe_interval or keyframe_interval_for(len(arr)),
+                     on_complete=lambda trace: cache.put(key, trace))
+
+def open_race(names, arr, granularity="all"):
+    """Traces for a race: cached ones from the shared cache, the rest recorded on the race pool.
+
+    Returns the RaceTrace and per-algorithm stats (``seconds`` is None for
+    cached traces) plus the wall time spent generating.
+    """
+    cache = get_trace_cache()
+    keys = {name: make_key(name, ALGOS[name], arr, granularity=granularity) for name in names}
+    traces, stats = {}, {}
+    for name in names:
+        cached = cache.get(keys[name])
+        if cached is not None:
+            traces[name] = cached
+            stats[name] = dict(tally_ops(cached.ops), seconds=None)
+    missing = [name for name in names if name not in traces]
+    start = time.perf_counter()
+    if missing:
+        try:
+            results = record_race(missing, arr, granularity=granularity, pool=get_race_pool())
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool and record here
+            get_race_pool.clear()
+            results = record_race(missing, arr, workers=1, granularity=granularity)
+        for name, result in results.items():
+            traces[name] = result.pop("trace")
+            stats[name] = result
+            cache.put(keys[name], traces[name])
+    wall = time.perf_counter() - start
+    return RaceTrace({name: traces[name] for name in names}), stats, wall
+
+def reopen_race(names, arr, granularity="all"):
+    """Just the RaceTrace of :func:`open_race`, for rebuilding an evicted race."""
+    return open_race(names, arr, granularity)[0]
+
 # Sidebar controls
 with st.sidebar:
     st.header("Controls")
@@ -63,26 +250,70 @@ with st.sidebar:
     with st.form("visualization_form"):
         algo_name = st.selectbox(
             "🔧 Select Algorithm", 
-            list(ALGOS.keys()) + ["Binary Search"],
+            list(ALGOS.keys()) + REGISTRY.names(category="search"),
             help="Choose the algorithm you want to visualize"
         )
+        algo_spec = REGISTRY.get(algo_name)
+        st.caption(f"{algo_spec.category.title()} · {algo_spec.complexity} · input: {algo_spec.input}")
         
         st.markdown("**📝 Array Input**")
+        input_source = st.radio("Input source", INPUT_SOURCES, horizontal=True)
         arr_text = st.text_input(
             "Enter numbers separated by commas", 
             value="5,2,4,1,3",
             placeholder="e.g., 5,2,4,1,3",
             help="Enter integers separated by commas"
         )
+        upload = st.file_uploader(
+            "Upload a .csv or .npy file", type=["csv", "txt", "npy"],
+            help="One row or one column of integers (a header line is skipped); used with 'Upload a file'",
+        )
+        gen_cols = st.columns([2, 2, 1])
+        distribution = gen_cols[0].selectbox("Distribution", DISTRIBUTIONS)
+        gen_size = gen_cols[1].number_input("Size", min_value=1, max_value=LARGE_MAX_ARRAY_SIZE, value=20, step=10)
+        gen_seed = gen_cols[2].number_input("Seed", min_value=0, value=0, step=1)
         
+        large_mode = st.checkbox(
+            "🗻 Large-array mode",
+            help=f"Allow up to {LARGE_MAX_ARRAY_SIZE:,} elements, drawn as a per-pixel min/max envelope",
+        )
+
+        race_mode = st.checkbox(
+            "🏁 Race mode",
+            help="Run several sorting algorithms on the same input and play them back side by side",
+        )
+        race_names = st.multiselect(
+            "Algorithms to race",
+            list(ALGOS.keys()),
+            default=list(ALGOS.keys()),
+            help="Used when race mode is on; traces of large inputs are generated in parallel, one process per algorithm",
+        )
+
+        detail = st.selectbox(
+            "🔍 Detail level",
+            list(DETAIL_LEVELS),
+            help="Every step is best for learning; coarser levels skip frames while generating, for quick overviews of large inputs",
+        )
+        every_k = st.number_input(
+            "k (for every k-th step)", min_value=2, value=10, step=1,
+            help="Used when the detail level is 'Every k-th step'",
+        )
+        granularity = DETAIL_LEVELS[detail] or int(every_k)
+
         # Additional input for binary search
         target = None
-        if algo_name == "Binary Search":
+        if algo_spec.category == "search":
             target = st.number_input(
                 "🎯 Target value to search for", 
                 value=5,
                 help="The number you want to find in the array"
             )
+        batch_size = 0
+        if algo_name == "Binary Search":
+            batch_size = st.number_input(
+                "🎯 Batch: random targets", min_value=0, max_value=MAX_BATCH_TARGETS, value=0, step=1000,
+                help="Search this many random targets at once and show where their probes landed (0: one target)",
+            )
         
         # Submit button with better styling
         submitted = st.form_submit_button("🚀 Generate Visualization", use_container_width=True)
@@ -91,44 +322,101 @@ with st.sidebar:
         if submitted:
             try:
                 # Parse and validate array input
-                arr = [int(x.strip()) for x in arr_text.split(",") if x.strip() != '']
+                arr = read_input(input_source, arr_text, upload, distribution, gen_size, gen_seed)
                 
                 if not arr:
                     st.error("❌ Please enter at least one number")
-                elif len(arr) > 50:
-                    st.error("❌ Array too large! Please use 50 or fewer elements")
+                elif len(arr) > MAX_ARRAY_SIZE and not large_mode:
+                    st.error(f"❌ Array too large! Please use {MAX_ARRAY_SIZE} or fewer elements, or enable large-array mode")
+                elif len(arr) > LARGE_MAX_ARRAY_SIZE:
+                    st.error(f"❌ Array too large! Large-array mode supports up to {LARGE_MAX_ARRAY_SIZE:,} elements")
+                elif race_mode and not race_names:
+                    st.error("❌ Pick at least one algorithm to race")
+                elif batch_size:
+                    sorted_arr = sorted(arr)
+                    targets = [random.randint(sorted_arr[0] - 1, sorted_arr[-1] + 1) for _ in range(int(batch_size))]
+                    with st.spinner(f"Searching {len(targets):,} targets..."), timings.phase("generate"):
+                        st.session_state.batch = batch_binary_search(sorted_arr, targets)
+                    set_session_frames([])
+                    st.session_state.playing = False
+                    st.session_state.idx = 0
+                    st.success(f"✅ Searched {len(targets):,} targets")
+                elif race_mode:
+                    st.session_state.pop("batch", None)
+                    with st.spinner(f"Generating {len(race_names)} traces..."):
+                        race, race_stats, race_wall = open_race(race_names, arr, granularity)
+                    set_session_frames(race, partial(reopen_race, race_names, arr, granularity))
+                    del race  # module globals outlive the run; the store owns the trace
+                    st.session_state.race_stats = race_stats
+                    st.session_state.race_wall = race_wall
+                    reset_image_cache()
+                    st.session_state.idx = 0
+                    st.session_state.playing = False
+                    st.success(f"✅ Race ready! {len(race_names)} traces in {race_wall:.2f}s")
                 else:
-                    # Generate algorithm frames
-                    with st.spinner(f"Generating {algo_name} visualization..."):
-                        if algo_name == "Binary Search":
+                    # Set up lazy frame generation; frames are produced as playback needs them
+                    st.session_state.pop("batch", None)
+                    with st.spinner(f"Preparing {algo_name} visualization..."):
+                        if algo_spec.category == "search":
                             # Sort array for binary search
                             sorted_arr = sorted(arr)
-                            st.info(f"🔄 Array sorted for binary search: {sorted_arr}")
-                            st.session_state.frames = list(binary_search(sorted_arr, int(target)))
+                            st.info(f"🔄 Array sorted for binary search: {preview(sorted_arr)}")
+                            recipe = partial(open_trace, algo_name, algo_spec.load(), sorted_arr, int(target),
+                                             granularity=granularity)
                         else:
-                            st.session_state.frames = list(ALGOS[algo_name](arr.copy()))
+                            recipe = partial(open_trace, algo_name, ALGOS[algo_name], arr, granularity=granularity)
+                        set_session_frames(recipe(), recipe)
+                        # Each frame of a large array costs O(n) to generate, so read ahead less
+                        st.session_state.read_ahead = max(1, min(READ_AHEAD, READ_AHEAD * MAX_ARRAY_SIZE // len(arr)))
                         
-                        # Reset playback state
+                        # Reset playback state; the next frame builds a fresh figure
+                        st.session_state.pop("race_stats", None)
+                        reset_image_cache()
                         st.session_state.idx = 0
                         st.session_state.playing = False
                         
-                        st.success(f"✅ Generated {len(st.session_state.frames)} animation frames!")
+                        st.success("✅ Visualization ready! Frames are generated as playback runs")
                         
-            except ValueError:
-                st.error("❌ Invalid input! Please enter only integers separated by commas")
+            except ValueError as e:
+                st.error(f"❌ Invalid input! {e}")
             except Exception as e:
                 st.error(f"❌ An error occurred: {str(e)}")
     
+    # Replay a trace recorded with `python -m utils.trace_file record`; it is
+    # memory-mapped, so even multi-million-step traces are not loaded into RAM
+    with st.expander("📼 Replay a trace file"):
+        try:
+            trace_names = list_trace_files(TRACE_DIR) if TRACE_DIR else []
+        except OSError as e:
+            st.error(f"❌ Could not read the trace directory: {e}")
+            trace_names = []
+        if not TRACE_DIR:
+            st.caption("Set `ALGO_VIZ_TRACE_DIR` to a directory of `.avtrace` files to replay them here")
+        trace_name = st.selectbox("Trace file", trace_names, disabled=not trace_names)
+        if st.button("Open trace file", disabled=not trace_name):
+            try:
+                trace_path = resolve_trace_path(TRACE_DIR, trace_name)
+                set_session_frames(TraceFile(trace_path), partial(TraceFile, trace_path))
+                st.session_state.pop("batch", None)
+                st.session_state.pop("race_stats", None)
+                reset_image_cache()
+                st.session_state.read_ahead = 1
+                st.session_state.idx = 0
+                st.session_state.playing = False
+                st.success(f"✅ Opened {len(session_frames()):,} frames")
+            except (OSError, ValueError) as e:
+                st.error(f"❌ Could not open trace file: {e}")
+
     # Display array info outside form
     try:
-        arr = [int(x.strip()) for x in arr_text.split(",") if x.strip() != '']
+        arr = read_input(input_source, arr_text, upload, distribution, gen_size, gen_seed)
         if arr:
             st.info(f"📊 Array size: **{len(arr)}**")
-            st.write(f"Array preview: `{arr}`")
+            st.write(f"Array preview: `{preview(arr)}`")
         else:
             st.warning("⚠️ Array is empty")
-    except Exception:
-        st.error("❌ Invalid array format - use comma separated integers")
+    except ValueError as e:
+        st.error(f"❌ Invalid input: {e}")
         arr = []
 
     # Speed control configuration
@@ -150,6 +438,7 @@ with st.sidebar:
     
     # Current speed display
     st.write(f"**Speed:** {st.session_state.multiplier}x")
+    playback_fps = 1000.0 / base_delay_ms * st.session_state.multiplier
     
     # Speed presets
     st.write("**Quick Presets:**")
@@ -159,15 +448,23 @@ with st.sidebar:
         with col:
             if st.button(f"{speed_val}x", key=f"preset_{i}"):
                 st.session_state.multiplier = speed_val
+
+    # Browser mode ships the trace once and animates it client-side
+    playback_mode = st.radio(
+        "Playback mode",
+        PLAYBACK_MODES,
+        help="Browser mode sends the whole trace to the page once, so playback needs no server work per frame",
+    )
+    browser_mode = playback_mode == PLAYBACK_MODES[1]
     st.markdown("---")
     
     # Initialize session state variables
     if 'playing' not in st.session_state:
         st.session_state.playing = False
-    if 'frames' not in st.session_state:
-        st.session_state.frames = []
     if 'idx' not in st.session_state:
         st.session_state.idx = 0
+    if 'playback' not in st.session_state:
+        st.session_state.playback = PlaybackClock(playback_fps)
 
    # Personalization
     st.subheader("Colors")
@@ -181,32 +478,51 @@ with st.sidebar:
 
     
     # Animation status indicator
-    if st.session_state.frames:
+    if session_frames():
         status = "🔴 Playing..." if st.session_state.playing else "⏸️ Paused"
         st.markdown(f"**Status:** {status}")
     
     # Playback control buttons
     control_cols = st.columns(4)
     with control_cols[0]:
-        play_disabled = not st.session_state.frames or st.session_state.idx >= len(st.session_state.frames) - 1
+        play_disabled = not session_frames() or not session_frames().has(st.session_state.idx + 1)
         if st.button("▶️ Play", disabled=play_disabled):
             st.session_state.playing = True
+            st.session_state.playback.start(st.session_state.idx, playback_fps)
     with control_cols[1]:
         if st.button("⏸️ Pause"):
             st.session_state.playing = False
     with control_cols[2]:
-        step_disabled = not st.session_state.frames or st.session_state.idx >= len(st.session_state.frames) - 1
+        step_disabled = not session_frames() or not session_frames().has(st.session_state.idx + 1)
         if st.button("⏭️ Step", disabled=step_disabled):
             st.session_state.playing = False
-            max_idx = max(len(st.session_state.frames) - 1, 0)
-            st.session_state.idx = min(st.session_state.idx + 1, max_idx)
+            if session_frames().has(st.session_state.idx + 1):
+                st.session_state.idx += 1
     with control_cols[3]:
-        if st.button("🔄 Reset", disabled=not st.session_state.frames):
+        if st.button("🔄 Reset", disabled=not session_frames()):
             st.session_state.idx = 0
             st.session_state.playing = False
 
+    # Shared trace cache counters
+    cache_stats = get_trace_cache().stats()
+    st.caption(
+        f"🗄️ Trace cache: {cache_stats['hits'] + cache_stats['disk_hits']} hits "
+        f"({cache_stats['disk_hits']} from disk), {cache_stats['misses']} misses, "
+        f"{cache_stats['entries']} traces / {cache_stats['bytes'] / 2**20:.1f} MiB"
+    )
+    store_stats = get_session_store().stats()
+    st.caption(
+        f"🧠 Session memory: {get_session_store().session_bytes(st.session_state.session_id) / 2**20:.1f} MiB here, "
+        f"{store_stats['bytes'] / 2**20:.1f} of {store_stats['max_bytes'] / 2**20:.0f} MiB across "
+        f"{store_stats['sessions']} sessions; {store_stats['evictions']} evicted, {store_stats['spills']} to disk"
+    )
+
+    # Filled in at the end of the run, once this rerun's phases are recorded
+    show_timings = st.checkbox("⏱️ Show timings", help="Per-phase latency of this session's reruns")
+    timing_panel = st.container()
+
     # Progress indicator (moved to main area)
-    if not st.session_state.frames:
+    if not session_frames():
         st.info("🎬 Generate visualization frames to start animation")
 
 # Main visualization display area
@@ -218,8 +534,13 @@ graph_container = st.container()
 
 def update_progress_bar():
     """Update the progress bar with current frame information."""
-    if st.session_state.frames:
-        total_frames = len(st.session_state.frames)
+    frames = session_frames()
+    if frames:
+        # Bounded read-ahead: never generates more than READ_AHEAD frames per rerun
+        with timings.phase("generate"):
+            frames.fill_to(st.session_state.idx + st.session_state.get("read_ahead", READ_AHEAD))
+        total_frames = len(frames)
+        total_label = total_frames if frames.exhausted else f"{total_frames}+"
         current_frame = st.session_state.idx + 1
         progress_value = st.session_state.idx / max(total_frames - 1, 1)
         percentage = int(progress_value * 100)
@@ -233,34 +554,123 @@ def update_progress_bar():
             with prog_col1:
                 st.progress(progress_value)
             with prog_col2:
-                st.metric("Frame", f"{current_frame}/{total_frames}")
+                st.metric("Frame", f"{current_frame}/{total_label}")
             
             # Current step information
-            if st.session_state.frames and 0 <= st.session_state.idx < len(st.session_state.frames):
-                current_info = st.session_state.frames[st.session_state.idx].get('info', 'Algorithm Step')
+            if 0 <= st.session_state.idx < len(frames):
+                with timings.phase("rebuild"):
+                    if hasattr(frames, "info_at"):
+                        current_info = frames.info_at(st.session_state.idx)
+                    else:
+                        current_info = frames[st.session_state.idx].get('info', 'Algorithm Step')
                 st.info(f"� **Current Step:** {current_info}")
             
             st.markdown("---")  # Visual separator
 
+def get_image_cache(kind, first_state):
+    """The session's rendered-image cache for the current trace and colors.
+
+    ``kind`` is "bars" or "race"; ``first_state()`` returns the first
+    frame's state and is only called when a new cache (a new trace or color
+    choice) needs its renderers set up.
+    """
+    frames = session_frames()
+    bar_color = st.session_state.get("bar_color", "#4C78A8")
+    highlight_color = st.session_state.get("highlight_color", "#EE994F")
+    key = (id(frames), kind, bar_color, highlight_color)
+    cache = st.session_state.get("image_cache")
+    if cache is None or st.session_state.get("image_cache_key") != key:
+        reset_image_cache()
+        with timings.phase("rebuild"):
+            state = first_state()
+        if kind == "race":
+            names = list(frames.names)
+            make_renderer = lambda: RaceFigure(names, state, bar_color, highlight_color, max_bars=MAX_ARRAY_SIZE)
+        else:
+            make_renderer = lambda: FrameRenderer(state, bar_color, highlight_color, max_bars=MAX_ARRAY_SIZE)
+        cache = st.session_state.image_cache = FrameImageCache(
+            make_renderer, max_bytes=IMAGE_CACHE_MB * 1024 * 1024, executor=get_render_pool())
+        st.session_state.image_cache_key = key
+    return cache
+
+def draws_bars(frames):
+    """Whether a trace's states are bar arrays, checked once per trace."""
+    kind = st.session_state.get("trace_kind")
+    if kind is None or kind[0] != id(frames):
+        with timings.phase("rebuild"):
+            kind = st.session_state.trace_kind = (id(frames), is_bar_state(frames[0].get('state', [])))
+    return kind[1]
+
+def show_cached_frame(cache, i: int):
+    """Show frame ``i`` from the image cache, rendering it only on a miss,
+    then queue the next PREFETCH_FRAMES frames for the render pool."""
+    frames = session_frames()
+    with timings.phase("draw"):
+        image = cache.get(i)
+    if image is None:
+        with timings.phase("rebuild"):
+            frame = frames[i]
+        with timings.phase("draw"):
+            image = cache.render(i, frame)
+    with graph_container, timings.phase("encode"):
+        st.image(image, width="stretch")
+    # During playback, prefetch the frames later ticks will land on, not every frame
+    stride = st.session_state.playback.stride() if st.session_state.playing else 1
+    wanted = cache.wanted(range(i + stride, min(i + 1 + PREFETCH_FRAMES * stride, len(frames)), stride))
+    if wanted:
+        with timings.phase("rebuild"):
+            items = [(j, frames[j]) for j in wanted]
+        cache.prefetch(items)
+
+def render_race_at(i: int):
+    """Render every racer's frame at step ``i`` in one figure, with their stats."""
+    race = session_frames()
+    show_cached_frame(get_image_cache("race", lambda: race.panels_at(0)[0]["state"]), i)
+    stats = st.session_state.get("race_stats", {})
+    rows = []
+    for name in race.names:
+        s = stats.get(name, {})
+        seconds = s.get("seconds")
+        rows.append({
+            "Algorithm": name,
+            "Generation": "cached" if seconds is None else f"{seconds * 1000:,.1f} ms",
+            "Frames": s.get("frames"),
+            "Comparisons": s.get("comparisons"),
+            "Swaps": s.get("swaps"),
+            "Writes": s.get("writes"),
+        })
+    with graph_container:
+        st.table(rows)
+        st.caption(f"⏱️ Generated in {st.session_state.get('race_wall', 0):.2f}s wall time "
+                   f"across {os.cpu_count() or 1} CPU(s)")
+
 def render_frame_at(i: int):
     """Render the visualization frame at the given index."""
     # Update progress bar first
     update_progress_bar()
     
-    if st.session_state.frames and 0 <= i < len(st.session_state.frames):
+    frames = session_frames()
+    if isinstance(frames, RaceTrace) and 0 <= i < len(frames):
         try:
-            frame = st.session_state.frames[i]
-            fig = draw_state_fig(
-                frame.get('state', []),
-                frame.get('highlight', ()),
-                frame.get('info', 'Algorithm Step'),
-                bar_color=st.session_state.get("bar_color", "#4C78A8"),
-                highlight_color=st.session_state.get("highlight_color", "#EE994F"),
-            )
-
+            render_race_at(i)
+        except Exception as e:
             with graph_container:
-                st.pyplot(fig)
-            plt.close(fig)
+                st.error(f"Error rendering frame: {str(e)}")
+    elif frames and 0 <= i < len(frames):
+        try:
+            if draws_bars(frames):
+                show_cached_frame(get_image_cache("bars", lambda: frames[0]['state']), i)
+            else:
+                with timings.phase("rebuild"):
+                    frame = frames[i]
+                with timings.phase("draw"):
+                    fig = draw_state_fig(frame.get('state', []), frame.get('highlight', ()),
+                                         frame.get('info', 'Algorithm Step'),
+                                         bar_color=st.session_state.get("bar_color", "#4C78A8"),
+                                         highlight_color=st.session_state.get("highlight_color", "#EE994F"))
+                with graph_container, timings.phase("encode"):
+                    st.pyplot(fig)
+                plt.close(fig)
         except Exception as e:
             with graph_container:
                 st.error(f"Error rendering frame: {str(e)}")
@@ -268,26 +678,111 @@ def render_frame_at(i: int):
         with progress_container:
             st.info("🎯 Select an algorithm and click 'Visualize!' to see the animation")
 
-# Display current frame or welcome message
-render_frame_at(st.session_state.idx)
+def render_in_browser():
+    """Embed the whole trace in a client-side player; returns False if it cannot be shipped."""
+    frames = session_frames()
+    if not isinstance(frames, LazyTrace):
+        return False
+    with timings.phase("generate"):
+        frames.fill_to(MAX_BROWSER_FRAMES)
+    if not frames.exhausted:
+        st.warning(f"⚠️ Trace is longer than {MAX_BROWSER_FRAMES:,} frames; using server playback")
+        return False
+    first_state = frames[0].get('state', [])
+    if not is_bar_state(first_state) or len(first_state) > MAX_ARRAY_SIZE:
+        return False
+    key = (id(frames.trace), st.session_state.bar_color, st.session_state.highlight_color,
+           st.session_state.multiplier)
+    if st.session_state.get("player_key") != key:
+        # Serialize once per trace and style, not on every rerun
+        with timings.phase("encode"):
+            st.session_state.player_html = render_player_html(
+                frames.trace,
+                bar_color=st.session_state.bar_color,
+                highlight_color=st.session_state.highlight_color,
+                fps=1000.0 / base_delay_ms,
+                speed=st.session_state.multiplier,
+            )
+        st.session_state.player_key = key
+    with graph_container:
+        if hasattr(st, "iframe"):
+            st.iframe(st.session_state.player_html, height=460)
+        else:
+            components.html(st.session_state.player_html, height=460)
+    return True
 
-# Auto-advancing playback with smooth progress updates
-if st.session_state.playing and st.session_state.frames:
-    # Compute delay in seconds
-    delay = max(0.1, base_delay_ms / (1000.0 * st.session_state.multiplier))
-    
-    # Auto-advance to next frame
-    if st.session_state.idx < len(st.session_state.frames) - 1:
-        # Wait for the specified delay
-        time.sleep(delay)
-        # Advance to next frame
-        st.session_state.idx += 1
-        # Trigger rerun to update display
-        st.rerun()
-    else:
-        # Animation completed
+def render_batch():
+    """Show a batched search as one aggregate probe heatmap instead of frames."""
+    result = st.session_state.batch
+    summary = result.summary()
+    with progress_container:
+        cols = st.columns(4)
+        cols[0].metric("Queries", f"{summary['queries']:,}")
+        cols[1].metric("Found", f"{summary['found']:,}")
+        cols[2].metric("Mean probes", f"{summary['mean_probes']:.2f}")
+        cols[3].metric("Max probes", summary["max_probes"])
+    with timings.phase("draw"):
+        fig = draw_probe_heatmap_fig(result.heat, result.depth_counts(),
+                                     f"Probe heatmap over {len(result.heat):,} elements")
+    with graph_container, timings.phase("encode"):
+        st.pyplot(fig)
+
+def playback_tick():
+    """Draw the current frame; while playing, first advance to the frame due now.
+
+    During playback this runs as a fragment with ``run_every``, so each tick
+    reruns only the visualization and nothing sleeps between frames. The
+    clock picks the frame due at this moment, so render time does not slow
+    playback down and ticks that come late skip frames.
+    """
+    global progress_container, graph_container
+    tick_start = time.perf_counter()
+    progress_container = st.container()
+    graph_container = st.container()
+    frames = session_frames()
+    finished = False
+    if st.session_state.playing and frames:
+        clock = st.session_state.playback
+        with timings.phase("generate"):
+            frames.fill_to(clock.due())
+        last = len(frames) - 1
+        st.session_state.idx = clock.tick(limit=last)
+        finished = frames.exhausted and st.session_state.idx >= last
+    render_frame_at(st.session_state.idx)
+    if st.session_state.playing:
+        timings.record("tick", time.perf_counter() - tick_start)
+    if finished:
         st.session_state.playing = False
-        st.session_state.idx = len(st.session_state.frames) - 1
-        with st.sidebar:
-            st.success("🎉 Animation Complete!")
-        st.toast("✅ Array sorted successfully! 🎉")
+        st.session_state.playback.stop()
+        st.session_state.animation_complete = True
+        # Full rerun so the sidebar controls and status catch up
+        st.rerun()
+
+# Display current frame or welcome message
+st.session_state.playback.set_fps(playback_fps)
+if st.session_state.get("batch") is not None:
+    render_batch()
+elif not (browser_mode and session_frames() and render_in_browser()):
+    playing = st.session_state.playing and bool(session_frames())
+    tick_every = max(MIN_TICK_SECONDS, 1.0 / playback_fps) if playing else None
+    st.fragment(run_every=tick_every)(playback_tick)()
+
+timings.record("script", time.perf_counter() - script_start)
+if show_timings:
+    with timing_panel:
+        st.table([{"Phase": name, "Count": s["count"], "p50 (ms)": round(s["p50_ms"], 2),
+                   "p95 (ms)": round(s["p95_ms"], 2), "Max (ms)": round(s["max_ms"], 2)}
+                  for name, s in timings.summary().items()])
+        clock = st.session_state.playback
+        if clock.shown:
+            st.caption(f"▶️ Last playback: {clock.achieved_fps(clock.last_tick):.1f} of {clock.fps:g} frames/s, "
+                       f"{clock.shown:,} shown, {clock.dropped:,} skipped")
+        st.download_button("Download timings JSON", timings.to_json(), file_name="timings.json",
+                           mime="application/json")
+        if st.button("Reset timings"):
+            timings.reset()
+
+if st.session_state.pop("animation_complete", False):
+    with st.sidebar:
+        st.success("🎉 Animation Complete!")
+    st.toast("✅ Array sorted successfully! 🎉")
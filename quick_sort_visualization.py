@@ -1,59 +1,70 @@
 import random
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+from matplotlib.figure import Figure
 import numpy as np
 
+from utils.export import export_trace
+
 def quicksort(arr, start=0, end=None):
     """
     Generator function that implements Quick Sort and yields the state at each step.
     
+    Sub-arrays wait on an explicit stack rather than in recursive generators,
+    so each frame is yielded directly and no input is too large or too
+    unbalanced to sort. Frames come out in the same order as the recursive
+    version (left part first).
+    
     Yields:
         tuple: (array, pivot_idx, left, right, start, end, message)
     """
     if end is None:
         end = len(arr) - 1
-        
-    if start >= end:
-        return
-
-    # Choose random pivot and move it to the start
-    pivot_idx = random.randint(start, end)
-    arr[start], arr[pivot_idx] = arr[pivot_idx], arr[start]
-    pivot_idx = start
-    pivot_val = arr[pivot_idx]
-    
-    left = start + 1
-    right = end
     
-    # Initial state before partitioning
-    yield arr.copy(), pivot_idx, left, right, start, end, "Starting new partition"
-    
-    while left <= right:
-        # Find element on left that should be on right
-        while left <= right and arr[left] <= pivot_val:
-            yield arr.copy(), pivot_idx, left, right, start, end, "Moving left pointer"
-            left += 1
-            
-        # Find element on right that should be on left
-        while left <= right and arr[right] >= pivot_val:
-            yield arr.copy(), pivot_idx, left, right, start, end, "Moving right pointer"
-            right -= 1
-            
-        if left <= right:
-            # Swap elements and continue
-            arr[left], arr[right] = arr[right], arr[left]
-            yield arr.copy(), pivot_idx, left, right, start, end, f"Swapped {arr[right]} and {arr[left]}"
-            left += 1
-            right -= 1
-    
-    # Move pivot to its final position
-    arr[pivot_idx], arr[right] = arr[right], arr[pivot_idx]
-    pivot_idx = right
-    yield arr.copy(), pivot_idx, left, right, start, end, "Pivot in final position"
-    
-    # Recursively sort subarrays
-    yield from quicksort(arr, start, pivot_idx - 1)
-    yield from quicksort(arr, pivot_idx + 1, end)
+    stack = [(start, end)]
+    while stack:
+        start, end = stack.pop()
+        if start >= end:
+            continue
+
+        # Choose random pivot and move it to the start
+        pivot_idx = random.randint(start, end)
+        arr[start], arr[pivot_idx] = arr[pivot_idx], arr[start]
+        pivot_idx = start
+        pivot_val = arr[pivot_idx]
+        
+        left = start + 1
+        right = end
+        
+        # Initial state before partitioning
+        yield arr.copy(), pivot_idx, left, right, start, end, "Starting new partition"
+        
+        while left <= right:
+            # Find element on left that should be on right
+            while left <= right and arr[left] <= pivot_val:
+                yield arr.copy(), pivot_idx, left, right, start, end, "Moving left pointer"
+                left += 1
+                
+            # Find element on right that should be on left
+            while left <= right and arr[right] >= pivot_val:
+                yield arr.copy(), pivot_idx, left, right, start, end, "Moving right pointer"
+                right -= 1
+                
+            if left <= right:
+                # Swap elements and continue
+                arr[left], arr[right] = arr[right], arr[left]
+                yield arr.copy(), pivot_idx, left, right, start, end, f"Swapped {arr[right]} and {arr[left]}"
+                left += 1
+                right -= 1
+        
+        # Move pivot to its final position
+        arr[pivot_idx], arr[right] = arr[right], arr[pivot_idx]
+        pivot_idx = right
+        yield arr.copy(), pivot_idx, left, right, start, end, "Pivot in final position"
+        
+        # Sort the left part first, then the right part
+        stack.append((pivot_idx + 1, end))
+        stack.append((start, pivot_idx - 1))
 
 def update_plot(frame_data, bars, text, colors):
     """
@@ -80,17 +91,14 @@ def update_plot(frame_data, bars, text, colors):
     
     return bars
 
-def visualize_quicksort(arr, save_path=None):
+def build_plot(fig, arr):
     """
-    Visualize the Quick Sort algorithm.
-    
-    Args:
-        arr (list): List of numbers to sort
-        save_path (str, optional): If provided, saves the animation to this path
+    Lay out the bar chart and message panel on ``fig``.
+
+    Returns:
+        tuple: (bars, text) artists for ``update_plot``
     """
-    # Create figure and axis
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), 
-                                  gridspec_kw={'height_ratios': [4, 1]})
+    ax1, ax2 = fig.subplots(2, 1, gridspec_kw={'height_ratios': [4, 1]})
     
     # Set up the main plot
     ax1.set_title('Quick Sort Visualization')
@@ -101,20 +109,47 @@ def visualize_quicksort(arr, save_path=None):
     bars = ax1.bar(range(len(arr)), arr, color='#1f77b4')
     text = ax2.text(0.5, 0.5, '', ha='center', va='center', fontsize=12)
     ax2.axis('off')
+    return bars, text
+
+class QuickSortRenderer:
+    """
+    Export renderer that draws quicksort frames the way ``visualize_quicksort`` does.
+    """
+    def __init__(self, first_frame, figsize=(12, 10)):
+        self.fig = Figure(figsize=figsize)
+        self.bars, self.text = build_plot(self.fig, first_frame[0])
+        self.fig.tight_layout()
+
+    def render(self, frame_data):
+        update_plot(frame_data, self.bars, self.text, None)
+        return self.fig
+
+def visualize_quicksort(arr, save_path=None, workers=None):
+    """
+    Visualize the Quick Sort algorithm.
     
-    # Create animation
+    Args:
+        arr (list): List of numbers to sort
+        save_path (str, optional): If provided, saves the animation to this path
+        workers (int, optional): Render processes used when saving (default: CPU count)
+    """
     frames = quicksort(arr.copy())
+    
+    # Save through the parallel exporter, or show the animation
+    if save_path:
+        export_trace(frames, save_path, fps=2, workers=workers, renderer_cls=QuickSortRenderer)
+        return
+    
+    fig = plt.figure(figsize=(12, 10))
+    bars, text = build_plot(fig, arr)
+    
+    # Create animation
     anim = FuncAnimation(fig, update_plot, frames=frames, 
                         fargs=(bars, text, None), 
                         interval=800, repeat=False, 
                         cache_frame_data=False)
-    
-    # Save or show the animation
-    if save_path:
-        anim.save(save_path, writer='pillow', fps=2)
-    else:
-        plt.tight_layout()
-        plt.show()
+    plt.tight_layout()
+    plt.show()
 
 if __name__ == "__main__":
     # Example usage
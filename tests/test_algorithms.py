@@ -1,8 +1,59 @@
+import collections
+import inspect
+import random
+import sys
 import unittest
-from algorithms.bubble_sort import bubble_sort
-from algorithms.insertion_sort import insertion_sort
-from algorithms.selection_sort import selection_sort
-from algorithms.binary_search import binary_search
+from algorithms.bubble_sort import bubble_sort, bubble_sort_stats
+from algorithms.insertion_sort import insertion_sort, insertion_sort_stats
+from algorithms.selection_sort import selection_sort, selection_sort_stats
+from algorithms.merge_sort import _merge, merge_sort, merge_sort_stats
+from algorithms.binary_search import batch_binary_search, binary_search
+from algorithms.bfs_pathfinding import bfs_pathfinding
+from algorithms.dijkstra_pathfinding import dijkstra_pathfinding
+from algorithms.astar_pathfinding import astar_pathfinding
+from quick_sort_visualization import quicksort
+from utils.algo_interface import count_ops
+from utils.frame import Frame, MERGED, parse_granularity
+from utils.trace import DeltaTrace
+
+
+# Recursive references for the explicit-stack generators
+def _recursive_merge_sort(a, left, right):
+    if left >= right:
+        return
+    mid = (left + right) // 2
+    yield from _recursive_merge_sort(a, left, mid)
+    yield from _recursive_merge_sort(a, mid + 1, right)
+    yield from _merge(a, left, mid, right)
+    yield Frame(a.copy(), (), MERGED, (left, right))
+
+
+def _recursive_quicksort(arr, start, end):
+    if start >= end:
+        return
+    pivot_idx = random.randint(start, end)
+    arr[start], arr[pivot_idx] = arr[pivot_idx], arr[start]
+    pivot_idx = start
+    pivot_val = arr[pivot_idx]
+    left, right = start + 1, end
+    yield arr.copy(), pivot_idx, left, right, start, end, "Starting new partition"
+    while left <= right:
+        while left <= right and arr[left] <= pivot_val:
+            yield arr.copy(), pivot_idx, left, right, start, end, "Moving left pointer"
+            left += 1
+        while left <= right and arr[right] >= pivot_val:
+            yield arr.copy(), pivot_idx, left, right, start, end, "Moving right pointer"
+            right -= 1
+        if left <= right:
+            arr[left], arr[right] = arr[right], arr[left]
+            yield arr.copy(), pivot_idx, left, right, start, end, f"Swapped {arr[right]} and {arr[left]}"
+            left += 1
+            right -= 1
+    arr[pivot_idx], arr[right] = arr[right], arr[pivot_idx]
+    pivot_idx = right
+    yield arr.copy(), pivot_idx, left, right, start, end, "Pivot in final position"
+    yield from _recursive_quicksort(arr, start, pivot_idx - 1)
+    yield from _recursive_quicksort(arr, pivot_idx + 1, end)
 
 
 class TestAlgorithms(unittest.TestCase):
@@ -28,6 +79,105 @@ class TestAlgorithms(unittest.TestCase):
         # last 'found' frame has info 'found'
         self.assertTrue(any(f['info']=='found' for f in frames))
 
+    def test_binary_search_shares_one_array(self):
+        arr = [1, 2, 3, 4, 5]
+        frames = list(binary_search(arr, 4))
+        self.assertEqual(len({id(f['state']) for f in frames}), 1)
+        self.assertIsNot(frames[0]['state'], arr)
+
+    def test_batch_binary_search_matches_single_searches(self):
+        rng = random.Random(5)
+        for n in (0, 1, 2, 10, 57):
+            arr = sorted(rng.randint(0, n // 2 + 1) for _ in range(n))
+            targets = [rng.randint(-2, n // 2 + 3) for _ in range(200)]
+            result = batch_binary_search(arr, targets)
+            heat = [0] * n
+            for k, target in enumerate(targets):
+                checks = [f['highlight'][0] for f in binary_search(arr, target) if f['info'].startswith('check')]
+                for idx in checks:
+                    heat[idx] += 1
+                self.assertEqual(result.probes[k], len(checks), (arr, target))
+                if target in arr:
+                    self.assertEqual(result.index[k], arr.index(target))
+                else:
+                    self.assertEqual(result.index[k], -1)
+            self.assertEqual(result.heat.tolist(), heat)
+            self.assertEqual(result.depth_counts().sum(), len(targets))
+
+    def test_stats_match_trace_counts(self):
+        rng = random.Random(7)
+        pairs = [(bubble_sort, bubble_sort_stats), (insertion_sort, insertion_sort_stats),
+                 (selection_sort, selection_sort_stats), (merge_sort, merge_sort_stats)]
+        for n in (0, 1, 2, 9, 25):
+            arr = [rng.randint(0, 9) for _ in range(n)]
+            for gen_fn, stats_fn in pairs:
+                stats = stats_fn(arr)
+                self.assertGreaterEqual(stats.pop('seconds'), 0)
+                self.assertEqual(stats, count_ops(gen_fn(arr)), (gen_fn.__name__, arr))
+
+    def test_iterative_sorts_match_recursive_frames(self):
+        rng = random.Random(3)
+        for n in (0, 1, 2, 7, 30):
+            arr = [rng.randint(0, 9) for _ in range(n)]
+            self.assertEqual(list(merge_sort(arr)), list(_recursive_merge_sort(arr.copy(), 0, n - 1)))
+            random.seed(n)
+            expected = list(_recursive_quicksort(arr.copy(), 0, n - 1))
+            random.seed(n)
+            self.assertEqual(list(quicksort(arr.copy())), expected)
+        # All-equal input partitions worst-case, 300 levels deep; the
+        # explicit stack does not need them under a tight recursion limit
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack()) + 50)
+        try:
+            last = collections.deque(quicksort([1] * 300), maxlen=1)[0]
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertEqual(last[0], [1] * 300)
+
+    def test_granularity_levels(self):
+        rng = random.Random(11)
+        arr = [rng.randint(0, 50) for _ in range(40)]
+        for sort in (bubble_sort, insertion_sort, selection_sort, merge_sort):
+            full = len(list(sort(arr)))
+            for granularity in ("mutations", "passes", 7):
+                frames = list(sort(arr, granularity))
+                self.assertEqual(frames[-1]['state'], sorted(arr), (sort.__name__, granularity))
+                self.assertLess(len(frames), full, (sort.__name__, granularity))
+                if granularity == "mutations":
+                    self.assertFalse(any(f.op and f.op[0] == "compare" for f in frames))
+                # Dropped writes must not break delta replay
+                trace = DeltaTrace.record(iter(frames), keyframe_interval=1000)
+                self.assertEqual([f['state'] for f in trace], [f['state'] for f in frames])
+        probes = list(binary_search(list(range(100)), 77, "passes"))
+        self.assertEqual(probes[-1]['info'], 'found')
+        self.assertFalse(any(f['info'].startswith('check') for f in probes))
+        self.assertEqual(parse_granularity("1"), "all")
+        self.assertEqual(parse_granularity("25"), 25)
+        for bad in ("sometimes", 0, -3):
+            with self.assertRaises(ValueError):
+                parse_granularity(bad)
+
+    def test_bfs_pathfinding(self):
+        grid = [[0, 0, 0],
+                [1, 1, 0],
+                [0, 0, 0]]
+        frames = list(bfs_pathfinding(grid, (0, 0), (2, 0)))
+        self.assertEqual(frames[-1]['info'], 'goal')
+        self.assertEqual(frames[-1]['highlight'], [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0)])
+        visited = [cell for f in frames for cell in f['visited']]
+        self.assertEqual(len(visited), len(set(visited)))
+        self.assertEqual(list(bfs_pathfinding([[0, 1], [1, 0]], (0, 0), (1, 1)))[-1]['info'], 'not found')
+
+    def test_weighted_pathfinding_finds_cheapest_path(self):
+        grid = [[0] * 4 for _ in range(4)]
+        weights = [[1, 9, 1, 1],
+                   [1, 9, 1, 9],
+                   [1, 1, 1, 9],
+                   [9, 9, 1, 1]]
+        for search in (dijkstra_pathfinding, astar_pathfinding):
+            path = list(search(grid, (0, 0), (3, 3), weights))[-1]['highlight']
+            self.assertEqual(sum(weights[r][c] for r, c in path[1:]), 6, search.__name__)
+
 
 if __name__ == '__main__':
     unittest.main()
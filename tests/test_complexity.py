@@ -0,0 +1,58 @@
+import math
+import unittest
+
+from benchmarks.complexity import fit, known_violations, measure_case, violations
+
+SIZES = [64, 128, 256, 512, 1024]
+
+
+class TestComplexityFit(unittest.TestCase):
+    def test_picks_the_generating_model(self):
+        cases = {
+            "log n": [3 * math.log2(n) for n in SIZES],
+            "n": [5 * n + 20 for n in SIZES],
+            "n log n": [n * math.log2(n) for n in SIZES],
+            "n^2": [n * (n - 1) / 2 for n in SIZES],
+        }
+        for model, values in cases.items():
+            result = fit(SIZES, values)
+            self.assertEqual(result["model"], model)
+            self.assertGreater(result["confidence"], 0.9, model)
+        self.assertAlmostEqual(fit(SIZES, cases["n^2"])["exponent"], 2.0, delta=0.02)
+        self.assertIsNone(fit(SIZES[:2], [1, 2]))
+
+    def test_flags_fits_faster_than_the_claim(self):
+        quadratic = fit(SIZES, [n * n for n in SIZES])
+        report = {"results": {
+            "Merge Sort|random": {"claim": "O(n log n)", "ops": quadratic, "seconds": None},
+            "Bubble Sort|random": {"claim": "O(n^2)", "ops": quadratic, "seconds": None},
+            # Best cases below the claim are fine
+            "Insertion Sort|sorted": {"claim": "O(n^2)", "ops": fit(SIZES, SIZES), "seconds": None},
+        }}
+        found = violations(report)
+        self.assertEqual(len(found), 1)
+        self.assertTrue(found[0].startswith("Merge Sort|random ops: fits n^2"))
+
+    def test_known_exceptions_are_reported_without_failing(self):
+        quadratic = fit(SIZES, [n * n for n in SIZES])
+        report = {"results": {
+            "Quick Sort|few-unique": {"claim": "O(n log n)", "ops": quadratic, "seconds": None},
+            "Quick Sort|random": {"claim": "O(n log n)", "ops": quadratic, "seconds": None},
+        }}
+        known = {("Quick Sort", "few-unique"): "equal keys"}
+        self.assertEqual(violations(report, known=known), [violations(report)[1]])
+        found = known_violations(report, known=known)
+        self.assertEqual(len(found), 1)
+        self.assertTrue(found[0].startswith("Quick Sort|few-unique ops: fits n^2"))
+        self.assertTrue(found[0].endswith("(equal keys)"))
+
+    def test_measure_case_counts_ops(self):
+        result = measure_case("Bubble Sort", "reversed", 20)
+        self.assertEqual(result["comparisons"], 190)
+        self.assertEqual(result["ops"], 380)
+        self.assertGreater(result["seconds"], 0)
+        self.assertGreater(measure_case("Quick Sort", "random", 20)["ops"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from algorithms.insertion_sort import insertion_sort
+from utils.draw_helpers import BarFigure, EnvelopeFigure, FrameRenderer, column_envelope
+from utils.trace import DeltaTrace
+
+
+class TestBarFigure(unittest.TestCase):
+    def test_update_reuses_artists(self):
+        renderer = BarFigure([3, 1, 2], bar_color='#000000', highlight_color='#ffffff')
+        bars = list(renderer.bars)
+        fig = renderer.update([1, 3, 2], (0, 1), 'swapped 0 & 1')
+        self.assertIs(fig, renderer.fig)
+        self.assertEqual(list(renderer.bars), bars)
+        self.assertEqual([b.get_height() for b in bars], [1, 3, 2])
+        self.assertEqual(renderer.labels[0].get_text(), '1')
+        self.assertEqual(renderer.title.get_text(), 'swapped 0 & 1')
+        renderer.update([1, 3, 2], (2,), '')
+        self.assertEqual(matplotlib.colors.to_hex(bars[0].get_facecolor()), '#000000')
+        self.assertEqual(matplotlib.colors.to_hex(bars[2].get_facecolor()), '#ffffff')
+
+
+class TestEnvelopeFigure(unittest.TestCase):
+    def test_column_envelope(self):
+        lo, hi = column_envelope([5, 1, 7, 3, 2, 9], 3)
+        self.assertEqual(lo.tolist(), [1, 3, 2])
+        self.assertEqual(hi.tolist(), [5, 7, 9])
+
+    def test_incremental_update_matches_full(self):
+        state = list(np.random.RandomState(0).randint(0, 1000, 5000))
+        incremental = EnvelopeFigure(state, columns=100, rows=50)
+        state[10], state[4000] = state[4000], state[10]
+        incremental.update(state, (10, 4000), 'swap', changed=(10, 4000))
+        full = EnvelopeFigure(state, columns=100, rows=50)
+        full.update(state, (10, 4000), 'swap')
+        self.assertTrue(np.array_equal(incremental.image.get_array(), full.image.get_array()))
+        self.assertEqual(incremental.image.get_array().shape, (50, 100, 3))
+
+
+class TestFrameRenderer(unittest.TestCase):
+    def test_consecutive_frames_update_only_written_columns(self):
+        arr = list(np.random.RandomState(1).randint(0, 100, 120))
+        for granularity in ('all', 3):
+            trace = DeltaTrace.record(insertion_sort(arr, granularity=granularity))
+            renderer = FrameRenderer(trace[0]['state'])
+            calls = []
+            update = renderer.figure.update
+            renderer.figure.update = lambda *args, **kwargs: calls.append(kwargs.get('changed')) or update(*args, **kwargs)
+            # Play forward, then seek back and forward again
+            order = list(range(40)) + [5, 6, 7, 30, 31]
+            for i in order:
+                image = renderer.render(trace[i], i).axes[0].images[0].get_array()
+                expected = FrameRenderer(trace[0]['state']).render(trace[i]).axes[0].images[0].get_array()
+                self.assertTrue(np.array_equal(image, expected), (granularity, i))
+            for k, (prev, i) in enumerate(zip([None] + order, order)):
+                follows = prev is not None and i == prev + 1 and trace[i]['op'] is not None
+                self.assertEqual(calls[k] is not None, follows, (granularity, i))
+            self.assertTrue(any(calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+from algorithms.bubble_sort import bubble_sort
+from utils.export import export_trace
+
+
+def read_gif(path):
+    im = Image.open(path)
+    frames = []
+    for i in range(im.n_frames):
+        im.seek(i)
+        frames.append(np.asarray(im.convert('RGB')))
+    return frames
+
+
+class TestExport(unittest.TestCase):
+    def test_gif_is_identical_serial_and_parallel(self):
+        arr = [3, 1, 2]
+        with tempfile.TemporaryDirectory() as tmp:
+            serial, parallel = os.path.join(tmp, 'a.gif'), os.path.join(tmp, 'b.gif')
+            count = export_trace(bubble_sort(arr), serial, workers=1, chunk_size=2, dpi=40)
+            self.assertEqual(count, len(list(bubble_sort(arr))))
+            export_trace(bubble_sort(arr), parallel, workers=2, chunk_size=2, max_in_flight=2, dpi=40)
+            a, b = read_gif(serial), read_gif(parallel)
+            self.assertEqual(len(a), count)
+            self.assertEqual(len(a), len(b))
+            for x, y in zip(a, b):
+                self.assertTrue(np.array_equal(x, y))
+
+    def test_serial_exports_do_not_share_bars(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for arr in ([3, 1, 2], [5, 4, 3, 2, 1, 0], [2, 1]):
+                path = os.path.join(tmp, f'{len(arr)}.gif')
+                export_trace(bubble_sort(arr), path, workers=1, chunk_size=4, dpi=40)
+                fresh = os.path.join(tmp, 'fresh.gif')
+                export_trace(bubble_sort(arr), fresh, workers=2, chunk_size=4, dpi=40)
+                for x, y in zip(read_gif(path), read_gif(fresh)):
+                    self.assertTrue(np.array_equal(x, y), arr)
+
+    def test_failed_export_leaves_no_file(self):
+        def failing():
+            yield from bubble_sort([3, 1, 2])
+            raise RuntimeError("generator failed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'broken.gif')
+            with self.assertRaises(RuntimeError):
+                export_trace(failing(), path, workers=1, chunk_size=2, dpi=40)
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
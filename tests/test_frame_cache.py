@@ -0,0 +1,57 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+
+from algorithms.bubble_sort import bubble_sort
+from utils.draw_helpers import FrameRenderer
+from utils.frame_cache import FrameImageCache
+
+
+class TestFrameImageCache(unittest.TestCase):
+    def setUp(self):
+        self.frames = list(bubble_sort([4, 1, 3, 2]))
+        self.state = self.frames[0]['state']
+
+    def make_renderer(self):
+        return FrameRenderer(self.state)
+
+    def test_render_then_hit(self):
+        cache = FrameImageCache(self.make_renderer)
+        self.assertIsNone(cache.get(2))
+        image = cache.render(2, self.frames[2])
+        self.assertTrue(image.startswith(b"\x89PNG"))
+        self.assertIs(cache.get(2), image)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        probe = FrameImageCache(self.make_renderer)
+        size = len(probe.render(0, self.frames[0]))
+        cache = FrameImageCache(self.make_renderer, max_bytes=int(size * 2.5))
+        for i in range(3):
+            cache.render(i, self.frames[i])
+            if i == 1:
+                cache.get(0)  # 0 is now more recent than 1
+        self.assertIn(0, cache)
+        self.assertNotIn(1, cache)
+        self.assertIn(2, cache)
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_prefetch_matches_direct_render(self):
+        direct = FrameImageCache(self.make_renderer)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            cache = FrameImageCache(self.make_renderer, executor=pool)
+            self.assertEqual(cache.prefetch(enumerate(self.frames[:6])), 6)
+            self.assertEqual(cache.prefetch(enumerate(self.frames[:6])), 0)
+            for i in range(6):
+                self.assertEqual(cache.get(i), direct.render(i, self.frames[i]))
+        self.assertEqual(cache.stats()["prefetched"], 6)
+        self.assertEqual(cache.wanted(range(8)), [6, 7])
+        cache.close()
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
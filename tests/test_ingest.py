@@ -0,0 +1,68 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from utils.ingest import DISTRIBUTIONS, MAX_SIZE, generate, load_csv, load_file, load_npy, parse_text
+
+
+class TestIngest(unittest.TestCase):
+    def test_parse_text(self):
+        self.assertEqual(parse_text("5, 2,4 ,1,3").tolist(), [5, 2, 4, 1, 3])
+        # Empty items are skipped, as the old parser did
+        self.assertEqual(parse_text("5,,2,").tolist(), [5, 2])
+        self.assertEqual(parse_text("").tolist(), [])
+        self.assertEqual(parse_text(" ").tolist(), [])
+        self.assertEqual(parse_text("5, ,3").tolist(), [5, 3])
+        self.assertEqual(parse_text("-5,+3\n7").tolist(), [-5, 3, 7])
+        self.assertEqual(parse_text("9223372036854775807").tolist(), [2 ** 63 - 1])
+        # NumPy's own parser reads these as 0 or clamps them
+        for bad in ("1,a", "1.5,2", "-", "5,-,3", "99999999999999999999", "-9223372036854775809"):
+            with self.assertRaises(ValueError):
+                parse_text(bad)
+
+    def test_load_csv(self):
+        self.assertEqual(load_csv(b"value\n3\n-1\n2\n").tolist(), [3, -1, 2])
+        self.assertEqual(load_csv(b"4,5,6\n").tolist(), [4, 5, 6])
+        self.assertEqual(load_csv(io.BytesIO(b"a,b\n1,10\n2,20\n"), column=1).tolist(), [10, 20])
+
+    def test_load_npy(self):
+        values = generate("random", 1000, seed=1)
+        buf = io.BytesIO()
+        np.save(buf, values)
+        loaded = load_npy(buf.getvalue())
+        self.assertTrue(np.array_equal(loaded, values))
+        self.assertIsNotNone(loaded.base)  # a view of the uploaded bytes
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "values.npy")
+            np.save(path, values)
+            mapped = load_file(path)
+            self.assertTrue(np.array_equal(mapped, values))
+            self.assertFalse(mapped.flags.writeable)
+            np.save(path, np.array([[1.0, 2.0, 3.0]]))
+            self.assertEqual(load_file(path).tolist(), [1, 2, 3])
+            np.save(path, np.array([1.5]))
+            with self.assertRaises(ValueError):
+                load_file(path)
+
+    def test_generate(self):
+        for distribution in DISTRIBUTIONS:
+            values = generate(distribution, 500, seed=7)
+            self.assertEqual(len(values), 500)
+            self.assertTrue(np.array_equal(values, generate(distribution, 500, seed=7)), distribution)
+        self.assertTrue(np.all(np.diff(generate("sorted", 500)) >= 0))
+        self.assertTrue(np.all(np.diff(generate("reversed", 500)) <= 0))
+        nearly = generate("nearly-sorted", 500)
+        self.assertFalse(np.all(np.diff(nearly) >= 0))
+        self.assertGreater(np.mean(np.diff(nearly) >= 0), 0.9)
+        self.assertLessEqual(len(np.unique(generate("few-unique", 500))), 4)
+        with self.assertRaises(ValueError):
+            generate("random", MAX_SIZE + 1)
+        with self.assertRaises(ValueError):
+            generate("zigzag", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
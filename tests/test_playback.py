@@ -0,0 +1,38 @@
+import unittest
+
+from utils.playback import PlaybackClock
+
+
+class TestPlaybackClock(unittest.TestCase):
+    def test_deadlines_absorb_render_time(self):
+        clock = PlaybackClock()
+        clock.start(0, fps=10, now=100.0)
+        # Ticks land late by varying render times, but never drift
+        shown = [clock.tick(now=100.0 + k * 0.1 + 0.03) for k in range(1, 11)]
+        self.assertEqual(shown, list(range(1, 11)))
+        self.assertEqual(clock.dropped, 0)
+        self.assertAlmostEqual(clock.achieved_fps(now=101.0), 10.0)
+
+    def test_late_ticks_skip_frames(self):
+        clock = PlaybackClock()
+        clock.start(5, fps=16, now=0.0)
+        self.assertEqual(clock.tick(now=0.25), 9)
+        self.assertEqual(clock.tick(now=0.5), 13)
+        self.assertEqual(clock.dropped, 6)
+        self.assertEqual(clock.shown, 2)
+        self.assertEqual(clock.stride(), 4)
+        # Capped by the frames that exist; the clock keeps its schedule
+        self.assertEqual(clock.tick(limit=14, now=1.0), 14)
+        self.assertEqual(clock.tick(now=1.0), 21)
+
+    def test_speed_change_keeps_position(self):
+        clock = PlaybackClock()
+        clock.start(0, fps=2, now=0.0)
+        self.assertEqual(clock.tick(now=2.0), 4)
+        clock.set_fps(8, now=2.0)
+        self.assertEqual(clock.due(now=2.1), 4)
+        self.assertEqual(clock.tick(now=2.5), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
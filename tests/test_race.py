@@ -0,0 +1,52 @@
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from algorithms.bubble_sort import bubble_sort
+from algorithms.merge_sort import merge_sort
+from utils.algo_interface import count_ops
+from utils.draw_helpers import RaceFigure
+from utils.race import RaceTrace, record_race
+
+
+class TestRace(unittest.TestCase):
+    def test_parallel_race_matches_serial(self):
+        arr = [5, 3, 8, 1, 9, 2]
+        names = ['Bubble Sort', 'Merge Sort']
+        serial = record_race(names, arr, workers=1)
+        parallel = record_race(names, arr, workers=2, min_size=0)
+        self.assertEqual(list(parallel), names)
+        for name, gen_fn in zip(names, (bubble_sort, merge_sort)):
+            self.assertGreaterEqual(parallel[name].pop('seconds'), 0)
+            serial[name].pop('seconds')
+            self.assertEqual(list(parallel[name].pop('trace')), list(serial[name].pop('trace')))
+            self.assertEqual(parallel[name], count_ops(gen_fn(arr)))
+
+    def test_races_reuse_the_callers_pool_above_the_size_threshold(self):
+        class NoPool:
+            def submit(self, *args):
+                raise AssertionError('small races should not use the pool')
+
+        names = ['Bubble Sort', 'Merge Sort']
+        self.assertEqual(list(record_race(names, [3, 1, 2], workers=2, pool=NoPool())), names)
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn')) as pool:
+            for arr in ([5, 3, 8, 1], [2, 7, 1, 8, 2, 8]):
+                results = record_race(names, arr, workers=2, pool=pool, min_size=0)
+                self.assertEqual([list(r['trace'])[-1]['state'] for r in results.values()], [sorted(arr)] * 2)
+
+    def test_race_trace_holds_finished_panels(self):
+        arr = [4, 3, 2, 1]
+        results = record_race(['Bubble Sort', 'Merge Sort'], arr, workers=1)
+        race = RaceTrace({name: r['trace'] for name, r in results.items()})
+        longest = max(len(r['trace']) for r in results.values())
+        self.assertEqual(len(race), longest)
+        self.assertFalse(race.has(longest))
+        last = race[-1]
+        self.assertEqual([p['state'] for p in last['panels']], [[1, 2, 3, 4]] * 2)
+        self.assertIn('2/2 finished', last['info'])
+        fig = RaceFigure(race.names, arr).update(last['panels'])
+        self.assertEqual(len(fig.axes), 2)
+        self.assertTrue(fig.axes[1].get_title().startswith('Merge Sort: '))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import unittest
+from utils.algo_interface import ALGOS
+from utils.registry import Registry, default_registry, read_metadata
+
+PLUGIN = '''
+import json
+ALGORITHM = {"name": "Plugin Sort", "entry": "plugin_sort", "category": "sorting", "complexity": "O(1)"}
+IMPORTS = 0
+IMPORTS += 1
+
+def plugin_sort(arr):
+    yield {"state": sorted(arr), "highlight": (), "info": "done"}
+'''
+
+
+class TestRegistry(unittest.TestCase):
+    def test_builtin_metadata(self):
+        registry = default_registry()
+        self.assertEqual(registry.names(category='sorting'), list(ALGOS))
+        self.assertEqual(set(ALGOS), {'Bubble Sort', 'Insertion Sort', 'Selection Sort', 'Merge Sort'})
+        spec = registry.get('Binary Search')
+        self.assertEqual((spec.category, spec.complexity), ('search', 'O(log n)'))
+        self.assertIn('BFS Pathfinding', registry.names(category='pathfinding'))
+        self.assertEqual(registry.get('Merge Sort').load_stats().__name__, 'merge_sort_stats')
+
+    def test_discovery_does_not_import(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pkg = os.path.join(tmp, 'fake_algos')
+            os.mkdir(pkg)
+            with open(os.path.join(pkg, 'plugin_sort.py'), 'w') as f:
+                f.write(PLUGIN)
+            with open(os.path.join(pkg, 'no_metadata.py'), 'w') as f:
+                f.write('raise RuntimeError("must not be imported")\n')
+            sys.path.insert(0, tmp)
+            self.addCleanup(sys.path.remove, tmp)
+            self.addCleanup(lambda: [sys.modules.pop(m, None) for m in ('fake_algos', 'fake_algos.plugin_sort')])
+
+            self.assertEqual(read_metadata(os.path.join(pkg, 'plugin_sort.py'))['complexity'], 'O(1)')
+            registry = Registry()
+            registry.discover_package(pkg, 'fake_algos')
+            self.assertEqual(registry.names(), ['Plugin Sort'])
+            self.assertNotIn('fake_algos.plugin_sort', sys.modules)
+            funcs = registry.functions()
+            self.assertEqual(list(funcs['Plugin Sort']([3, 1, 2]))[-1]['state'], [1, 2, 3])
+            # The plugin takes no granularity; callers pass it anyway
+            frames = list(funcs['Plugin Sort']([3, 1, 2], granularity=2))
+            self.assertEqual(frames[-1]['state'], [1, 2, 3])
+            self.assertEqual(sys.modules['fake_algos.plugin_sort'].IMPORTS, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from algorithms.bubble_sort import bubble_sort
+from utils.session_store import SessionStore
+from utils.trace import LazyTrace
+
+
+def finished(arr):
+    trace = LazyTrace(bubble_sort(arr), 8)
+    trace.fill_all()
+    return trace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.trace = finished([5, 2, 4, 1, 3])
+        self.size = self.trace.nbytes()
+
+    def test_evicts_idle_sessions_lru_first(self):
+        store = SessionStore(max_bytes=2 * self.size, idle_seconds=10, clock=self.clock)
+        store.put("a", self.trace)
+        store.put("b", finished([5, 2, 4, 1, 3]))
+        self.clock.now = 5
+        self.assertIs(store.get("a"), self.trace)  # "b" is now least recently used
+        store.put("c", finished([5, 2, 4, 1, 3]))
+        # Over budget, but nobody has been idle long enough
+        self.assertEqual(store.stats()["evictions"], 0)
+        self.clock.now = 30
+        store.put("d", finished([5, 2, 4, 1, 3]))
+        self.assertIsNone(store.get("b"))
+        self.assertIsNone(store.get("a"))
+        self.assertIsNotNone(store.get("c"))
+        stats = store.stats()
+        self.assertEqual((stats["evictions"], stats["drops"], stats["sessions"]), (2, 2, 2))
+        self.assertLessEqual(stats["bytes"], 2 * self.size)
+
+    def test_spills_finished_traces_and_drops_running_ones(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = SessionStore(max_bytes=self.size, spill_dir=spill_dir, idle_seconds=1, clock=self.clock)
+            running = LazyTrace(bubble_sort([3, 2, 1]), 8)
+            running.fill_to(2)
+            store.put("running", running)
+            store.put("done", self.trace)
+            self.clock.now = 5
+            store.put("new", finished([5, 2, 4, 1, 3]))
+            stats = store.stats()
+            self.assertEqual((stats["spills"], stats["drops"], stats["spilled"]), (1, 1, 1))
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+            self.assertIsNone(store.get("running"))
+            restored = store.get("done")
+            self.assertEqual([f['state'] for f in restored.trace], [f['state'] for f in self.trace.trace])
+            self.assertEqual(store.stats()["reloads"], 1)
+            self.assertEqual(os.listdir(spill_dir), [])
+
+    def test_growing_trace_is_reaccounted(self):
+        store = SessionStore(clock=self.clock)
+        trace = LazyTrace(bubble_sort(list(range(40, 0, -1))), 8)
+        trace.fill_to(10)
+        store.put("a", trace)
+        small = store.session_bytes("a")
+        trace.fill_all()
+        store.get("a")
+        self.assertGreater(store.session_bytes("a"), 10 * small)
+        self.assertEqual(store.session_bytes("a"), trace.nbytes())
+        store.discard("a")
+        self.assertEqual(store.stats()["bytes"], 0)
+
+    def test_shared_traces_are_free_until_their_owner_lets_go(self):
+        owned = {id(self.trace.trace)}
+        store = SessionStore(max_bytes=self.size, idle_seconds=1, clock=self.clock,
+                             shared=lambda t: id(t.trace) in owned)
+        for sid in "abc":
+            store.put(sid, self.trace)
+        self.clock.now = 5
+        store.put("d", finished([5, 2, 4, 1, 3]))
+        stats = store.stats()
+        self.assertEqual((stats["bytes"], stats["evictions"]), (self.size, 0))
+        owned.clear()
+        self.assertIs(store.get("a"), self.trace)
+        self.assertEqual(store.session_bytes("a"), self.size)
+
+    def test_expires_dead_sessions_and_their_spill_files(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = SessionStore(max_bytes=self.size, spill_dir=spill_dir, idle_seconds=1,
+                                 expire_seconds=100, clock=self.clock)
+            store.put("gone", self.trace)
+            self.clock.now = 5
+            store.put("live", finished([5, 2, 4, 1, 3]))
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+            self.clock.now = 200
+            store.put("live", store.get("live"))
+            self.assertEqual((store.stats()["sessions"], store.stats()["expired"]), (1, 1))
+            self.assertEqual(os.listdir(spill_dir), [])
+            self.assertIsNone(store.get("gone"))
+
+
+if __name__ == "__main__":
+    unittest.main()
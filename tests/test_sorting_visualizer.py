@@ -0,0 +1,50 @@
+import unittest
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from algorithms.bubble_sort import bubble_sort
+from utils.frame import frame_fields
+from visualizers.sorting_visualizer import BlitRenderer, visualize_sort
+
+
+class TestBlitRenderer(unittest.TestCase):
+    def test_blitted_frames_match_full_draw(self):
+        for n in (12, 2000):  # sparse bars, and bars narrower than a pixel
+            arr = list(np.random.RandomState(n).randint(1, 100, n))
+            renderer = BlitRenderer(arr, headless=True)
+            last = None
+            for _, frame in zip(range(60), bubble_sort(arr)):
+                last = frame_fields(frame)
+                renderer.update(*last)
+            fresh = BlitRenderer(last[0], headless=True)
+            fresh.update(*last)
+            self.assertTrue(np.array_equal(renderer.image(), fresh.image()), n)
+
+    def test_only_changed_bars_are_redrawn(self):
+        renderer = BlitRenderer([5, 4, 3, 2, 1] * 4, headless=True)
+        state = [5, 4, 3, 2, 1] * 4
+        self.assertEqual(renderer.update(state, (), 'same'), 0)
+        state[10], state[11] = state[11], state[10]
+        self.assertEqual(renderer.update(state, (10, 11), 'swapped'), 2)
+
+
+class TestVisualizeSort(unittest.TestCase):
+    def test_headless_throughput(self):
+        arr = [5, 2, 4, 1, 3, 9, 7]
+        stats = visualize_sort(bubble_sort(arr), arr, fps=None, headless=True)
+        self.assertEqual(stats['drawn'], stats['frames'])
+        self.assertEqual(stats['dropped'], 0)
+        self.assertGreater(stats['fps'], 0)
+
+    def test_fps_cap_skips_frames_but_shows_last(self):
+        arr = list(range(60, 0, -1))
+        renderer = BlitRenderer(arr, headless=True)
+        stats = visualize_sort(bubble_sort(arr), arr, fps=1, headless=True, renderer=renderer)
+        self.assertLess(stats['drawn'], 5)
+        self.assertEqual(stats['drawn'] + stats['dropped'], stats['frames'])
+        self.assertEqual(renderer.heights.tolist(), sorted(arr))
+
+
+if __name__ == "__main__":
+    unittest.main()
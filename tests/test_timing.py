@@ -0,0 +1,37 @@
+import json
+import unittest
+from utils.timing import Histogram, Timings
+
+
+class TestTiming(unittest.TestCase):
+    def test_histogram_percentiles(self):
+        hist = Histogram()
+        for ms in range(1, 1001):
+            hist.record(ms / 1000)
+        summary = hist.summary()
+        self.assertEqual(summary['count'], 1000)
+        self.assertAlmostEqual(summary['max_ms'], 1000)
+        self.assertAlmostEqual(summary['mean_ms'], 500.5)
+        # Log buckets are ~9% wide
+        self.assertAlmostEqual(summary['p50_ms'], 500, delta=50)
+        self.assertAlmostEqual(summary['p95_ms'], 950, delta=95)
+        self.assertEqual(Histogram().percentile(50), 0.0)
+
+    def test_phases_and_json(self):
+        timings = Timings()
+        with timings.phase('draw'):
+            pass
+        timings.record('encode', 0.25)
+        timings.record('encode', 0.5)
+        data = json.loads(timings.to_json())
+        self.assertEqual(list(data['phases']), ['draw', 'encode'])
+        self.assertEqual(data['phases']['encode']['count'], 2)
+        self.assertEqual(sum(data['phases']['encode']['buckets'].values()), 2)
+        off = Timings(enabled=False)
+        with off.phase('draw'):
+            off.record('encode', 1.0)
+        self.assertEqual(off.summary(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
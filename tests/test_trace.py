@@ -0,0 +1,61 @@
+import unittest
+from algorithms.bubble_sort import bubble_sort
+from algorithms.insertion_sort import insertion_sort
+from algorithms.selection_sort import selection_sort
+from algorithms.merge_sort import merge_sort
+from algorithms.binary_search import binary_search
+from utils.trace import DeltaTrace, LazyTrace
+
+
+class TestDeltaTrace(unittest.TestCase):
+    def assert_matches(self, gen_fn, arr, interval=4):
+        frames = list(gen_fn(arr))
+        trace = DeltaTrace.record(gen_fn(arr), keyframe_interval=interval)
+        self.assertEqual(len(trace), len(frames))
+        for i, frame in enumerate(frames):
+            self.assertEqual(trace[i]['state'], frame['state'])
+            self.assertEqual(trace[i]['info'], frame['info'])
+        self.assertEqual([f['state'] for f in trace], [f['state'] for f in frames])
+
+    def test_sorts_rebuild_every_frame(self):
+        arr = [5, 2, 9, 1, 5, 6, 3]
+        for gen_fn in (bubble_sort, insertion_sort, selection_sort, merge_sort):
+            self.assert_matches(gen_fn, arr)
+
+    def test_binary_search(self):
+        self.assert_matches(lambda a: binary_search(a, 4), [1, 2, 3, 4, 5])
+
+    def test_frames_without_ops_are_diffed(self):
+        frames = [{"state": [3, 1, 2]}, {"state": [1, 3, 2]}, {"state": [1, 2, 3]}]
+        trace = DeltaTrace.record(iter(frames), keyframe_interval=100)
+        self.assertEqual([trace[i]['state'] for i in range(3)], [f['state'] for f in frames])
+        self.assertEqual(trace[-1]['state'], [1, 2, 3])
+
+
+class TestLazyTrace(unittest.TestCase):
+    def test_pulls_only_requested_frames(self):
+        pulled = []
+
+        def gen():
+            for frame in bubble_sort([4, 3, 2, 1]):
+                pulled.append(frame)
+                yield frame
+
+        lazy = LazyTrace(gen(), keyframe_interval=2)
+        self.assertEqual(lazy[3]['state'], list(bubble_sort([4, 3, 2, 1]))[3]['state'])
+        self.assertEqual(len(pulled), 4)
+        self.assertIsNone(lazy.total)
+        self.assertEqual(lazy[1]['state'], pulled[1]['state'])
+        self.assertEqual(len(pulled), 4)
+
+    def test_runs_to_completion(self):
+        frames = list(insertion_sort([3, 1, 2]))
+        lazy = LazyTrace(insertion_sort([3, 1, 2]))
+        self.assertTrue(lazy.has(0))
+        self.assertFalse(lazy.has(len(frames)))
+        self.assertEqual(lazy.total, len(frames))
+        self.assertEqual(lazy[-1]['state'], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
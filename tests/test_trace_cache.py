@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from algorithms.bubble_sort import bubble_sort
+from algorithms.insertion_sort import insertion_sort
+from utils.trace import DeltaTrace
+from utils.trace_cache import TraceCache, make_key
+
+
+class TestTraceCache(unittest.TestCase):
+    def setUp(self):
+        self.trace = DeltaTrace.record(bubble_sort([3, 1, 2]))
+        self.size = self.trace.nbytes()
+
+    def test_key_depends_on_algorithm_input_and_target(self):
+        key = make_key("Bubble Sort", bubble_sort, [3, 1, 2])
+        self.assertEqual(key, make_key("Bubble Sort", bubble_sort, [3, 1, 2]))
+        self.assertNotEqual(key, make_key("Bubble Sort", bubble_sort, [3, 2, 1]))
+        self.assertNotEqual(key[1], make_key("Insertion Sort", insertion_sort, [3, 1, 2])[1])
+        self.assertNotEqual(key, make_key("Bubble Sort", bubble_sort, [3, 1, 2], target=1))
+
+    def test_lru_eviction_and_counters(self):
+        cache = TraceCache(max_bytes=2 * self.size)
+        cache.put("a", self.trace)
+        cache.put("b", self.trace)
+        self.assertIs(cache.get("a"), self.trace)
+        cache.put("c", self.trace)
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 1, 1))
+        self.assertEqual(stats["entries"], 2)
+
+    def test_spills_to_disk(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            cache = TraceCache(max_bytes=self.size, spill_dir=spill_dir)
+            cache.put("a", self.trace)
+            cache.put("b", self.trace)
+            restored = cache.get("a")
+            self.assertEqual([f['state'] for f in restored], [f['state'] for f in self.trace])
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import random
+import tempfile
+import unittest
+from algorithms.binary_search import binary_search
+from algorithms.insertion_sort import insertion_sort
+from algorithms.merge_sort import merge_sort
+from utils.trace import DeltaTrace
+from utils.trace_file import TraceFile, list_trace_files, record_file, resolve_trace_path
+
+
+def reset_frames(arr):
+    # Plain dict frames whose state changes without an op
+    a = list(arr)
+    yield {"state": list(a), "highlight": (), "info": "start"}
+    a.reverse()
+    yield {"state": list(a), "highlight": (0, len(a) - 1), "info": "reversed"}
+    a[0], a[1] = a[1], a[0]
+    yield {"state": list(a), "highlight": (0, 1), "info": "swap", "op": ("swap", 0, 1)}
+
+
+class TestTraceFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def roundtrip(self, make_gen, keyframe_interval=None):
+        path = os.path.join(self.tmp.name, 'trace.avtrace')
+        count = record_file(make_gen(), path, keyframe_interval)
+        expected = list(DeltaTrace.record(make_gen()))
+        self.assertEqual(count, len(expected))
+        trace = TraceFile(path)
+        self.addCleanup(trace.close)
+        return trace, expected
+
+    def test_random_access_matches_delta_trace(self):
+        rng = random.Random(5)
+        arr = [rng.randint(0, 50) for _ in range(40)]
+        for make_gen in (lambda: insertion_sort(arr), lambda: merge_sort(arr),
+                         lambda: binary_search(sorted(arr), arr[3]), lambda: reset_frames(arr)):
+            trace, expected = self.roundtrip(make_gen, keyframe_interval=7)
+            self.assertEqual(len(trace), len(expected))
+            for i in rng.sample(range(len(expected)), min(30, len(expected))) + [0, -1]:
+                self.assertEqual(trace[i], expected[i])
+            self.assertEqual(list(trace), expected)
+            self.assertEqual(list(trace.iter_range(3, None, 5)), expected[3::5])
+
+    def test_rejects_unfinished_file(self):
+        path = os.path.join(self.tmp.name, 'bad.avtrace')
+        with open(path, 'wb') as f:
+            f.write(b'not a trace')
+        with self.assertRaises(ValueError):
+            TraceFile(path)
+
+    def test_failed_recording_leaves_no_file(self):
+        def failing(arr):
+            yield from insertion_sort(arr)
+            raise RuntimeError('generator failed')
+
+        path = os.path.join(self.tmp.name, 'failed.avtrace')
+        with self.assertRaises(RuntimeError):
+            record_file(failing([3, 1, 2]), path)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(list_trace_files(self.tmp.name), [])
+
+    def test_resolves_only_trace_files_inside_the_directory(self):
+        record_file(insertion_sort([3, 1, 2]), os.path.join(self.tmp.name, 'ok.avtrace'))
+        open(os.path.join(self.tmp.name, 'notes.txt'), 'w').close()
+        elsewhere = tempfile.TemporaryDirectory()
+        self.addCleanup(elsewhere.cleanup)
+        outside = os.path.join(elsewhere.name, 'outside.avtrace')
+        record_file(insertion_sort([2, 1]), outside)
+        os.symlink(outside, os.path.join(self.tmp.name, 'link.avtrace'))
+        self.assertEqual(list_trace_files(self.tmp.name), ['ok.avtrace'])
+        self.assertEqual(resolve_trace_path(self.tmp.name, 'ok.avtrace'),
+                         os.path.join(os.path.realpath(self.tmp.name), 'ok.avtrace'))
+        for name in ('notes.txt', '../outside.avtrace', outside, 'link.avtrace', '/etc/passwd'):
+            with self.assertRaises(ValueError, msg=name):
+                resolve_trace_path(self.tmp.name, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import contextlib
+import io
+import json
+import unittest
+from algorithms.bubble_sort import bubble_sort
+from utils.registry import AlgorithmSpec, Registry
+from utils.trace import DeltaTrace
+from utils.trace_server import TraceServer, chunk_frames, serve
+
+ARR = [5, 2, 4, 1, 3]
+QUERY = "/trace?algo=Bubble%20Sort&array=5,2,4,1,3"
+
+
+def flaky_sort(arr, granularity="all"):
+    yield {"state": list(arr), "highlight": (), "info": "start"}
+    raise RuntimeError("flaky")
+
+
+def broken_open_trace(*args):
+    raise KeyError("boom")
+
+
+class TestTraceServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await serve(port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.expected = DeltaTrace.record(bubble_sort(list(ARR)))
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def get(self, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        data = await reader.read()
+        writer.close()
+        head, _, body = data.partition(b"\r\n\r\n")
+        status_line, *headers = head.decode().split("\r\n")
+        headers = dict(h.split(": ", 1) for h in headers)
+        return int(status_line.split()[1]), headers, [json.loads(line) for line in body.splitlines()]
+
+    async def test_streams_the_whole_run_then_serves_ranges_from_the_cache(self):
+        status, headers, lines = await self.get(QUERY)
+        self.assertEqual((status, headers["X-Trace-Cache"]), (200, "miss"))
+        self.assertEqual([line["state"] for line in lines], [f["state"] for f in self.expected])
+        self.assertEqual([line["info"] for line in lines], [f["info"] for f in self.expected])
+
+        status, headers, lines = await self.get(QUERY + "&from=3&to=7")
+        self.assertEqual(headers["X-Trace-Cache"], "hit")
+        self.assertEqual([line["i"] for line in lines], [3, 4, 5, 6])
+        self.assertEqual([line["state"] for line in lines], [self.expected[i]["state"] for i in range(3, 7)])
+
+    async def test_delta_encoding_replays_to_the_same_states(self):
+        _, _, lines = await self.get(QUERY + "&from=2&encoding=delta")
+        state = lines[0]["state"]
+        states = [list(state)]
+        for line in lines[1:]:
+            self.assertNotIn("state", line)
+            op = line["op"]
+            if op and op[0] == "s":
+                state[op[1]], state[op[2]] = state[op[2]], state[op[1]]
+            elif op and op[0] == "w":
+                state[op[1]] = op[2]
+            elif op:
+                state = list(op[1])
+            states.append(list(state))
+        self.assertEqual(states, [f["state"] for f in self.expected][2:])
+
+    async def test_concurrent_clients_share_one_run(self):
+        results = await asyncio.gather(*(self.get(QUERY + f"&from={k}") for k in range(8)))
+        self.assertEqual(sorted(r[1]["X-Trace-Cache"] for r in results).count("miss"), 1)
+        for k, (_, _, lines) in enumerate(results):
+            self.assertEqual(len(lines), len(self.expected) - k)
+
+    async def test_rejects_bad_requests(self):
+        for path in ("/trace?algo=Nope&array=1,2", QUERY + "&encoding=zip", QUERY + "&from=5&to=2",
+                     "/trace?algo=Binary%20Search&array=1,2,3", QUERY + "&target=2"):
+            status, _, lines = await self.get(path)
+            self.assertEqual(status, 400, path)
+            self.assertIn("error", lines[0])
+        self.assertEqual((await self.get("/missing"))[0], 404)
+        status, _, algorithms = await self.get("/algorithms")
+        self.assertIn("Bubble Sort", [a["name"] for a in algorithms[0]])
+
+    async def test_failed_runs_are_not_cached(self):
+        registry = Registry()
+        registry.add(AlgorithmSpec(__name__, {"name": "Flaky Sort", "entry": "flaky_sort", "category": "sorting"}))
+        server = TraceServer(registry=registry)
+        self.server.close()
+        self.server = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        for _ in range(2):
+            _, headers, lines = await self.get("/trace?algo=Flaky%20Sort&array=3,1,2")
+            self.assertEqual(headers["X-Trace-Cache"], "miss")
+            self.assertEqual(lines[-1], {"error": "RuntimeError: flaky"})
+        self.assertEqual(server.cache.stats()["entries"], 0)
+
+    async def test_unexpected_errors_answer_500(self):
+        server = TraceServer()
+        server.open_trace = broken_open_trace
+        self.server.close()
+        self.server = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        with contextlib.redirect_stderr(io.StringIO()):
+            status, _, lines = await self.get(QUERY)
+        self.assertEqual((status, lines), (500, [{"error": "KeyError: 'boom'"}]))
+        self.assertFalse(server._answered)
+
+    def test_chunks_shrink_with_the_input(self):
+        self.assertEqual(chunk_frames(5), 256)
+        self.assertEqual(chunk_frames(1_000_000), 1)
+        self.assertLessEqual(chunk_frames(10_000) * 10_000, 2 ** 18)
+
+
+if __name__ == "__main__":
+    unittest.main()
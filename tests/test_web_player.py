@@ -0,0 +1,40 @@
+import json
+import unittest
+from algorithms.merge_sort import merge_sort
+from algorithms.selection_sort import selection_sort
+from utils.trace import DeltaTrace
+from utils.web_player import trace_payload, render_player_html
+
+
+def replay(payload):
+    state = list(payload['initial'])
+    states = []
+    for op in payload['ops']:
+        if op and op[0] == 's':
+            state[op[1]], state[op[2]] = state[op[2]], state[op[1]]
+        elif op and op[0] == 'w':
+            state[op[1]] = op[2]
+        elif op and op[0] == 'k':
+            state = list(op[1])
+        states.append(list(state))
+    return states
+
+
+class TestWebPlayer(unittest.TestCase):
+    def test_payload_replays_to_same_states(self):
+        for gen_fn in (merge_sort, selection_sort):
+            frames = list(gen_fn([6, 2, 8, 1, 9, 3]))
+            payload = trace_payload(DeltaTrace.record(gen_fn([6, 2, 8, 1, 9, 3])))
+            self.assertEqual(replay(payload), [f['state'] for f in frames])
+            self.assertEqual(payload['info'], [f['info'] for f in frames])
+
+    def test_html_embeds_trace(self):
+        trace = DeltaTrace.record(iter([{"state": [2, 1]}, {"state": [1, 2]}]))
+        html = render_player_html(trace)
+        payload = json.dumps(trace_payload(trace), separators=(",", ":"))
+        self.assertIn(payload, html)
+        self.assertNotIn('__TRACE__', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,44 @@
 """Common interface helpers for algorithms"""
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Iterable, Optional, Tuple
+
+from utils.frame import Frame, GridFrame, frame_fields  # noqa: F401  (re-exported)
+from utils.registry import default_registry
+
+
+# Sorting algorithms offered by the web demo, keyed by display name. Built
+# from the registry's metadata; each module is imported on first lookup.
+ALGOS = default_registry().functions(category="sorting")
 
 
 def collect_generator(gen):
-    """Collect yields from a generator into a list and return final result when available."""
+    """Collect yields from a generator into a list and return final result when available.
+
+    Items are kept as yielded; :class:`Frame` objects stay compact and only
+    format their info when it is read.
+    """
     frames = []
-    result = None
     for item in gen:
         frames.append(item)
     return frames
+
+
+def count_ops(frames) -> Dict[str, int]:
+    """Tally the ops recorded in a frame trace.
+
+    Returns the same keys as the ``*_stats`` functions in ``algorithms/``
+    (without ``seconds``): ``comparisons``, ``swaps``, ``writes`` (single
+    element ``set`` ops) and ``frames``.
+    """
+    return tally_ops(frame.get("op") for frame in frames)
+
+
+def tally_ops(ops: Iterable[Optional[Tuple]]) -> Dict[str, int]:
+    """``count_ops`` over bare ops (one per frame, None for frames without one),
+    e.g. ``DeltaTrace.ops``."""
+    counts = {"comparisons": 0, "swaps": 0, "writes": 0, "frames": 0}
+    names = {"compare": "comparisons", "swap": "swaps", "set": "writes"}
+    for op in ops:
+        counts["frames"] += 1
+        if op is not None and op[0] in names:
+            counts[names[op[0]]] += 1
+    return counts
@@ -1,6 +1,14 @@
 """Minimal drawing helpers using matplotlib."""
-from typing import List, Dict, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib import colors as mpl_colors
+from matplotlib import style as mpl_style
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+
+from utils.frame import frame_fields
+from utils.trace import written_indices
 
 
 def draw_state(state: List[int], highlight=(), info: str = ""):
@@ -12,3 +20,330 @@ def draw_state(state: List[int], highlight=(), info: str = ""):
                 bars[idx].set_color('C1')
     plt.title(info)
     plt.pause(0.05)
+
+
+def is_bar_state(state) -> bool:
+    """True for flat lists of numbers, which are drawn as bar charts."""
+    return isinstance(state, (list, tuple)) and not (len(state) and isinstance(state[0], (list, tuple)))
+
+
+def draw_state_fig(state, highlight=(), info="", bar_color="#4C78A8", highlight_color="#EE994F"):
+    """Draws a bar chart with axis labels, title, and highlight indices."""
+    plt.style.use('seaborn-v0_8-darkgrid')
+    fig, ax = plt.subplots(figsize=(9, 4))
+    # If state is a grid (list of lists), flatten for now
+    if not is_bar_state(state):
+        # Fallback: show a simple text when non-list state
+        ax.text(0.5, 0.5, str(state), ha='center', va='center')
+        ax.set_xticks([])
+        ax.set_yticks([])
+    else:
+        # Updated colored bars: Replaced the gradient colors with a uniform color based on bar_color:
+        bars = ax.bar(range(len(state)), state, color=bar_color, edgecolor='black')
+
+        if highlight:
+            for idx in (highlight if isinstance(highlight, (list, tuple)) else [highlight]):
+                if isinstance(idx, int) and 0 <= idx < len(bars):
+                    bars[idx].set_color(highlight_color)
+        ax.set_xlabel('Index')
+        ax.set_ylabel('Value')
+        ax.set_xticks(range(len(state)))
+        ax.set_xlim(-0.5, max(len(state) - 0.5, 0.5))
+        ax.set_ylim(0, max(state) * 1.1 if state else 1)
+        # annotate bar values for clarity
+        for rect, val in zip(bars, state):
+            height = rect.get_height()
+            ax.annotate(f'{val}', xy=(rect.get_x() + rect.get_width() / 2, height),
+                        xytext=(0, 3), textcoords='offset points', ha='center', va='bottom', fontsize=8)
+    ax.set_title(info, fontsize=12)
+    plt.tight_layout()
+    return fig
+
+
+def draw_frame_fig(frame, bar_color="#4C78A8", highlight_color="#EE994F"):
+    """``draw_state_fig`` for a :class:`~utils.frame.Frame` or dict frame."""
+    state, highlight, info = frame_fields(frame)
+    return draw_state_fig(state, highlight, info, bar_color, highlight_color)
+
+
+class BarFigure:
+    """Bar chart whose figure, bars and value labels are built once per trace.
+
+    ``update`` only touches the bars whose value or highlight changed since
+    the previous frame, plus the title, so per-frame cost is a handful of
+    artist setters instead of a full figure rebuild. The figure is created
+    through the object-oriented API, so it needs no ``plt.close``.
+    """
+
+    def __init__(self, state: List[int], bar_color="#4C78A8", highlight_color="#EE994F",
+                 figsize=(9, 4), style='seaborn-v0_8-darkgrid', ax=None):
+        self.n = len(state)
+        self.bar_color = bar_color
+        self.highlight_color = highlight_color
+        self._values = list(state)
+        self._highlighted = set()
+        with mpl_style.context(style):
+            # With ``ax`` the chart is one panel of a figure the caller owns
+            own_figure = ax is None
+            self.fig = Figure(figsize=figsize) if own_figure else ax.figure
+            ax = self.ax = self.fig.add_subplot() if own_figure else ax
+            self.bars = ax.bar(range(self.n), state, color=bar_color, edgecolor='black')
+            self.labels = [
+                ax.annotate(f'{val}', xy=(i, val), xytext=(0, 3), textcoords='offset points',
+                            ha='center', va='bottom', fontsize=8)
+                for i, val in enumerate(state)
+            ]
+            ax.set_xlabel('Index')
+            ax.set_ylabel('Value')
+            ax.set_xticks(range(self.n))
+            ax.set_xlim(-0.5, max(self.n - 0.5, 0.5))
+            self._ymax = max(state) if state else 0
+            ax.set_ylim(0, self._ymax * 1.1 if self._ymax > 0 else 1)
+            # Lay out with a placeholder title so later titles have room
+            self.title = ax.set_title('Algorithm Step', fontsize=12)
+            if own_figure:
+                self.fig.tight_layout()
+
+    def set_colors(self, bar_color: str, highlight_color: str) -> None:
+        """Recolor every bar; only needed when the user picks new colors."""
+        if (bar_color, highlight_color) == (self.bar_color, self.highlight_color):
+            return
+        self.bar_color, self.highlight_color = bar_color, highlight_color
+        for i, rect in enumerate(self.bars):
+            rect.set_facecolor(highlight_color if i in self._highlighted else bar_color)
+
+    def update(self, state: List[int], highlight=(), info: str = "") -> Figure:
+        """Bring the figure to ``state`` and return it."""
+        values = self._values
+        for i, val in enumerate(state):
+            if val != values[i]:
+                values[i] = val
+                self.bars[i].set_height(val)
+                label = self.labels[i]
+                label.set_text(f'{val}')
+                label.xy = (i, val)
+                if val > self._ymax:
+                    self._ymax = val
+                    self.ax.set_ylim(0, val * 1.1)
+
+        if not isinstance(highlight, (list, tuple)):
+            highlight = [highlight]
+        wanted = {idx for idx in highlight if isinstance(idx, int) and 0 <= idx < self.n}
+        for idx in self._highlighted - wanted:
+            self.bars[idx].set_facecolor(self.bar_color)
+        for idx in wanted - self._highlighted:
+            self.bars[idx].set_facecolor(self.highlight_color)
+        self._highlighted = wanted
+
+        self.title.set_text(info)
+        return self.fig
+
+
+def column_envelope(values, columns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Split ``values`` into ``columns`` contiguous buckets and return each bucket's (min, max)."""
+    a = np.asarray(values)
+    columns = max(1, min(columns, len(a)))
+    edges = (np.arange(columns) * len(a)) // columns
+    return np.minimum.reduceat(a, edges), np.maximum.reduceat(a, edges)
+
+
+class EnvelopeFigure:
+    """Level-of-detail chart for arrays far too long for one bar per value.
+
+    The array is reduced to a min/max envelope with one bucket per pixel
+    column and rasterized into a single image artist, with highlighted
+    indices mapped onto their columns. Drawing cost depends on the image
+    size, not on ``n``; when the caller passes the indices that changed,
+    only their columns are recomputed. Same interface as :class:`BarFigure`.
+    """
+
+    def __init__(self, state, bar_color="#4C78A8", highlight_color="#EE994F",
+                 figsize=(9, 4), columns: int = 800, rows: int = 300, style='seaborn-v0_8-darkgrid',
+                 ax=None):
+        self.values = np.array(state)
+        self.n = len(self.values)
+        self.columns = max(1, min(columns, self.n))
+        self.rows = rows
+        self._edges = (np.arange(self.columns + 1) * self.n) // self.columns
+        self._lo, self._hi = column_envelope(self.values, self.columns)
+        self._vmin = min(0, int(self.values.min())) if self.n else 0
+        self._vmax = int(self.values.max()) if self.n else 1
+        self._highlighted = np.zeros(0, dtype=np.intp)
+        self._set_palette(bar_color, highlight_color)
+        with mpl_style.context(style):
+            own_figure = ax is None
+            self.fig = Figure(figsize=figsize) if own_figure else ax.figure
+            ax = self.ax = self.fig.add_subplot() if own_figure else ax
+            self.image = ax.imshow(self._raster(), origin='lower', aspect='auto', interpolation='nearest',
+                                   extent=(0, self.n, self._vmin, self._vmax * 1.1 if self._vmax > 0 else 1))
+            ax.set_xlabel('Index')
+            ax.set_ylabel('Value')
+            ax.grid(False)
+            self.title = ax.set_title('Algorithm Step', fontsize=12)
+            if own_figure:
+                self.fig.tight_layout()
+
+    def _set_palette(self, bar_color: str, highlight_color: str) -> None:
+        self.bar_color, self.highlight_color = bar_color, highlight_color
+        bar = np.array(mpl_colors.to_rgb(bar_color))
+        self._palette = (np.array([
+            (1.0, 1.0, 1.0),                      # background
+            bar * 0.5 + 0.5,                      # between bucket min and max
+            bar,                                  # below bucket min
+            mpl_colors.to_rgb(highlight_color),   # highlighted column
+        ]) * 255).astype(np.uint8)
+
+    def _raster(self) -> np.ndarray:
+        top = self._vmax * 1.1 if self._vmax > 0 else 1
+        scale = (self.rows - 1) / (top - self._vmin)
+        lo_px = ((self._lo - self._vmin) * scale).astype(np.intp)
+        hi_px = ((self._hi - self._vmin) * scale).astype(np.intp)
+        rows = np.arange(self.rows)[:, None]
+        codes = (rows <= hi_px).astype(np.uint8)
+        codes += rows <= lo_px
+        if len(self._highlighted):
+            cols = np.unique(self._highlighted * self.columns // self.n)
+            codes[:, cols] = np.where(codes[:, cols] > 0, 3, 0)
+        return self._palette[codes]
+
+    def set_colors(self, bar_color: str, highlight_color: str) -> None:
+        """Switch palette; takes effect on the next ``update``."""
+        if (bar_color, highlight_color) != (self.bar_color, self.highlight_color):
+            self._set_palette(bar_color, highlight_color)
+
+    def update(self, state, highlight=(), info: str = "", changed: Optional[Iterable[int]] = None) -> Figure:
+        """Bring the figure to ``state`` and return it.
+
+        With ``changed`` (indices written since the last update) only the
+        affected columns are refreshed; otherwise the whole envelope is.
+        """
+        if changed is None:
+            self.values = np.array(state)
+            self._lo, self._hi = column_envelope(self.values, self.columns)
+        else:
+            for idx in changed:
+                self.values[idx] = state[idx]
+                col = idx * self.columns // self.n
+                bucket = self.values[self._edges[col]:self._edges[col + 1]]
+                self._lo[col], self._hi[col] = bucket.min(), bucket.max()
+        if not isinstance(highlight, (list, tuple)):
+            highlight = [highlight]
+        self._highlighted = np.array([idx for idx in highlight if isinstance(idx, int) and 0 <= idx < self.n],
+                                     dtype=np.intp)
+        self.image.set_data(self._raster())
+        self.title.set_text(info)
+        return self.fig
+
+
+class RaceFigure:
+    """One figure with a panel per algorithm, for playing traces side by side.
+
+    Each panel is a :class:`BarFigure` (or an :class:`EnvelopeFigure` for
+    arrays longer than ``max_bars``) drawn into a shared figure, so a whole
+    race step is rendered and shipped as a single image.
+    """
+
+    def __init__(self, names: List[str], state, bar_color="#4C78A8", highlight_color="#EE994F",
+                 panel_height: float = 2.6, max_bars: int = 50, style='seaborn-v0_8-darkgrid'):
+        self.names = list(names)
+        self.n = len(state)
+        panel_cls = EnvelopeFigure if self.n > max_bars else BarFigure
+        with mpl_style.context(style):
+            self.fig = Figure(figsize=(9, panel_height * len(self.names)))
+            axes = self.fig.subplots(len(self.names), 1, squeeze=False)[:, 0]
+            self.panels = [panel_cls(state, bar_color, highlight_color, style=style, ax=ax) for ax in axes]
+            self.fig.tight_layout()
+        self._last: Optional[int] = None
+
+    def set_colors(self, bar_color: str, highlight_color: str) -> None:
+        for panel in self.panels:
+            panel.set_colors(bar_color, highlight_color)
+
+    def update(self, frames: List[Dict], index: Optional[int] = None) -> Figure:
+        """Show one frame per panel (in ``names`` order) and return the figure.
+
+        Envelope panels refresh only the written columns when ``index``
+        directly follows the last step shown.
+        """
+        for name, panel, frame in zip(self.names, self.panels, frames):
+            args = (frame["state"], frame.get("highlight", ()), f"{name}: {frame.get('info', '')}")
+            changed = None if isinstance(panel, BarFigure) else _changed_since(frame, index, self._last)
+            if changed is None:
+                panel.update(*args)
+            else:
+                panel.update(*args, changed=changed)
+        self._last = index
+        return self.fig
+
+    def render(self, frame: Dict, index: Optional[int] = None) -> Figure:
+        """Draw one :class:`~utils.race.RaceTrace` step."""
+        return self.update(frame["panels"], index)
+
+
+def _changed_since(frame, index: Optional[int], last: Optional[int]) -> Optional[Tuple]:
+    """Indices frame ``index`` wrote if it directly follows frame ``last``, else None.
+
+    Frames without an op (the first one, resyncs, plain dicts) may have
+    replaced the whole state, so they always get a full update.
+    """
+    op = frame.get("op")
+    if index is None or last is None or index != last + 1 or op is None:
+        return None
+    return written_indices(op)
+
+
+class FrameRenderer:
+    """Draws whole frames on a persistent :class:`BarFigure`, or an
+    :class:`EnvelopeFigure` for arrays longer than ``max_bars``.
+
+    Pass each frame's ``index`` to :meth:`render`: when it follows the last
+    frame drawn, an envelope refreshes only the columns that frame wrote.
+    """
+
+    def __init__(self, state, bar_color="#4C78A8", highlight_color="#EE994F", max_bars: int = 50):
+        figure_cls = EnvelopeFigure if len(state) > max_bars else BarFigure
+        self.figure = figure_cls(state, bar_color, highlight_color)
+        self._last: Optional[int] = None
+
+    def render(self, frame, index: Optional[int] = None) -> Figure:
+        state, highlight, info = frame_fields(frame)
+        changed = _changed_since(frame, index, self._last)
+        self._last = index
+        if changed is None or isinstance(self.figure, BarFigure):
+            # Bars diff the state themselves
+            return self.figure.update(state, highlight, info)
+        return self.figure.update(state, highlight, info, changed=changed)
+
+
+def draw_probe_heatmap_fig(heat, depth_counts, title: str = "", columns: int = 800,
+                           style='seaborn-v0_8-darkgrid') -> Figure:
+    """Aggregate view of a batched search: where probes landed and how deep queries went.
+
+    ``heat[i]`` is the number of probes at index ``i``; arrays wider than
+    ``columns`` are summed into that many buckets. ``depth_counts[d]`` is
+    the number of queries that took ``d`` probes.
+    """
+    heat = np.asarray(heat)
+    n = len(heat)
+    columns = max(1, min(columns, n))
+    edges = (np.arange(columns) * n) // columns
+    binned = np.add.reduceat(heat, edges) if n else np.zeros(1)
+    with mpl_style.context(style):
+        fig = Figure(figsize=(9, 4.5))
+        heat_ax, depth_ax = fig.subplots(2, 1, gridspec_kw={"height_ratios": [1, 1.4]})
+        # Log colors: the first midpoints take every query, the leaves a handful
+        cmap = plt.get_cmap('magma').with_extremes(bad='black')
+        image = heat_ax.imshow(np.ma.masked_less(binned[np.newaxis, :], 1), aspect='auto', cmap=cmap,
+                               norm=mpl_colors.LogNorm(vmin=1, vmax=max(1, binned.max())),
+                               interpolation='nearest', extent=(0, max(n, 1), 0, 1))
+        heat_ax.set_yticks([])
+        heat_ax.set_xlabel('Index' if columns == n else f'Index ({n // columns}+ per column)')
+        heat_ax.grid(False)
+        heat_ax.set_title(title, fontsize=12)
+        fig.colorbar(image, ax=heat_ax, label='Probes')
+        depth_ax.bar(range(len(depth_counts)), depth_counts, color="#4C78A8", edgecolor='black')
+        depth_ax.set_xlabel('Probes per query')
+        depth_ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+        depth_ax.set_ylabel('Queries')
+        fig.tight_layout()
+    return fig
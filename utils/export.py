@@ -0,0 +1,240 @@
+"""Parallel GIF/MP4 export for algorithm traces.
+
+Frames are rasterized with the Agg canvas in a process pool, in chunks, and
+handed to the encoder strictly in order. At most ``max_in_flight`` chunks are
+rendered or waiting at any time, so memory stays bounded however long the
+trace is.
+
+- GIF: workers also palettize and LZW-encode their frames, and the main
+  process only appends the bytes to the file.
+- MP4 (or GIF when ffmpeg is available and ``use_ffmpeg`` is set): raw RGB
+  frames are piped to an ``ffmpeg`` subprocess.
+
+Command line (from the repository root)::
+
+    python -m utils.export "Bubble Sort" --array 5,2,4,1,3 --out bubble.gif --fps 8
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import GifImagePlugin, Image
+
+from utils.draw_helpers import BarFigure
+from utils.frame import parse_granularity
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+class BarFrameRenderer:
+    """Default renderer: frame dicts drawn on a persistent :class:`BarFigure`."""
+
+    def __init__(self, first_frame: Dict, bar_color="#4C78A8", highlight_color="#EE994F", figsize=(9, 4)):
+        self.figure = BarFigure(first_frame["state"], bar_color, highlight_color, figsize=figsize)
+
+    def render(self, frame: Dict):
+        return self.figure.update(frame["state"], frame.get("highlight", ()), frame.get("info", ""))
+
+
+# Per-process renderer, built from the first frame a worker sees. It is keyed
+# by export, so the serial path never draws one export with the bars of another
+_renderer = None
+_renderer_spec = None
+_export_ids = count()
+
+
+def _rasterize(frames: List, renderer_cls, renderer_kwargs: Dict, dpi: int, export_id) -> List[np.ndarray]:
+    global _renderer, _renderer_spec
+    spec = (export_id, renderer_cls, tuple(sorted(renderer_kwargs.items())), dpi)
+    images = []
+    for frame in frames:
+        if _renderer is None or _renderer_spec != spec:
+            _renderer = renderer_cls(frame, **renderer_kwargs)
+            _renderer_spec = spec
+        fig = _renderer.render(frame)
+        if not isinstance(fig.canvas, FigureCanvasAgg):
+            FigureCanvasAgg(fig)
+        fig.set_dpi(dpi)
+        fig.canvas.draw()
+        images.append(np.asarray(fig.canvas.buffer_rgba())[..., :3].copy())
+    return images
+
+
+def _render_chunk(frames: List, fmt: str, fps: float, renderer_cls, renderer_kwargs: Dict,
+                  dpi: int, with_header: bool, export_id=None) -> Tuple[Optional[bytes], List[bytes], Tuple[int, int]]:
+    """Render one chunk; returns (GIF header or None, encoded frames, (width, height))."""
+    images = _rasterize(frames, renderer_cls, renderer_kwargs, dpi, export_id)
+    height, width = images[0].shape[:2]
+    if fmt != "gif":
+        return None, [img.tobytes() for img in images], (width, height)
+    duration = int(round(1000 / fps))
+    header = None
+    encoded = []
+    for img in images:
+        im = Image.fromarray(img).quantize(256)
+        if with_header and header is None:
+            parts, _ = GifImagePlugin.getheader(im, info={"loop": 0, "duration": duration})
+            header = b"".join(parts)
+        encoded.append(b"".join(GifImagePlugin.getdata(im, duration=duration, include_color_table=True)))
+    return header, encoded, (width, height)
+
+
+def _chunks(frames: Iterable, size: int) -> Iterator[List]:
+    it = iter(frames)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _FFmpegSink:
+    def __init__(self, path: str, fps: float, size: Tuple[int, int]):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg was not found on PATH; it is required for MP4 export")
+        width, height = size
+        cmd = [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+               "-s", f"{width}x{height}", "-r", str(fps), "-i", "-"]
+        if not path.lower().endswith(".gif"):
+            cmd += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", "-vcodec", "libx264"]
+        self.proc = subprocess.Popen(cmd + [path], stdin=subprocess.PIPE)
+
+    def write(self, data: bytes) -> None:
+        self.proc.stdin.write(data)
+
+    def close(self) -> None:
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.proc.returncode}")
+
+    def abort(self) -> None:
+        self.proc.kill()
+        self.proc.wait()
+        self.proc.stdin.close()
+
+
+def export_trace(frames: Iterable, path: str, fps: float = 10, workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_in_flight: Optional[int] = None,
+                 renderer_cls=BarFrameRenderer, renderer_kwargs: Optional[Dict] = None,
+                 dpi: int = 100, use_ffmpeg: bool = False) -> int:
+    """Render ``frames`` to a GIF or MP4 at ``path`` and return the frame count.
+
+    ``frames`` is any iterable of frames (a generator, ``DeltaTrace`` or
+    ``LazyTrace``); it is consumed lazily. ``renderer_cls(first_frame,
+    **renderer_kwargs)`` must be importable by the worker processes and
+    provide ``render(frame) -> Figure``. ``workers`` defaults to the CPU
+    count; with one worker everything runs in this process.
+    """
+    renderer_kwargs = renderer_kwargs or {}
+    fmt = "gif" if path.lower().endswith(".gif") and not use_ffmpeg else "raw"
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    count = 0
+    sink = None
+    out = None
+
+    def consume(result):
+        nonlocal count, sink, out
+        header, encoded, size = result
+        if fmt == "gif":
+            if out is None:
+                out = open(path, "wb")
+                out.write(header)
+            for data in encoded:
+                out.write(data)
+        else:
+            if sink is None:
+                sink = _FFmpegSink(path, fps, size)
+            for data in encoded:
+                sink.write(data)
+        count += len(encoded)
+
+    export_id = (os.getpid(), next(_export_ids))
+    first = True
+    done = False
+    try:
+        if workers == 1:
+            for chunk in _chunks(frames, chunk_size):
+                consume(_render_chunk(chunk, fmt, fps, renderer_cls, renderer_kwargs, dpi, first, export_id))
+                first = False
+        else:
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk in _chunks(frames, chunk_size):
+                    if len(pending) >= max_in_flight:
+                        # Oldest chunk first keeps output in order and bounds memory
+                        consume(pending.popleft().result())
+                    pending.append(pool.submit(_render_chunk, chunk, fmt, fps, renderer_cls,
+                                               renderer_kwargs, dpi, first, export_id))
+                    first = False
+                while pending:
+                    consume(pending.popleft().result())
+        done = True
+    finally:
+        # A failed export leaves no file behind rather than a truncated one that looks valid
+        if out is not None:
+            if done:
+                out.write(b";")
+            out.close()
+        if sink is not None:
+            if done:
+                sink.close()
+            else:
+                sink.abort()
+        if not done and (out is not None or sink is not None) and os.path.exists(path):
+            os.remove(path)
+    return count
+
+
+def _trace_for(algo_name: str, arr: List[int], target: Optional[int],
+               granularity="all") -> Tuple[Iterable, type]:
+    """Frames and renderer for an algorithm picked by display name.
+
+    The quicksort demo has no granularity levels and always yields every step.
+    """
+    from utils.algo_interface import ALGOS
+    if algo_name in ALGOS:
+        return ALGOS[algo_name](arr, granularity=granularity), BarFrameRenderer
+    if algo_name == "Binary Search":
+        from algorithms.binary_search import binary_search
+        return binary_search(sorted(arr), arr[0] if target is None else target, granularity), BarFrameRenderer
+    if algo_name == "Quick Sort":
+        from quick_sort_visualization import QuickSortRenderer, quicksort
+        return quicksort(arr), QuickSortRenderer
+    raise SystemExit(f"Unknown algorithm {algo_name!r}")
+
+
+def main(argv=None) -> int:
+    from utils.algo_interface import ALGOS
+    parser = argparse.ArgumentParser(description="Export an algorithm trace to GIF or MP4.")
+    parser.add_argument("algorithm", help=", ".join(list(ALGOS) + ["Binary Search", "Quick Sort"]))
+    parser.add_argument("--array", required=True, help="comma separated integers")
+    parser.add_argument("--target", type=int, help="target value for Binary Search")
+    parser.add_argument("--out", required=True, help="output .gif or .mp4 path")
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--granularity", type=parse_granularity, default="all",
+                        help="all, mutations, passes or k for every k-th step (default: all)")
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--ffmpeg", action="store_true", help="encode GIFs with ffmpeg too")
+    args = parser.parse_args(argv)
+
+    arr = [int(x.strip()) for x in args.array.split(",") if x.strip() != '']
+    frames, renderer_cls = _trace_for(args.algorithm, arr, args.target, args.granularity)
+    count = export_trace(frames, args.out, fps=args.fps, workers=args.workers,
+                         chunk_size=args.chunk_size, renderer_cls=renderer_cls, use_ffmpeg=args.ffmpeg)
+    print(f"Wrote {count} frames to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
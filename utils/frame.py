@@ -0,0 +1,237 @@
+"""Compact frame objects yielded by the algorithm generators.
+
+A :class:`Frame` is a slotted record instead of a per-step dict. Rather than
+an eagerly built info string and op tuple, it stores a small integer ``code``
+plus the ``args`` that go with it; ``info`` and ``op`` are derived from the
+code table only when somebody reads them, which for most frames is never.
+
+Frames still answer ``frame['state']`` and ``frame.get('info', '')`` so code
+written against the old dict frames keeps working.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+# Frame codes: (op kind or None, info template over ``args``)
+START = 0
+DONE = 1
+COMPARE = 2
+SWAP = 3
+TAKE = 4
+COMPARE_KEY = 5
+SHIFT = 6
+PLACE = 7
+NEW_MIN = 8
+INSERT = 9
+MERGED = 10
+CHECK = 11
+FOUND = 12
+MOVE_RIGHT = 13
+MOVE_LEFT = 14
+NOT_FOUND = 15
+VISIT = 16
+VISIT_COST = 17
+GOAL = 18
+PASS = 19
+
+CODES: List[Tuple[Optional[str], str]] = [
+    (None, "start"),
+    (None, "done"),
+    ("compare", "compare {0} and {1}"),
+    ("swap", "swapped {0} & {1}"),
+    (None, "take {0}"),
+    ("compare", "compare {0} with {2}"),
+    ("set", "shift"),
+    ("set", "placed at {0}"),
+    (None, "new min {0}"),
+    ("set", "inserted {1} at {0}"),
+    (None, "merged {0}-{1}"),
+    ("compare", "check {0}"),
+    (None, "found"),
+    (None, "move right"),
+    (None, "move left"),
+    (None, "not found"),
+    (None, "visit {0},{1}"),
+    (None, "visit {0},{1} (cost {2:g})"),
+    (None, "goal"),
+    (None, "pass {0} done"),
+]
+
+
+# Codes whose info text does not use the args, e.g. "shift"
+STATIC_CODES = frozenset(code for code, (_, template) in enumerate(CODES) if "{" not in template)
+
+
+def format_info(code: int, args: Tuple = ()) -> str:
+    """Info text for a frame code and its args."""
+    return CODES[code][1].format(*args)
+
+
+def code_op(code: int, args: Tuple = ()) -> Optional[Tuple]:
+    """The ``(kind, a, b)`` op a frame code stands for, or None."""
+    kind = CODES[code][0]
+    if kind is None:
+        return None
+    return (kind, args[0], args[1])
+
+
+def frame_fields(frame) -> Tuple[Any, Any, str]:
+    """``(state, highlight, info)`` of a :class:`Frame` or a plain dict frame."""
+    if isinstance(frame, Frame):
+        return frame.state, frame.highlight, frame.info
+    return frame["state"], frame.get("highlight", ()), frame.get("info", "")
+
+
+class Frame:
+    """One step of an algorithm: a state snapshot, highlighted indices and a code.
+
+    ``args`` feed both the op (its first two entries are the op's indices or
+    index and value) and the info template, e.g. ``Frame(a, (0, 1), COMPARE,
+    (0, 1))`` reads as ``op == ("compare", 0, 1)`` and ``info == "compare 0
+    and 1"``.
+    """
+
+    __slots__ = ("state", "highlight", "code", "args")
+    _keys = ("state", "highlight", "info", "op")
+
+    def __init__(self, state: Any, highlight: Tuple, code: int, args: Tuple = ()):
+        self.state = state
+        self.highlight = highlight
+        self.code = code
+        self.args = args
+
+    @property
+    def info(self) -> str:
+        return format_info(self.code, self.args)
+
+    @property
+    def op(self) -> Optional[Tuple]:
+        return code_op(self.code, self.args)
+
+    # Mapping-style access, as for the dict frames this replaces
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in self._keys:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys and getattr(self, key) is not None
+
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(k for k in self._keys if getattr(self, k) is not None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.keys()}
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self._all_slots())
+
+    __hash__ = None
+
+    @classmethod
+    def _all_slots(cls) -> Tuple[str, ...]:
+        return tuple(s for c in reversed(cls.__mro__) for s in getattr(c, "__slots__", ()))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ResyncFrame(Frame):
+    """Frame emitted after the generator dropped mutating steps.
+
+    It reports no op, so traces diff its state (and keyframe it) instead of
+    replaying an op on a state that is missing the dropped writes.
+    """
+
+    __slots__ = ()
+
+    @property
+    def op(self) -> Optional[Tuple]:
+        return None
+
+
+# Frame granularity levels; an int k >= 1 means every k-th step
+GRANULARITIES = ("all", "mutations", "passes")
+
+
+def parse_granularity(value: Union[str, int, None]) -> Union[str, int]:
+    """Normalize a granularity: ``"all"``, ``"mutations"``, ``"passes"`` or an int k.
+
+    ``None`` and ``1`` mean ``"all"``; digit strings such as ``"10"`` mean
+    every 10th step.
+    """
+    if value is None:
+        return "all"
+    if isinstance(value, str):
+        if value in GRANULARITIES:
+            return value
+        if not value.strip().isdigit():
+            raise ValueError(f"unknown granularity {value!r}; use {', '.join(GRANULARITIES)} or an integer")
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)} or an integer >= 1")
+    return "all" if value == 1 else value
+
+
+class FrameGate:
+    """Decides, before a frame is built, whether a generator step becomes a frame.
+
+    Generators call ``step(mutating)`` for each step they would yield at
+    full detail and ``pass_end()`` at the end of each outer pass, and only
+    build a frame when it returns True, so dropped frames cost nothing.
+    Frames are made through :meth:`frame`, which returns a
+    :class:`ResyncFrame` when mutating steps were dropped since the last one.
+    """
+
+    __slots__ = ("mode", "k", "count", "dirty")
+
+    def __init__(self, granularity: Union[str, int, None] = "all"):
+        granularity = parse_granularity(granularity)
+        self.mode = granularity if isinstance(granularity, str) else "every"
+        self.k = granularity if isinstance(granularity, int) else 1
+        self.count = 0
+        self.dirty = False
+
+    def step(self, mutating: bool = False) -> bool:
+        mode = self.mode
+        if mode == "all":
+            return True
+        if mode == "mutations":
+            return mutating
+        if mode == "every":
+            self.count += 1
+            keep = self.count % self.k == 0
+        else:
+            keep = False
+        if mutating and not keep:
+            self.dirty = True
+        return keep
+
+    def pass_end(self) -> bool:
+        """True when a pass-summary frame is wanted (``"passes"`` granularity)."""
+        return self.mode == "passes"
+
+    def frame(self, state: Any, highlight: Tuple, code: int, args: Tuple = ()) -> Frame:
+        if self.dirty:
+            self.dirty = False
+            return ResyncFrame(state, highlight, code, args)
+        return Frame(state, highlight, code, args)
+
+
+class GridFrame(Frame):
+    """Pathfinding frame: adds the cells visited and queued by this step."""
+
+    __slots__ = ("visited", "queued")
+    _keys = Frame._keys + ("visited", "queued")
+
+    def __init__(self, grid: Any, highlight: Sequence, code: int, args: Tuple = (),
+                 visited: Sequence = (), queued: Sequence = ()):
+        super().__init__(grid, highlight, code, args)
+        self.visited = visited
+        self.queued = queued
@@ -0,0 +1,154 @@
+"""Per-trace cache of rendered frame images, filled ahead of playback.
+
+Rendering a frame (drawing the figure and encoding it as PNG) is the most
+expensive part of showing it. :class:`FrameImageCache` keeps encoded images
+under a byte budget with least-recently-used eviction, and rasterizes the
+frames after the current one on a thread pool while the current one is on
+screen, so stepping forward, replaying and scrubbing back are served from
+memory.
+
+Frames are rebuilt by the caller and handed to the pool already built;
+workers only draw and encode, each on its own figure, so the trace itself
+is never read from two threads.
+"""
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_DPI = 120
+
+
+class FrameImageCache:
+    """Encoded images of one trace's frames, by frame index.
+
+    ``make_renderer()`` builds an object whose ``render(frame, index)`` draws
+    a frame and returns its matplotlib figure; one is built per thread that
+    renders. Pass an ``executor`` (shared between caches) to enable
+    :meth:`prefetch`; without one, frames are only rendered on demand.
+    """
+
+    def __init__(self, make_renderer: Callable, max_bytes: int = DEFAULT_MAX_BYTES,
+                 executor: Optional[Executor] = None, dpi: int = DEFAULT_DPI, fmt: str = "png"):
+        self.make_renderer = make_renderer
+        self.max_bytes = max_bytes
+        self.executor = executor
+        self.dpi = dpi
+        self.fmt = fmt
+        self._images: "OrderedDict[int, bytes]" = OrderedDict()
+        self._pending: Dict[int, Future] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evictions = 0
+
+    def _renderer(self):
+        renderer = getattr(self._local, "renderer", None)
+        if renderer is None:
+            renderer = self._local.renderer = self.make_renderer()
+        return renderer
+
+    def _encode(self, i: int, frame) -> bytes:
+        fig = self._renderer().render(frame, i)
+        buf = io.BytesIO()
+        fig.savefig(buf, format=self.fmt, dpi=self.dpi)
+        return buf.getvalue()
+
+    def _store(self, i: int, image: bytes) -> None:
+        with self._lock:
+            if self._closed or len(image) > self.max_bytes:
+                return
+            old = self._images.pop(i, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._images[i] = image
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def __contains__(self, i: int) -> bool:
+        with self._lock:
+            return i in self._images
+
+    def get(self, i: int) -> Optional[bytes]:
+        """The image of frame ``i`` if cached (waiting for an in-flight prefetch), else None."""
+        with self._lock:
+            pending = self._pending.get(i)
+        if pending is not None:
+            # Rendering is already under way; waiting is cheaper than starting over
+            try:
+                pending.result()
+            except Exception:
+                pass
+        with self._lock:
+            image = self._images.get(i)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(i)
+            self.hits += 1
+            return image
+
+    def render(self, i: int, frame) -> bytes:
+        """Render frame ``i`` now, in the calling thread, and cache it."""
+        image = self._encode(i, frame)
+        self._store(i, image)
+        return image
+
+    def prefetch(self, items: Iterable[Tuple[int, object]]) -> int:
+        """Queue ``(index, frame)`` pairs that are neither cached nor queued; returns how many."""
+        if self.executor is None:
+            return 0
+        queued = 0
+        for i, frame in items:
+            with self._lock:
+                if self._closed or i in self._images or i in self._pending:
+                    continue
+                future = self.executor.submit(self._prefetch_one, i, frame)
+                self._pending[i] = future
+            queued += 1
+        return queued
+
+    def _prefetch_one(self, i: int, frame) -> None:
+        try:
+            self._store(i, self._encode(i, frame))
+            with self._lock:
+                self.prefetched += 1
+        finally:
+            with self._lock:
+                self._pending.pop(i, None)
+
+    def wanted(self, indices: Iterable[int]) -> Iterable[int]:
+        """The indices in ``indices`` that are neither cached nor being rendered."""
+        with self._lock:
+            return [i for i in indices if i not in self._images and i not in self._pending]
+
+    def close(self) -> None:
+        """Drop every image and cancel queued renders; in-flight ones are discarded."""
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._images.clear()
+            self._bytes = 0
+        for future in pending:
+            future.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+                "evictions": self.evictions,
+                "entries": len(self._images),
+                "bytes": self._bytes,
+                "pending": len(self._pending),
+            }
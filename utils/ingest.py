@@ -0,0 +1,193 @@
+"""Input arrays from text, CSV and ``.npy`` files, or seeded generators.
+
+Everything here returns a 1-D ``int64`` NumPy array, parsed or generated
+in C rather than element by element in Python:
+
+- :func:`parse_text` and :func:`load_csv` use NumPy's text parser once a
+  regex has checked the text is plain in-range integers; anything else goes
+  through the per-item parser, which skips empty items and reports errors.
+- :func:`load_npy` memory-maps files on disk and wraps uploaded bytes
+  without copying them.
+- :func:`generate` builds random, nearly-sorted, sorted, reversed and
+  few-unique inputs from a seed, so a run can be reproduced exactly.
+
+Callers that feed Python generators convert once with ``.tolist()``; stats,
+benchmarks and the large-array view can use the arrays directly.
+"""
+import io
+import os
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+
+MAX_SIZE = 1_000_000
+DISTRIBUTIONS = ("random", "nearly-sorted", "sorted", "reversed", "few-unique")
+
+Source = Union[str, bytes, BinaryIO]
+
+_PLAIN_CHARS = np.zeros(256, dtype=bool)
+_PLAIN_CHARS[np.frombuffer(b"0123456789+-, \t\r", dtype=np.uint8)] = True
+# Integers of at most this many digits always fit in int64
+_PLAIN_DIGITS = 18
+_INT64_MIN, _INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
+
+
+def _as_int_array(values: np.ndarray, what: str) -> np.ndarray:
+    """Check ``values`` is a 1-D integer array within MAX_SIZE, converting integral floats."""
+    values = np.asarray(values)
+    if values.ndim != 1:
+        if values.ndim == 2 and 1 in values.shape:
+            values = values.reshape(-1)
+        else:
+            raise ValueError(f"{what} must hold a single row or column of numbers, got shape {values.shape}")
+    if len(values) > MAX_SIZE:
+        raise ValueError(f"{what} has {len(values):,} values; at most {MAX_SIZE:,} are supported")
+    if values.dtype.kind in "iu":
+        return values if values.dtype == np.int64 else values.astype(np.int64)
+    if values.dtype.kind == "f":
+        if not np.all(np.isfinite(values)) or not np.array_equal(values, np.round(values)):
+            raise ValueError(f"{what} must contain integers only")
+        return values.astype(np.int64)
+    raise ValueError(f"{what} must contain integers, not {values.dtype}")
+
+
+def _plain_ints(text: str) -> bool:
+    """Whether ``text`` is non-empty, comma separated integers of at most 18 digits.
+
+    Checked on the raw bytes with NumPy: every item must hold exactly one run
+    of digits, and a sign must sit right before one.
+    """
+    try:
+        raw = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        return False
+    if not len(raw) or not _PLAIN_CHARS[raw].all():
+        return False
+    digit = (raw >= ord("0")) & (raw <= ord("9"))
+    sign = (raw == ord("+")) | (raw == ord("-"))
+    if sign[-1] or (sign[:-1] & ~digit[1:]).any():
+        return False
+    padded = np.zeros(len(raw) + 2, dtype=np.int8)
+    padded[1:-1] = digit
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = edges[::2], edges[1::2]
+    return (len(starts) == np.count_nonzero(raw == ord(",")) + 1
+            and int((ends - starts).max()) <= _PLAIN_DIGITS)
+
+
+def parse_text(text: str) -> np.ndarray:
+    """Comma (or newline) separated integers, as typed into the text box.
+
+    Empty items are skipped, as before; anything that is not an integer, or
+    does not fit in int64, raises ValueError.
+    """
+    text = text.replace("\n", ",")
+    # NumPy's parser reads junk as 0 and clamps overflow, so only text already
+    # known to be plain in-range integers takes the fast path
+    if _plain_ints(text):
+        return _as_int_array(np.fromstring(text, sep=",", dtype=np.int64), "input")
+    # Slow path for empty items and error messages
+    values = [int(x) for x in text.split(",") if x.strip() != ""]
+    if values and not _INT64_MIN <= min(values) <= max(values) <= _INT64_MAX:
+        raise ValueError(f"input values must be between {_INT64_MIN:,} and {_INT64_MAX:,}")
+    return _as_int_array(np.array(values, dtype=np.int64), "input")
+
+
+def _is_numeric(line: str) -> bool:
+    try:
+        parse_text(line)
+    except ValueError:
+        return False
+    return True
+
+
+def _read_bytes(source: Source) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    return source.read()
+
+
+def load_csv(source: Source, column: int = 0) -> np.ndarray:
+    """Integers from a CSV file: one row, one column, or ``column`` of a table.
+
+    A first line that is not numeric is treated as a header and skipped.
+    """
+    text = _read_bytes(source).decode("utf-8-sig")
+    lines = text.strip().splitlines()
+    if lines and not _is_numeric(lines[0]):
+        lines = lines[1:]
+    if not lines:
+        return np.zeros(0, dtype=np.int64)
+    if len(lines) > 1 and "," in lines[0].strip().rstrip(","):
+        # A table: pick one column
+        table = np.loadtxt(io.StringIO("\n".join(lines)), delimiter=",", usecols=column, dtype=np.int64, ndmin=1)
+        return _as_int_array(table, "CSV column")
+    return parse_text(",".join(lines))
+
+
+def load_npy(source: Source, mmap: bool = True) -> np.ndarray:
+    """Array from a ``.npy`` file.
+
+    A path is memory-mapped read-only (when ``mmap`` is set), so only the
+    pages that are used get read. Uploaded bytes or buffers are wrapped in
+    place with ``np.frombuffer`` instead of being copied.
+    """
+    if isinstance(source, str):
+        values = np.load(source, mmap_mode="r" if mmap else None, allow_pickle=False)
+        return _as_int_array(values, os.path.basename(source))
+    data = _read_bytes(source)
+    buf = io.BytesIO(data)
+    version = np.lib.format.read_magic(buf)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(buf)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(buf)
+    if dtype.hasobject:
+        raise ValueError(".npy files holding Python objects are not supported")
+    count = int(np.prod(shape)) if shape else 1
+    values = np.frombuffer(data, dtype=dtype, count=count, offset=buf.tell())
+    values = values.reshape(shape, order="F" if fortran else "C")
+    return _as_int_array(values, ".npy file")
+
+
+def load_file(source: Source, name: Optional[str] = None) -> np.ndarray:
+    """Load a ``.npy``, ``.csv`` or ``.txt`` file, picking the format by extension."""
+    name = name or (source if isinstance(source, str) else getattr(source, "name", ""))
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".npy":
+        return load_npy(source)
+    if ext in (".csv", ".txt", ""):
+        return load_csv(source)
+    raise ValueError(f"unsupported file type {ext!r}; use .csv, .txt or .npy")
+
+
+def generate(distribution: str, n: int, seed: int = 0, low: int = 1, high: int = 1000) -> np.ndarray:
+    """Seeded synthetic input of ``n`` values in ``[low, high]``.
+
+    ``nearly-sorted`` is sorted with about 2% of positions swapped at random;
+    ``few-unique`` draws from four distinct values.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"unknown distribution {distribution!r}; use {', '.join(DISTRIBUTIONS)}")
+    if not 0 <= n <= MAX_SIZE:
+        raise ValueError(f"size must be between 0 and {MAX_SIZE:,}")
+    rng = np.random.default_rng(seed)
+    if distribution == "few-unique":
+        return rng.choice(np.linspace(low, high, 4).astype(np.int64), size=n)
+    values = rng.integers(low, high, size=n, endpoint=True, dtype=np.int64)
+    if distribution == "random":
+        return values
+    values.sort()
+    if distribution == "reversed":
+        return values[::-1].copy()
+    if distribution == "nearly-sorted" and n > 1:
+        swaps = max(1, n // 50)
+        i = rng.integers(0, n, size=swaps)
+        j = rng.integers(0, n, size=swaps)
+        values[i], values[j] = values[j], values[i].copy()
+    return values
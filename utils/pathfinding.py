@@ -0,0 +1,132 @@
+"""Shared machinery for the grid pathfinding generators.
+
+Cells are addressed by their flat index ``r * cols + c``. Searches keep one
+parent entry per cell in a flat ``array`` instead of a copy of the path for
+every queued cell, and their frames only report what changed since the
+previous frame:
+
+- ``visited``: cells expanded by this frame
+- ``queued``: cells added to (or improved in) the frontier by this frame
+
+The goal frame highlights the full path, rebuilt from the parent array.
+"""
+import heapq
+from array import array
+from typing import Callable, Generator, List, Optional, Sequence, Tuple
+
+from utils.frame import GridFrame, GOAL, NOT_FOUND, START, VISIT_COST
+
+Cell = Tuple[int, int]
+
+NO_PARENT = -1
+
+
+def flatten(grid) -> Tuple[int, int, List]:
+    """``(rows, cols, cells)`` for a list-of-lists or 2-D NumPy grid."""
+    if hasattr(grid, "ravel"):
+        rows, cols = grid.shape
+        return rows, cols, grid.ravel().tolist()
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    return rows, cols, [v for row in grid for v in row]
+
+
+def new_parents(size: int) -> array:
+    """Flat parent array with every cell unvisited."""
+    return array("q", [NO_PARENT]) * size
+
+
+def neighbors(idx: int, rows: int, cols: int) -> List[int]:
+    """Flat indices of the 4-connected neighbors of ``idx`` inside the grid."""
+    r, c = divmod(idx, cols)
+    out = []
+    if r + 1 < rows:
+        out.append(idx + cols)
+    if r > 0:
+        out.append(idx - cols)
+    if c + 1 < cols:
+        out.append(idx + 1)
+    if c > 0:
+        out.append(idx - 1)
+    return out
+
+
+def reconstruct_path(parents: Sequence[int], cols: int, goal: int) -> List[Cell]:
+    """Walk the parent array back from ``goal`` and return the path start-first."""
+    path = []
+    idx = goal
+    while True:
+        path.append(divmod(idx, cols))
+        parent = parents[idx]
+        if parent == idx:
+            break
+        idx = parent
+    path.reverse()
+    return path
+
+
+def manhattan(cols: int, goal: int) -> Callable[[int], int]:
+    """Manhattan distance to ``goal``; admissible on a 4-connected grid."""
+    gr, gc = divmod(goal, cols)
+
+    def h(idx: int) -> int:
+        r, c = divmod(idx, cols)
+        return abs(r - gr) + abs(c - gc)
+
+    return h
+
+
+def weighted_search(grid, start: Cell, goal: Cell, weights=None,
+                    heuristic: Optional[Callable[[int, int, int], Callable[[int], float]]] = None,
+                    ) -> Generator[GridFrame, None, Optional[List[Cell]]]:
+    """Best-first search on ``heapq``: Dijkstra without a heuristic, A* with one.
+
+    ``grid`` cells equal to 0 are open. ``weights`` optionally gives the
+    (positive) cost of entering each cell; it defaults to 1 everywhere.
+    ``heuristic(rows, cols, goal_idx)`` returns the per-cell estimate.
+    Returns the path, or None when the goal is unreachable.
+    """
+    rows, cols, cells = flatten(grid)
+    costs = flatten(weights)[2] if weights is not None else None
+    s = start[0] * cols + start[1]
+    g = goal[0] * cols + goal[1]
+    h = heuristic(rows, cols, g) if heuristic is not None else None
+    if costs is not None and h is not None:
+        # Scale the estimate by the cheapest step so it never overestimates
+        min_cost = min(costs[i] for i in range(len(cells)) if cells[i] == 0)
+        base = h
+        h = lambda idx: base(idx) * min_cost
+    parents = new_parents(rows * cols)
+    dist = array("d", [float("inf")]) * (rows * cols)
+    closed = bytearray(rows * cols)
+    parents[s] = s
+    dist[s] = 0
+    heap = [(h(s) if h else 0, 0, s)]
+    tie = 1
+    yield GridFrame(grid, [start], START, queued=[start])
+    while heap:
+        _, _, idx = heapq.heappop(heap)
+        if closed[idx]:
+            continue
+        closed[idx] = 1
+        cell = divmod(idx, cols)
+        if idx == g:
+            yield GridFrame(grid, [cell], VISIT_COST, (cell[0], cell[1], dist[idx]), visited=[cell])
+            path = reconstruct_path(parents, cols, g)
+            yield GridFrame(grid, path, GOAL)
+            return path
+        queued = []
+        base_cost = dist[idx]
+        for nb in neighbors(idx, rows, cols):
+            if cells[nb] != 0 or closed[nb]:
+                continue
+            new_cost = base_cost + (costs[nb] if costs is not None else 1)
+            if new_cost < dist[nb]:
+                dist[nb] = new_cost
+                parents[nb] = idx
+                heapq.heappush(heap, (new_cost + (h(nb) if h else 0), tie, nb))
+                tie += 1
+                queued.append(divmod(nb, cols))
+        yield GridFrame(grid, [cell], VISIT_COST, (cell[0], cell[1], base_cost), visited=[cell], queued=queued)
+    yield GridFrame(grid, [], NOT_FOUND)
+    return None
@@ -0,0 +1,95 @@
+"""Wall-clock playback scheduling.
+
+:class:`PlaybackClock` maps time to frame indices: frame ``start + k`` is
+due at ``t0 + k / fps``. Each tick shows the frame that is due *now*, so
+the time spent rendering and rerunning is absorbed instead of being added to
+every frame's delay, and a tick that comes late skips (coalesces) the frames
+that fell due meanwhile rather than falling further behind. Deadlines are
+computed from ``t0``, never from the previous tick, so error does not
+accumulate.
+
+The clock never sleeps; the caller schedules ticks with a timer, e.g. a
+Streamlit fragment with ``run_every``.
+"""
+from time import perf_counter
+from typing import Optional
+
+# EWMA weight of the newest tick interval when estimating the tick rate
+TICK_SMOOTHING = 0.2
+
+
+class PlaybackClock:
+    """Frame deadlines for one playback run, plus drop and rate counters."""
+
+    def __init__(self, fps: float = 2.0):
+        self.fps = fps
+        self.start_idx = 0
+        self.t0 = 0.0
+        self.last_idx = 0
+        self.last_tick: Optional[float] = None
+        self.tick_seconds: Optional[float] = None
+        self.shown = 0
+        self.dropped = 0
+        self.running = False
+
+    def start(self, idx: int, fps: Optional[float] = None, now: Optional[float] = None) -> None:
+        """Start (or restart) playback from frame ``idx``; frame ``idx + 1`` is due after one interval."""
+        self.fps = fps or self.fps
+        self.start_idx = self.last_idx = idx
+        self.t0 = perf_counter() if now is None else now
+        self.last_tick = None
+        self.tick_seconds = None
+        self.shown = 0
+        self.dropped = 0
+        self.running = True
+
+    def stop(self) -> None:
+        self.running = False
+
+    def set_fps(self, fps: float, now: Optional[float] = None) -> None:
+        """Change speed mid-run, keeping the current position."""
+        if fps == self.fps:
+            return
+        now = perf_counter() if now is None else now
+        if self.running:
+            # Re-anchor so the next frame is due one new interval from the last shown one
+            self.start_idx = self.last_idx
+            self.t0 = now
+        self.fps = fps
+
+    def due(self, now: Optional[float] = None) -> int:
+        """Index of the frame due at ``now`` (never behind the last one shown)."""
+        now = perf_counter() if now is None else now
+        return max(self.last_idx, self.start_idx + int((now - self.t0) * self.fps))
+
+    def tick(self, limit: Optional[int] = None, now: Optional[float] = None) -> int:
+        """Advance to the frame due now, capped at ``limit``; returns its index.
+
+        Frames passed over since the previous tick are counted as dropped.
+        """
+        now = perf_counter() if now is None else now
+        idx = self.due(now)
+        if limit is not None:
+            idx = min(idx, limit)
+        if idx > self.last_idx:
+            self.dropped += idx - self.last_idx - 1
+            self.shown += 1
+        if self.last_tick is not None:
+            interval = now - self.last_tick
+            self.tick_seconds = interval if self.tick_seconds is None else (
+                (1 - TICK_SMOOTHING) * self.tick_seconds + TICK_SMOOTHING * interval)
+        self.last_tick = now
+        self.last_idx = idx
+        return idx
+
+    def stride(self) -> int:
+        """Frames expected to pass per tick at the observed tick rate, at least 1."""
+        if self.tick_seconds is None:
+            return 1
+        return max(1, round(self.tick_seconds * self.fps))
+
+    def achieved_fps(self, now: Optional[float] = None) -> float:
+        """Frames advanced per second of wall time since the run started."""
+        now = perf_counter() if now is None else now
+        elapsed = now - self.t0
+        return (self.last_idx - self.start_idx) / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,111 @@
+"""Race mode: several algorithms on the same input, played back side by side.
+
+Traces of large inputs are generated concurrently, one algorithm per worker
+process, and small ones in the calling process; either way they come back as finished :class:`DeltaTrace` objects together with their
+generation time and op counts. :class:`RaceTrace` then steps all of them in
+lockstep; an algorithm that finishes early holds its last frame.
+"""
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from utils.algo_interface import ALGOS, tally_ops
+from utils.trace import DeltaTrace, keyframe_interval_for
+
+# Below this many elements every racer is recorded in the calling process:
+# shipping the work and the traces between processes costs more than it saves
+PARALLEL_MIN_SIZE = 200
+
+
+def record_one(algo_name: str, arr: Sequence[int], keyframe_interval: Optional[int] = None,
+               granularity="all") -> Dict:
+    """Record one algorithm's trace; returns ``{"trace", "seconds", <op counts>}``.
+
+    ``seconds`` is the time to run the generator and record its trace. With a
+    coarser ``granularity`` the op counts cover only the steps kept.
+    """
+    func = ALGOS[algo_name]
+    start = perf_counter()
+    trace = DeltaTrace.record(func(list(arr), granularity=granularity), keyframe_interval or keyframe_interval_for(len(arr)))
+    seconds = perf_counter() - start
+    result = {"trace": trace, "seconds": seconds}
+    result.update(tally_ops(trace.ops))
+    return result
+
+
+def record_race(names: Sequence[str], arr: Sequence[int], workers: Optional[int] = None,
+                keyframe_interval: Optional[int] = None, granularity="all",
+                pool: Optional[Executor] = None, min_size: int = PARALLEL_MIN_SIZE) -> Dict[str, Dict]:
+    """Record every algorithm in ``names`` on ``arr``, in parallel for large inputs.
+
+    ``workers`` defaults to one process per algorithm, capped at the CPU
+    count; with one worker, one algorithm or fewer than ``min_size``
+    elements everything runs in this process. Otherwise the work goes to
+    ``pool``, a long-lived process pool owned by the caller, or to a pool
+    spawned for this call (not forked, since the caller is usually a
+    threaded server). Results are keyed by algorithm name, in ``names`` order.
+    """
+    names = list(names)
+    workers = min(workers or os.cpu_count() or 1, len(names))
+    if workers <= 1 or len(arr) < min_size:
+        return {name: record_one(name, arr, keyframe_interval, granularity) for name in names}
+    arr = list(arr)
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return record_race(names, arr, workers, keyframe_interval, granularity, pool, min_size)
+    futures = {name: pool.submit(record_one, name, arr, keyframe_interval, granularity) for name in names}
+    return {name: futures[name].result() for name in names}
+
+
+class RaceTrace:
+    """Lockstep view over several finished traces.
+
+    Offers the parts of the :class:`~utils.trace.LazyTrace` interface the
+    player uses (``len``, ``has``, ``fill_to``, ``exhausted``, indexing), so
+    the usual playback controls drive a race unchanged. ``race[i]`` is a dict
+    whose ``panels`` hold each algorithm's frame at step ``i``.
+    """
+
+    exhausted = True
+
+    def __init__(self, traces: Dict[str, DeltaTrace]):
+        self.names = list(traces)
+        self.traces = [traces[name] for name in self.names]
+        self._len = max((len(t) for t in self.traces), default=0)
+
+    def fill_to(self, i: int) -> None:
+        """Traces are complete already; nothing to generate."""
+
+    def has(self, i: int) -> bool:
+        return 0 <= i < self._len
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def nbytes(self) -> int:
+        """Approximate memory held by all the racers' traces."""
+        return sum(trace.nbytes() for trace in self.traces)
+
+    def panels_at(self, i: int) -> List[Dict]:
+        """Each algorithm's frame at step ``i``, holding finished ones on their last frame."""
+        return [trace[min(i, len(trace) - 1)] for trace in self.traces]
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            i += self._len
+        if not self.has(i):
+            raise IndexError("race index out of range")
+        done = [name for name, trace in zip(self.names, self.traces) if i >= len(trace) - 1]
+        info = f"step {i + 1}: {len(done)}/{len(self.names)} finished"
+        if done:
+            info += f" ({', '.join(done)})"
+        return {"panels": self.panels_at(i), "info": info}
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._len):
+            yield self[i]
@@ -0,0 +1,208 @@
+"""Lazy registry of algorithm generators.
+
+Algorithms describe themselves with a module-level ``ALGORITHM`` dict
+literal::
+
+    ALGORITHM = {
+        "name": "Bubble Sort",        # display name
+        "entry": "bubble_sort",       # generator function in the module
+        "category": "sorting",        # sorting, search, pathfinding, ...
+        "input": "array",             # array, sorted array + target, grid
+        "complexity": "O(n^2)",
+        "stats": "bubble_sort_stats", # optional frame-free counterpart
+    }
+
+The entry function takes the input (``arr``, or ``arr, target`` for search)
+and an optional ``granularity`` keyword (see :class:`utils.frame.FrameGate`),
+and yields frames. Functions without a ``granularity`` parameter still
+work: :meth:`AlgorithmSpec.load` wraps them to accept and ignore it, so they
+always yield every step.
+
+Discovery reads that literal straight from the source with :mod:`ast`, so
+listing algorithms and their metadata imports none of them; a module is
+imported the first time its function is asked for. Modules are discovered
+in the ``algorithms/`` package and through the ``algo_visualizer.algorithms``
+entry point group, whose entries point at ``module:function``.
+"""
+import ast
+import importlib
+import importlib.util
+import inspect
+import os
+import threading
+from collections.abc import Mapping
+from functools import lru_cache, wraps
+from importlib import metadata
+from typing import Callable, Dict, Iterator, List, Optional
+
+ENTRY_POINT_GROUP = "algo_visualizer.algorithms"
+ALGORITHMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "algorithms")
+
+
+def read_metadata(path: str) -> Optional[Dict]:
+    """The ``ALGORITHM`` literal of a source file, or None if it has none."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id == "ALGORITHM"):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                return None
+            return value if isinstance(value, dict) else None
+    return None
+
+
+def accepts_granularity(func: Callable) -> bool:
+    """Whether ``func`` can be called with a ``granularity`` keyword."""
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(p.name == "granularity" or p.kind is p.VAR_KEYWORD for p in params)
+
+
+def with_granularity(func: Callable) -> Callable:
+    """``func``, wrapped to accept and ignore ``granularity`` if it does not take one."""
+    if accepts_granularity(func):
+        return func
+
+    @wraps(func)
+    def every_step(*args, granularity="all"):
+        return func(*args)
+
+    return every_step
+
+
+class AlgorithmSpec:
+    """Metadata for one algorithm plus its lazily imported functions."""
+
+    def __init__(self, module: str, meta: Dict):
+        self.module = module
+        self.name = meta["name"]
+        self.entry = meta["entry"]
+        self.category = meta.get("category", "other")
+        self.input = meta.get("input", "array")
+        self.complexity = meta.get("complexity", "")
+        self.stats_entry = meta.get("stats")
+        self._func: Optional[Callable] = None
+        self._lock = threading.Lock()
+
+    def _attr(self, attr: str) -> Callable:
+        return getattr(importlib.import_module(self.module), attr)
+
+    def load(self) -> Callable:
+        """The generator function, importing its module on first use.
+
+        It always accepts ``granularity``; see :func:`with_granularity`.
+        """
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    self._func = with_granularity(self._attr(self.entry))
+        return self._func
+
+    def load_stats(self) -> Optional[Callable]:
+        """The frame-free ``*_stats`` function, if the algorithm has one."""
+        return self._attr(self.stats_entry) if self.stats_entry else None
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"AlgorithmSpec({self.name!r}, {self.module}:{self.entry})"
+
+
+class LazyFunctions(Mapping):
+    """Read-only ``{name: function}`` view that imports each function on access."""
+
+    def __init__(self, specs: List[AlgorithmSpec]):
+        self._specs = {spec.name: spec for spec in specs}
+
+    def __getitem__(self, name: str) -> Callable:
+        return self._specs[name].load()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __repr__(self) -> str:
+        return f"LazyFunctions({list(self._specs)})"
+
+
+class Registry:
+    """Algorithms by display name, in discovery order."""
+
+    def __init__(self):
+        self._specs: Dict[str, AlgorithmSpec] = {}
+
+    def add(self, spec: AlgorithmSpec) -> None:
+        # First registration wins, so a plugin cannot shadow a built-in
+        self._specs.setdefault(spec.name, spec)
+
+    def discover_package(self, directory: str, package: str) -> None:
+        """Register every module of ``package`` (located at ``directory``) with metadata."""
+        try:
+            files = sorted(os.listdir(directory))
+        except OSError:
+            return
+        for filename in files:
+            if not filename.endswith(".py") or filename.startswith("_"):
+                continue
+            meta = read_metadata(os.path.join(directory, filename))
+            if meta and "name" in meta and "entry" in meta:
+                self.add(AlgorithmSpec(f"{package}.{filename[:-3]}", meta))
+
+    def discover_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """Register plugins from installed distributions' entry points."""
+        try:
+            eps = metadata.entry_points(group=group)
+        except TypeError:  # Python < 3.10
+            eps = metadata.entry_points().get(group, [])
+        for ep in eps:
+            module, _, attr = ep.value.partition(":")
+            meta = None
+            try:
+                spec = importlib.util.find_spec(module)
+                if spec is not None and spec.origin:
+                    meta = read_metadata(spec.origin)
+            except (ImportError, ValueError):
+                pass
+            meta = dict(meta or {}, name=ep.name, entry=attr.strip() or (meta or {}).get("entry"))
+            if meta["entry"]:
+                self.add(AlgorithmSpec(module.strip(), meta))
+
+    def get(self, name: str) -> AlgorithmSpec:
+        return self._specs[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[AlgorithmSpec]:
+        return iter(self._specs.values())
+
+    def names(self, category: Optional[str] = None) -> List[str]:
+        return [spec.name for spec in self if category is None or spec.category == category]
+
+    def functions(self, category: Optional[str] = None) -> LazyFunctions:
+        """Lazy ``{name: generator function}`` for one category (or all)."""
+        return LazyFunctions([spec for spec in self if category is None or spec.category == category])
+
+
+@lru_cache(maxsize=None)
+def default_registry() -> Registry:
+    """The process-wide registry: built-in algorithms, then entry point plugins."""
+    registry = Registry()
+    registry.discover_package(ALGORITHMS_DIR, "algorithms")
+    registry.discover_entry_points()
+    return registry
@@ -0,0 +1,262 @@
+"""Per-session trace memory under one process-wide budget.
+
+Each Streamlit session used to keep its whole trace in ``st.session_state``
+for as long as the session lived, so memory grew with every user who ever
+opened the page. :class:`SessionStore` holds those traces instead, keyed by
+session id, and accounts for their size (``nbytes()`` of the trace; objects
+without it, such as memory-mapped trace files, count as zero).
+
+When the total exceeds the budget, traces of sessions that have been idle
+for ``idle_seconds`` are evicted, least recently used first. With a
+``spill_dir`` a finished trace is pickled, zlib-compressed and written to
+disk, and is loaded back on the owner's next :meth:`SessionStore.get`; a
+trace that cannot be pickled (a generator is still running) or that finds no
+room on disk is dropped, and ``get`` returns None so the caller rebuilds it
+(see ``main.session_frames``). The session that is being served is never
+evicted, so the budget may be exceeded while every session is active.
+
+Traces the ``shared`` predicate accepts are owned elsewhere, usually by the
+trace cache that every session reads finished traces from. They count as
+zero and are never evicted, since dropping the session's reference would
+free nothing. They are charged again once the owner lets go of them.
+
+Sessions unused for ``expire_seconds`` are discarded along with their spill
+files. Streamlit does not report when a session ends, so this is how dead
+sessions are cleaned up. A live session that comes back later rebuilds its
+trace, as after a drop.
+
+Sizes of growing traces are extrapolated from the last exact measurement
+until the trace doubles, so accounting costs amortized O(1) per rerun.
+"""
+import os
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_IDLE_SECONDS = 60.0
+DEFAULT_EXPIRE_SECONDS = 3600.0
+# zlib level for spilled traces: op lists compress well even at the fastest level
+SPILL_COMPRESSION = 1
+
+
+class _Entry:
+    __slots__ = ("trace", "nbytes", "measured", "last_used", "path", "disk_bytes")
+
+    def __init__(self, trace: Any, nbytes: int, measured: Optional[Tuple[int, int]], last_used: float):
+        self.trace = trace
+        self.nbytes = nbytes
+        # (frames, bytes) at the last exact measurement
+        self.measured = measured
+        self.last_used = last_used
+        self.path: Optional[str] = None
+        self.disk_bytes = 0
+
+
+def _measure(trace: Any, measured: Optional[Tuple[int, int]]) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """Estimated size of ``trace`` and the exact measurement it is based on."""
+    nbytes = getattr(trace, "nbytes", None)
+    if nbytes is None:
+        return 0, None
+    frames = len(trace) if hasattr(trace, "__len__") else 0
+    if measured is None or not measured[0] or frames < measured[0] or frames >= 2 * measured[0]:
+        measured = (frames, nbytes())
+        return measured[1], measured
+    return measured[1] * frames // measured[0], measured
+
+
+class SessionStore:
+    """Thread-safe map of session id -> trace with a global byte budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, spill_dir: Optional[str] = None,
+                 spill_max_bytes: Optional[int] = None, idle_seconds: float = DEFAULT_IDLE_SECONDS,
+                 expire_seconds: float = DEFAULT_EXPIRE_SECONDS,
+                 shared: Optional[Callable[[Any], bool]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes if spill_max_bytes is not None else 4 * max_bytes
+        self.idle_seconds = idle_seconds
+        self.expire_seconds = expire_seconds
+        self._shared = shared
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.spills = 0
+        self.reloads = 0
+        self.drops = 0
+        self.expired = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def put(self, sid: Hashable, trace: Any) -> None:
+        """Make ``trace`` the session's trace (or re-account a grown one), then
+        evict idle sessions if the budget is exceeded."""
+        with self._lock:
+            entry = self._entries.get(sid)
+            measured = entry.measured if entry is not None and entry.trace is trace else None
+        size, measured = _measure(trace, measured)
+        if self._shared is not None and self._shared(trace):
+            size = 0
+        stale = []
+        with self._lock:
+            old = self._entries.pop(sid, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+                if old.path is not None:
+                    self._disk_bytes -= old.disk_bytes
+                    stale.append(old.path)
+            now = self._clock()
+            self._entries[sid] = _Entry(trace, size, measured, now)
+            self._bytes += size
+            stale += self._expire(now)
+            victims = self._pick_victims(sid)
+        for path in stale:
+            _remove(path)
+        for victim in victims:
+            self._spill(*victim)
+
+    def get(self, sid: Hashable) -> Optional[Any]:
+        """The session's trace, reloaded from disk if it was spilled.
+
+        Returns None for unknown sessions and for traces that were dropped;
+        the caller regenerates and :meth:`put`\\ s them.
+        """
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            trace, path = entry.trace, entry.path
+        if trace is None:
+            if path is None:
+                return None  # being spilled right now; rebuilding is cheaper than waiting
+            try:
+                with open(path, "rb") as f:
+                    trace = pickle.loads(zlib.decompress(f.read()))
+            except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+                self.discard(sid)
+                return None
+            with self._lock:
+                self.reloads += 1
+        self.put(sid, trace)
+        return trace
+
+    def discard(self, sid: Hashable) -> None:
+        """Forget a session, deleting any spilled copy."""
+        with self._lock:
+            entry = self._entries.pop(sid, None)
+            if entry is None:
+                return
+            self._bytes -= entry.nbytes
+            self._disk_bytes -= entry.disk_bytes
+        if entry.path is not None:
+            _remove(entry.path)
+
+    def _expire(self, now: float) -> List[str]:
+        """Forget sessions unused for ``expire_seconds``; returns their spill files (lock held)."""
+        paths = []
+        # Entries are in order of last use, so expired ones are at the front
+        while self._entries:
+            sid, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.expire_seconds:
+                break
+            del self._entries[sid]
+            self._bytes -= entry.nbytes
+            self._disk_bytes -= entry.disk_bytes
+            self.expired += 1
+            if entry.path is not None:
+                paths.append(entry.path)
+        return paths
+
+    def _pick_victims(self, keep: Hashable) -> List[Tuple[Hashable, _Entry, Any]]:
+        """Detach idle traces, least recently used first, until within budget (lock held)."""
+        victims = []
+        now = self._clock()
+        for sid, entry in self._entries.items():
+            if self._bytes <= self.max_bytes:
+                break
+            if sid == keep or entry.trace is None or not entry.nbytes or now - entry.last_used < self.idle_seconds:
+                continue
+            victims.append((sid, entry, entry.trace))
+            self._bytes -= entry.nbytes
+            entry.trace = None
+            entry.nbytes = 0
+            self.evictions += 1
+        return victims
+
+    def _spill(self, sid: Hashable, entry: _Entry, trace: Any) -> None:
+        # Pickling and compression happen outside the lock so other sessions are not blocked
+        path = None
+        if self.spill_dir:
+            try:
+                data = zlib.compress(pickle.dumps(trace, protocol=pickle.HIGHEST_PROTOCOL), SPILL_COMPRESSION)
+            except (TypeError, AttributeError, pickle.PicklingError):
+                data = b""  # e.g. a trace whose generator is still running
+            if data and len(data) <= self.spill_max_bytes:
+                path = os.path.join(self.spill_dir, f"session-{abs(hash(sid)):x}-{id(entry):x}.pkl.z")
+                try:
+                    with open(path, "wb") as f:
+                        f.write(data)
+                except OSError:
+                    path = None
+        stale = []
+        with self._lock:
+            current = self._entries.get(sid) is entry
+            if path is None or not current:
+                if current:
+                    del self._entries[sid]
+                    self.drops += 1
+                if path is not None:
+                    stale.append(path)
+            else:
+                entry.path = path
+                entry.disk_bytes = len(data)
+                self._disk_bytes += entry.disk_bytes
+                self.spills += 1
+                # Oldest spills go first when the disk budget is exceeded
+                for old_sid, old in list(self._entries.items()):
+                    if self._disk_bytes <= self.spill_max_bytes:
+                        break
+                    if old.path is not None and old.trace is None:
+                        del self._entries[old_sid]
+                        self._disk_bytes -= old.disk_bytes
+                        self.drops += 1
+                        stale.append(old.path)
+        for old_path in stale:
+            _remove(old_path)
+
+    def session_bytes(self, sid: Hashable) -> int:
+        """Bytes accounted to one session's resident trace."""
+        with self._lock:
+            entry = self._entries.get(sid)
+            return entry.nbytes if entry is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Occupancy and eviction counters across every session."""
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "resident": sum(1 for e in self._entries.values() if e.trace is not None),
+                "spilled": sum(1 for e in self._entries.values() if e.path is not None),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_bytes": self._disk_bytes,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "reloads": self.reloads,
+                "drops": self.drops,
+                "expired": self.expired,
+            }
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,154 @@
+"""Lightweight per-phase latency histograms.
+
+Each phase (``generate``, ``draw``, ``encode``, ...) gets a fixed-size
+histogram with logarithmic buckets, eight per power of two, so recording a
+sample is a ``log2`` and an increment, memory does not grow with the number
+of samples, and percentiles are accurate to within about 9%. Counts, totals
+and maxima are exact.
+
+Usage::
+
+    timings = Timings()
+    with timings.phase("draw"):
+        fig = bar_figure.update(...)
+    timings.summary()   # {"draw": {"count": 1, "p50_ms": ..., ...}}
+"""
+import json
+import math
+import threading
+from time import perf_counter
+from typing import Dict, List, Optional
+
+# Buckets cover 1 us .. ~1 hour; anything outside is clamped to the ends
+BUCKETS_PER_OCTAVE = 8
+MIN_SECONDS = 1e-6
+OCTAVES = 32
+NUM_BUCKETS = BUCKETS_PER_OCTAVE * OCTAVES
+
+
+class Histogram:
+    """Log-bucketed latency histogram for one phase."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        if seconds > MIN_SECONDS:
+            bucket = min(int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_OCTAVE), NUM_BUCKETS - 1)
+        else:
+            bucket = 0
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Approximate ``q``-th percentile (0-100) in seconds; 0 when empty."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                # Geometric middle of the bucket, never above the true maximum
+                mid = MIN_SECONDS * 2 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE)
+                return min(mid, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count plus mean, p50, p95 and max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "max_ms": self.max * 1000,
+            "total_ms": self.total * 1000,
+        }
+
+
+class _Phase:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings: "Timings", name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> "_Phase":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.timings.record(self.name, perf_counter() - self.start)
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class Timings:
+    """Named phase histograms; thread-safe, cheap enough to leave enabled."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._phases: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def phase(self, name: str):
+        """Context manager timing its body into phase ``name``."""
+        return _Phase(self, name) if self.enabled else _NO_PHASE
+
+    def record(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._phases.get(name)
+            if hist is None:
+                hist = self._phases[name] = Histogram()
+            hist.record(seconds)
+
+    def phases(self) -> List[str]:
+        with self._lock:
+            return list(self._phases)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-phase summaries, in the order phases were first seen."""
+        with self._lock:
+            return {name: hist.summary() for name, hist in self._phases.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._phases.clear()
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Summaries plus raw bucket counts, so dumps can be merged or replotted."""
+        with self._lock:
+            data = {
+                "bucket_min_seconds": MIN_SECONDS,
+                "buckets_per_octave": BUCKETS_PER_OCTAVE,
+                "phases": {
+                    name: dict(hist.summary(), buckets={i: n for i, n in enumerate(hist.counts) if n})
+                    for name, hist in self._phases.items()
+                },
+            }
+        return json.dumps(data, indent=indent)
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.to_json())
@@ -0,0 +1,311 @@
+"""Delta-encoded frame traces.
+
+Instead of keeping a full copy of the array for every frame, a trace stores
+the operation each frame applied (``("compare", i, j)``, ``("swap", i, j)``,
+``("set", i, v)``) plus a full keyframe every ``keyframe_interval`` frames.
+The state of any frame is rebuilt on demand from the nearest keyframe.
+"""
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from utils.frame import STATIC_CODES, Frame, format_info
+
+DEFAULT_KEYFRAME_INTERVAL = 64
+
+
+def apply_op(state: List, op: Tuple) -> None:
+    """Apply a mutating op to ``state`` in place. Compares are no-ops."""
+    name = op[0]
+    if name == "swap":
+        i, j = op[1], op[2]
+        state[i], state[j] = state[j], state[i]
+    elif name == "set":
+        state[op[1]] = op[2]
+
+
+def written_indices(op: Optional[Tuple]) -> Tuple:
+    """Indices an op writes to; empty for compares and missing ops."""
+    if op is None:
+        return ()
+    if op[0] == "swap":
+        return (op[1], op[2])
+    if op[0] == "set":
+        return (op[1],)
+    return ()
+
+
+def keyframe_interval_for(n: int) -> int:
+    """Keyframe spacing that keeps keyframe memory roughly flat as arrays grow."""
+    return max(DEFAULT_KEYFRAME_INTERVAL, n // 64)
+
+
+class DeltaTrace:
+    """Sequence of frames stored as ops plus periodic keyframes.
+
+    Behaves like the list of frame dicts it replaces: ``len(trace)``,
+    ``trace[i]`` and iteration all work, with ``trace[i]['state']`` rebuilt
+    from the closest keyframe at or before ``i``.
+    """
+
+    def __init__(self, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self._ops: List[Optional[Tuple]] = []
+        self._highlights: List = []
+        # Frame code per frame (-1 for plain info text) and the matching
+        # args or text; Frame info is only formatted when read
+        self._codes = array("h")
+        self._infos: List[Union[str, Tuple]] = []
+        self._key_index: List[int] = []
+        self._key_states: List[List] = []
+        self._working: Optional[List] = None
+        # Frames whose state was replaced wholesale rather than reached by ops
+        self._resets = set()
+
+    @classmethod
+    def record(cls, gen: Iterable[Dict], keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL) -> "DeltaTrace":
+        """Consume a frame generator into a new trace."""
+        trace = cls(keyframe_interval)
+        for frame in gen:
+            trace.append(frame)
+        return trace
+
+    def append(self, frame: Dict) -> None:
+        """Add one frame. Frames without an ``op`` are diffed against the current state."""
+        idx = len(self._ops)
+        op = frame.get("op")
+        if self._working is None:
+            # The op is kept for counting; keyframed frames never replay theirs
+            self._working = list(frame.get("state", []))
+            self._add_keyframe(idx)
+        elif op is not None:
+            apply_op(self._working, op)
+        elif frame.get("state", self._working) != self._working:
+            # State changed without telling us how: store it whole
+            self._working = list(frame["state"])
+            self._add_keyframe(idx)
+            self._resets.add(idx)
+        self._ops.append(op)
+        self._highlights.append(frame.get("highlight", ()))
+        if isinstance(frame, Frame):
+            self._codes.append(frame.code)
+            self._infos.append(() if frame.code in STATIC_CODES else frame.args)
+        else:
+            self._codes.append(-1)
+            self._infos.append(frame.get("info", ""))
+        if idx % self.keyframe_interval == 0 and self._key_index[-1] != idx:
+            self._add_keyframe(idx)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the trace, for cache and session budgets."""
+        size = sys.getsizeof
+        total = (size(self) + size(self._ops) + size(self._highlights) + size(self._infos)
+                 + size(self._codes))
+        seen = set()
+        for items in (self._ops, self._highlights, self._infos):
+            for item in items:
+                # Shared objects (interned strings, the empty tuple, args that
+                # double as the highlight) count once
+                if id(item) not in seen:
+                    seen.add(id(item))
+                    total += size(item)
+        for state in self._key_states:
+            total += size(state)
+        return total
+
+    @property
+    def ops(self) -> List[Optional[Tuple]]:
+        """The op of every frame (None where a frame had none); do not modify."""
+        return self._ops
+
+    def info_at(self, i: int) -> str:
+        """Info text of frame ``i``."""
+        i = self._normalize(i)
+        code = self._codes[i]
+        return self._infos[i] if code < 0 else format_info(code, self._infos[i])
+
+    def _add_keyframe(self, idx: int) -> None:
+        self._key_index.append(idx)
+        self._key_states.append(list(self._working))
+
+    def state_at(self, i: int) -> List:
+        """Rebuild the state at frame ``i`` (a fresh list the caller may keep)."""
+        i = self._normalize(i)
+        k = bisect_right(self._key_index, i) - 1
+        state = list(self._key_states[k])
+        ops = self._ops
+        for t in range(self._key_index[k] + 1, i + 1):
+            op = ops[t]
+            if op is not None:
+                apply_op(state, op)
+        return state
+
+    def _normalize(self, i: int) -> int:
+        n = len(self._ops)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("trace index out of range")
+        return i
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def __getitem__(self, i: int) -> Dict:
+        i = self._normalize(i)
+        return {
+            "state": self.state_at(i),
+            "highlight": self._highlights[i],
+            "info": self.info_at(i),
+            "op": self._ops[i],
+        }
+
+    def deltas(self, start: int = 0, stop: Optional[int] = None
+               ) -> Iterator[Tuple[Optional[Tuple], Optional[List], object, str]]:
+        """Yield ``(op, reset_state, highlight, info)`` for frames ``start:stop``.
+
+        ``reset_state`` is the full state for frames that replaced it without
+        an op (always including frame 0) and None otherwise, so a consumer
+        can replay the whole trace from ops alone. No other state is built.
+        """
+        stop = len(self._ops) if stop is None else min(stop, len(self._ops))
+        k = bisect_left(self._key_index, start)
+        for i in range(start, stop):
+            reset = None
+            while k < len(self._key_index) and self._key_index[k] < i:
+                k += 1
+            if i == 0 or i in self._resets:
+                reset = self._key_states[k]
+            yield self._ops[i], reset, self._highlights[i], self.info_at(i)
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """Frames ``start:stop``, seeking once and then walking forward op by op."""
+        stop = len(self._ops) if stop is None else min(stop, len(self._ops))
+        if start >= stop:
+            return
+        state = self.state_at(start)
+        # First keyframe after start; the walk resyncs on it
+        k = bisect_right(self._key_index, start)
+        for i in range(start, stop):
+            op = self._ops[i]
+            if i > start:
+                if k < len(self._key_index) and self._key_index[k] == i:
+                    state = list(self._key_states[k])
+                    k += 1
+                elif op is not None:
+                    apply_op(state, op)
+            yield {"state": list(state), "highlight": self._highlights[i], "info": self.info_at(i), "op": op}
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_range()
+
+
+class LazyTrace:
+    """Seekable trace that pulls frames from a generator only as they are needed.
+
+    Frames already pulled are kept in a :class:`DeltaTrace`, whose keyframes
+    act as checkpoints: seeking back to any generated frame costs at most one
+    keyframe copy plus ``keyframe_interval`` ops, and seeking forward runs the
+    generator just far enough to reach the requested index.
+    """
+
+    def __init__(self, gen: Iterable[Dict], keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 on_complete: Optional[Callable[[DeltaTrace], None]] = None):
+        self._gen: Optional[Iterator[Dict]] = iter(gen)
+        self._trace = DeltaTrace(keyframe_interval)
+        # Called once with the finished trace, e.g. to publish it to a cache
+        self._on_complete = on_complete
+        # What the generator raised, if it failed before finishing
+        self.error: Optional[Exception] = None
+
+    @classmethod
+    def from_trace(cls, trace: DeltaTrace) -> "LazyTrace":
+        """Wrap an already recorded trace."""
+        lazy = cls((), trace.keyframe_interval)
+        lazy._trace = trace
+        lazy._gen = None
+        return lazy
+
+    @property
+    def exhausted(self) -> bool:
+        """True once the generator has been run to completion."""
+        return self._gen is None
+
+    @property
+    def total(self) -> Optional[int]:
+        """Number of frames in the full run, or None while it is still unknown."""
+        return len(self._trace) if self._gen is None else None
+
+    @property
+    def trace(self) -> DeltaTrace:
+        """The frames generated so far."""
+        return self._trace
+
+    def fill_to(self, i: int) -> None:
+        """Run the generator until frame ``i`` exists or the run ends.
+
+        If the generator raises, the error propagates and the run is marked
+        failed (see :attr:`error`). It is not completed: ``on_complete`` never
+        sees the partial trace. Later calls that need frames past the failure
+        raise the same error again.
+        """
+        trace, gen = self._trace, self._gen
+        if gen is None:
+            if self.error is not None and i >= len(trace):
+                raise self.error
+            return
+        while len(trace) <= i:
+            try:
+                trace.append(next(gen))
+            except StopIteration:
+                self._gen = None
+                if self._on_complete is not None:
+                    self._on_complete(trace)
+                    self._on_complete = None
+                return
+            except Exception as e:
+                self._gen = None
+                self._on_complete = None
+                self.error = e
+                raise
+
+    def info_at(self, i: int) -> str:
+        """Info text of frame ``i`` without rebuilding its state."""
+        self.fill_to(i)
+        return self._trace.info_at(i)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the frames generated so far."""
+        return self._trace.nbytes()
+
+    def fill_all(self) -> DeltaTrace:
+        """Generate every remaining frame and return the complete trace."""
+        while self._gen is not None:
+            self.fill_to(len(self._trace))
+        return self._trace
+
+    def has(self, i: int) -> bool:
+        """Whether frame ``i`` exists, generating up to it if necessary."""
+        self.fill_to(i)
+        return 0 <= i < len(self._trace)
+
+    def __len__(self) -> int:
+        # Frames generated so far; equals the full length once exhausted
+        return len(self._trace)
+
+    def __bool__(self) -> bool:
+        return self.has(0)
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            self.fill_all()
+        else:
+            self.fill_to(i)
+        return self._trace[i]
+
+    def __iter__(self) -> Iterator[Dict]:
+        i = 0
+        while self.has(i):
+            yield self._trace[i]
+            i += 1
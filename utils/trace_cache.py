@@ -0,0 +1,166 @@
+"""Process-wide cache of finished traces, shared by every session.
+
+Entries are keyed by ``(algorithm name, algorithm version, input hash,
+target)`` and kept in memory under a byte budget with least-recently-used
+eviction. Evicted traces can optionally spill to an on-disk store, which has
+its own budget, and are loaded back on the next hit.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.trace import DeltaTrace
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def algo_version(func: Callable) -> str:
+    """Short hash of the source of the module defining ``func``.
+
+    Editing an algorithm (or a helper in the same file) changes its version,
+    so stale traces are never served after a code change.
+    """
+    module = inspect.getmodule(func)
+    try:
+        source = inspect.getsource(module) if module is not None else inspect.getsource(func)
+    except (OSError, TypeError):
+        source = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    return hashlib.sha1(source.encode()).hexdigest()[:12]
+
+
+def input_hash(arr: Sequence) -> str:
+    """Stable digest of an input array."""
+    values = np.asarray(arr)
+    if values.dtype == np.int64 and values.ndim == 1:
+        # The raw bytes hash several times faster than repr() of a big list
+        return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+    return hashlib.blake2b(repr(list(arr)).encode(), digest_size=16).hexdigest()
+
+
+def make_key(algo_name: str, func: Callable, arr: Sequence, target=None, granularity="all") -> Tuple:
+    """Cache key for running ``func`` (registered as ``algo_name``) on ``arr``."""
+    return (algo_name, algo_version(func), input_hash(arr), target, granularity)
+
+
+class TraceCache:
+    """Thread-safe LRU cache of :class:`DeltaTrace` objects with a byte budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, spill_dir: Optional[str] = None,
+                 spill_max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes if spill_max_bytes is not None else 4 * max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[DeltaTrace, int]]" = OrderedDict()
+        self._disk: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def get(self, key: Hashable) -> Optional[DeltaTrace]:
+        """Return the cached trace for ``key`` or None, counting the hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            spilled = self._disk.pop(key, None)
+            if spilled is None:
+                self.misses += 1
+                return None
+            path, size = spilled
+            self._disk_bytes -= size
+        try:
+            with open(path, "rb") as f:
+                trace = pickle.load(f)
+            os.remove(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self.put(key, trace)
+        return trace
+
+    def put(self, key: Hashable, trace: DeltaTrace) -> None:
+        """Insert a finished trace, evicting least recently used entries to fit."""
+        size = trace.nbytes()
+        spill = []
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (trace, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, (old_trace, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+                spill.append((old_key, old_trace))
+        # Pickling happens outside the lock so other sessions are not blocked
+        for old_key, old_trace in spill:
+            self._spill(old_key, old_trace)
+
+    def holds(self, trace: DeltaTrace) -> bool:
+        """Whether this very trace object is resident in the cache."""
+        with self._lock:
+            return any(entry[0] is trace for entry in self._entries.values())
+
+    def _spill(self, key: Hashable, trace: DeltaTrace) -> None:
+        if not self.spill_dir:
+            return
+        name = hashlib.sha1(repr(key).encode()).hexdigest() + ".pkl"
+        path = os.path.join(self.spill_dir, name)
+        try:
+            with open(path, "wb") as f:
+                pickle.dump(trace, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        stale = []
+        with self._lock:
+            previous = self._disk.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous[1]
+            self._disk[key] = (path, size)
+            self._disk_bytes += size
+            while self._disk_bytes > self.spill_max_bytes and self._disk:
+                _, (old_path, old_size) = self._disk.popitem(last=False)
+                self._disk_bytes -= old_size
+                stale.append(old_path)
+        for old_path in stale:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
@@ -0,0 +1,413 @@
+"""Binary on-disk traces, recorded from a generator and replayed through mmap.
+
+File layout (little-endian)::
+
+    header        HEADER struct (magic, version, sizes and section offsets)
+    records       one RECORD_DTYPE entry per frame, fixed width
+    keyframes     (keyframes, n) int64 states
+    key index     (keyframes,) int64 frame index of each keyframe
+    strings       JSON list of info texts of plain dict frames
+
+Each record holds the frame's op kind, its info code (a
+:data:`utils.frame.CODES` index, or ``-1 - k`` for the k-th string of the
+string table), up to three args and up to three highlighted indices. Frame
+``i`` is one record at a fixed offset, and its state is the nearest keyframe
+at or before ``i`` plus at most ``keyframe_interval`` replayed ops, so any
+frame is reachable without reading the rest of the file.
+
+The recorder streams records straight to disk and keyframes to a temporary
+file that is appended on close, so memory stays flat however long the run.
+
+Command line (from the repository root)::
+
+    python -m utils.trace_file record "Bubble Sort" --random 2000 --out bubble.avtrace
+    python -m utils.trace_file replay bubble.avtrace --frame 123456
+    python -m utils.trace_file replay bubble.avtrace --show --every 1000
+"""
+import argparse
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from utils.frame import Frame, format_info, parse_granularity
+from utils.ingest import DISTRIBUTIONS, generate, load_file, parse_text
+from utils.trace import DEFAULT_KEYFRAME_INTERVAL, apply_op
+
+EXTENSION = ".avtrace"
+MAGIC = b"AVTRACE\0"
+VERSION = 1
+# magic, version, record size, n, frames, keyframe interval, keyframes,
+# records / keyframes / key index / strings offsets, strings length
+HEADER = struct.Struct("<8sIIQQQQQQQQQ")
+
+MAX_ARGS = 3
+MAX_HIGHLIGHT = 3
+RECORD_DTYPE = np.dtype([
+    ("op", "u1"),
+    ("nargs", "u1"),
+    ("nhl", "u1"),
+    ("pad", "u1"),
+    ("info", "<i4"),
+    ("args", "<i8", (MAX_ARGS,)),
+    ("highlight", "<i4", (MAX_HIGHLIGHT,)),
+])
+
+# Op kinds in the ``op`` field; RESET marks a frame whose state was replaced
+# wholesale (it always has a keyframe)
+NO_OP, COMPARE, SWAP, SET, RESET = range(5)
+OP_KINDS = {"compare": COMPARE, "swap": SWAP, "set": SET}
+OP_NAMES = {v: k for k, v in OP_KINDS.items()}
+
+_CHUNK = 8192
+
+
+def file_keyframe_interval_for(n: int) -> int:
+    """Keyframe spacing for trace files.
+
+    Reading a state costs O(n) anyway, so replaying up to ``n / 8`` ops after
+    the keyframe costs the same order while keyframes stay about 64 bytes
+    per frame on disk.
+    """
+    return max(DEFAULT_KEYFRAME_INTERVAL, n // 8)
+
+
+class TraceWriter:
+    """Stream frames into a trace file; use as a context manager or call ``close``.
+
+    Leaving the context on an exception calls :meth:`abort` instead, so a
+    run that failed part way leaves no file behind.
+    """
+
+    def __init__(self, path: str, keyframe_interval: Optional[int] = None):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self._file = open(path, "wb")
+        self._file.write(b"\0" * HEADER.size)
+        self._keys = tempfile.TemporaryFile()
+        self._key_index: List[int] = []
+        self._strings: Dict[str, int] = {}
+        self._buffer = np.zeros(_CHUNK, RECORD_DTYPE)
+        self._buffered = 0
+        self._working: Optional[List] = None
+        self.n = 0
+        self.frames = 0
+
+    def _string_code(self, text: str) -> int:
+        k = self._strings.setdefault(text, len(self._strings))
+        return -1 - k
+
+    def _keyframe(self, idx: int) -> None:
+        self._key_index.append(idx)
+        self._keys.write(np.asarray(self._working, dtype="<i8").tobytes())
+
+    def append(self, frame) -> None:
+        """Add one frame (a :class:`Frame` or a dict frame over a flat int array)."""
+        idx = self.frames
+        if isinstance(frame, Frame):
+            op, code, args = frame.op, frame.code, frame.args
+        else:
+            op = frame.get("op")
+            code = self._string_code(frame.get("info", ""))
+            args = op[1:] if op is not None else ()
+        state = frame["state"]
+        kind = OP_KINDS[op[0]] if op is not None else NO_OP
+        if self._working is None:
+            self._working = list(state)
+            self.n = len(self._working)
+            if self.keyframe_interval is None:
+                self.keyframe_interval = file_keyframe_interval_for(self.n)
+            self._keyframe(idx)
+        elif op is not None:
+            apply_op(self._working, op)
+        elif state != self._working:
+            # State changed without an op: store it whole
+            if len(state) != self.n:
+                raise ValueError("trace files need a fixed array length")
+            self._working = list(state)
+            self._keyframe(idx)
+            kind = RESET
+        if idx % self.keyframe_interval == 0 and self._key_index[-1] != idx:
+            self._keyframe(idx)
+
+        highlight = frame.get("highlight", ())
+        if not isinstance(highlight, (list, tuple)):
+            highlight = (highlight,)
+        if len(args) > MAX_ARGS or len(highlight) > MAX_HIGHLIGHT:
+            raise ValueError(f"frames can have at most {MAX_ARGS} args and {MAX_HIGHLIGHT} highlights")
+        rec = self._buffer[self._buffered]
+        rec["op"] = kind
+        rec["nargs"] = len(args)
+        rec["nhl"] = len(highlight)
+        rec["info"] = code
+        rec["args"][:len(args)] = args
+        rec["highlight"][:len(highlight)] = highlight
+        self._buffered += 1
+        self.frames += 1
+        if self._buffered == _CHUNK:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._file.write(self._buffer[:self._buffered].tobytes())
+        self._buffer[:] = 0
+        self._buffered = 0
+
+    def close(self) -> None:
+        """Write the keyframes, index and string table, then the header."""
+        if self._file.closed:
+            return
+        try:
+            self._flush()
+            keyframes_offset = self._file.tell()
+            self._keys.seek(0)
+            shutil.copyfileobj(self._keys, self._file)
+            keyindex_offset = self._file.tell()
+            self._file.write(np.asarray(self._key_index, dtype="<i8").tobytes())
+            strings_offset = self._file.tell()
+            strings = json.dumps(list(self._strings)).encode()
+            self._file.write(strings)
+            self._file.seek(0)
+            self._file.write(HEADER.pack(
+                MAGIC, VERSION, RECORD_DTYPE.itemsize, self.n, self.frames, self.keyframe_interval or 0,
+                len(self._key_index), HEADER.size, keyframes_offset, keyindex_offset, strings_offset,
+                len(strings)))
+        finally:
+            self._file.close()
+            self._keys.close()
+
+    def abort(self) -> None:
+        """Stop recording and delete the partial file, so it is never mistaken for a whole run."""
+        if self._file.closed:
+            return
+        self._file.close()
+        self._keys.close()
+        os.remove(self.path)
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def record_file(gen: Iterable, path: str, keyframe_interval: Optional[int] = None) -> int:
+    """Stream every frame of ``gen`` into a trace file and return the frame count."""
+    with TraceWriter(path, keyframe_interval) as writer:
+        for frame in gen:
+            writer.append(frame)
+    return writer.frames
+
+
+def list_trace_files(directory: str) -> List[str]:
+    """Names of the trace files directly inside ``directory`` that :func:`resolve_trace_path` accepts."""
+    names = []
+    for name in sorted(os.listdir(directory)):
+        try:
+            if os.path.isfile(resolve_trace_path(directory, name)):
+                names.append(name)
+        except ValueError:
+            pass
+    return names
+
+
+def resolve_trace_path(directory: str, name: str) -> str:
+    """Path of trace file ``name`` inside ``directory``.
+
+    Raises ValueError for anything that resolves outside the directory
+    (absolute paths, ``..``, symlinks pointing elsewhere) or lacks the
+    trace extension, so a name typed into a web form cannot open other files.
+    """
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.dirname(path) != root or not path.endswith(EXTENSION):
+        raise ValueError(f"{name!r} is not a trace file in the trace directory")
+    return path
+
+
+class TraceFile:
+    """Memory-mapped, read-only view of a trace file.
+
+    Offers the parts of the :class:`~utils.trace.LazyTrace` interface the
+    player uses (``len``, ``has``, ``fill_to``, ``exhausted``, indexing), and
+    ``trace[i]`` returns the same dict as ``DeltaTrace[i]``. Only the pages
+    for the requested frames are read.
+    """
+
+    exhausted = True
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            raw = f.read(HEADER.size)
+            if len(raw) < HEADER.size:
+                raise ValueError(f"{path} is not a trace file")
+            (magic, version, record_size, self.n, self.frames, self.keyframe_interval, keyframes,
+             records_offset, keyframes_offset, keyindex_offset, strings_offset, strings_len) = HEADER.unpack(raw)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a trace file")
+            if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+                raise ValueError(f"{path} has unsupported trace format version {version}")
+            if self.frames == 0 or keyframes == 0:
+                raise ValueError(f"{path} is empty or was not closed properly")
+            f.seek(strings_offset)
+            self._strings = json.loads(f.read(strings_len))
+        self._records = np.memmap(path, RECORD_DTYPE, "r", offset=records_offset, shape=(self.frames,))
+        self._key_states = np.memmap(path, "<i8", "r", offset=keyframes_offset, shape=(keyframes, self.n))
+        self._key_index = np.fromfile(path, "<i8", count=keyframes, offset=keyindex_offset).tolist()
+
+    def fill_to(self, i: int) -> None:
+        """The file is complete; nothing to generate."""
+
+    def has(self, i: int) -> bool:
+        return 0 <= i < self.frames
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def __bool__(self) -> bool:
+        return self.frames > 0
+
+    def _normalize(self, i: int) -> int:
+        if i < 0:
+            i += self.frames
+        if not 0 <= i < self.frames:
+            raise IndexError("trace index out of range")
+        return i
+
+    @staticmethod
+    def _replay(state: List, kinds: List[int], args: List[List[int]]) -> None:
+        for kind, a in zip(kinds, args):
+            if kind == SWAP:
+                i, j = a[0], a[1]
+                state[i], state[j] = state[j], state[i]
+            elif kind == SET:
+                state[a[0]] = a[1]
+
+    def state_at(self, i: int) -> List[int]:
+        """Rebuild the state at frame ``i`` as a fresh list."""
+        i = self._normalize(i)
+        k = bisect_right(self._key_index, i) - 1
+        state = self._key_states[k].tolist()
+        window = self._records[self._key_index[k] + 1:i + 1]
+        self._replay(state, window["op"].tolist(), window["args"][:, :2].tolist())
+        return state
+
+    def _frame(self, rec, state: List) -> Dict:
+        kind = int(rec["op"])
+        args = tuple(rec["args"][:rec["nargs"]].tolist())
+        code = int(rec["info"])
+        info = format_info(code, args) if code >= 0 else self._strings[-1 - code]
+        op = (OP_NAMES[kind], args[0], args[1]) if kind in OP_NAMES else None
+        return {"state": state, "highlight": tuple(rec["highlight"][:rec["nhl"]].tolist()),
+                "info": info, "op": op}
+
+    def __getitem__(self, i: int) -> Dict:
+        i = self._normalize(i)
+        return self._frame(self._records[i], self.state_at(i))
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator[Dict]:
+        """Frames ``start:stop:step``, walking forward instead of seeking per frame."""
+        stop = self.frames if stop is None else min(stop, self.frames)
+        if start >= stop:
+            return
+        state = self.state_at(start)
+        yield self._frame(self._records[start], list(state))
+        pos = start
+        for target in range(start + step, stop, step):
+            # Replay in chunks so long strides never pull a huge window at once
+            while pos < target:
+                end = min(target, pos + _CHUNK)
+                window = self._records[pos + 1:end + 1]
+                kinds = window["op"].tolist()
+                if RESET in kinds:
+                    state = self.state_at(end)
+                else:
+                    self._replay(state, kinds, window["args"][:, :2].tolist())
+                pos = end
+            yield self._frame(self._records[target], list(state))
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_range()
+
+    def close(self) -> None:
+        """Drop the memory maps; they are unmapped once no frame views remain."""
+        self._records = self._key_states = None
+
+    def __enter__(self) -> "TraceFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _generator_for(algo_name: str, arr: List[int], target: Optional[int], granularity="all"):
+    from utils.algo_interface import ALGOS
+    if algo_name in ALGOS:
+        return ALGOS[algo_name](arr, granularity=granularity)
+    if algo_name == "Binary Search":
+        from algorithms.binary_search import binary_search
+        arr = sorted(arr)
+        return binary_search(arr, arr[0] if target is None else target, granularity)
+    raise SystemExit(f"Unknown algorithm {algo_name!r}")
+
+
+def main(argv=None) -> int:
+    from utils.algo_interface import ALGOS
+    parser = argparse.ArgumentParser(description="Record algorithm traces to disk and replay them.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="run an algorithm and stream its trace to a file")
+    rec.add_argument("algorithm", help=", ".join(list(ALGOS) + ["Binary Search"]))
+    source = rec.add_mutually_exclusive_group(required=True)
+    source.add_argument("--array", help="comma separated integers")
+    source.add_argument("--random", type=int, metavar="N", help="N generated integers (see --distribution)")
+    source.add_argument("--input", metavar="PATH", help="a .csv or .npy file of integers")
+    rec.add_argument("--distribution", choices=DISTRIBUTIONS, default="random", help="input shape for --random")
+    rec.add_argument("--seed", type=int, default=0, help="seed for --random")
+    rec.add_argument("--target", type=int, help="target value for Binary Search")
+    rec.add_argument("--out", required=True, help="output trace file")
+    rec.add_argument("--keyframe-interval", type=int, help="frames between keyframes (default: n/8)")
+    rec.add_argument("--granularity", type=parse_granularity, default="all",
+                     help="all, mutations, passes or k for every k-th step (default: all)")
+    rep = sub.add_parser("replay", help="inspect or play back a trace file")
+    rep.add_argument("path")
+    rep.add_argument("--frame", type=int, action="append", help="print this frame (repeatable)")
+    rep.add_argument("--show", action="store_true", help="animate the trace with matplotlib")
+    rep.add_argument("--every", type=int, default=1, help="with --show, draw every k-th frame")
+    rep.add_argument("--speed", type=float, help="with --show, frames per second (default: as fast as possible)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        if args.array is not None:
+            arr = parse_text(args.array).tolist()
+        elif args.input is not None:
+            arr = load_file(args.input).tolist()
+        else:
+            arr = generate(args.distribution, args.random, args.seed).tolist()
+        count = record_file(_generator_for(args.algorithm, arr, args.target, args.granularity), args.out, args.keyframe_interval)
+        print(f"Wrote {count} frames to {args.out} ({os.path.getsize(args.out) / 2**20:.1f} MiB)")
+        return 0
+
+    with TraceFile(args.path) as trace:
+        print(f"{args.path}: {len(trace)} frames, n={trace.n}, keyframe every {trace.keyframe_interval} frames")
+        for i in args.frame or ():
+            frame = trace[i]
+            state = frame["state"]
+            shown = state if len(state) <= 20 else state[:20] + ["..."]
+            print(f"[{i}] {frame['info']} op={frame['op']} highlight={frame['highlight']} state={shown}")
+    if args.show:
+        from visualizers.sorting_visualizer import visualize_trace_file
+        visualize_trace_file(args.path, every=args.every, speed=args.speed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
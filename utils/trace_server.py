@@ -0,0 +1,315 @@
+"""Streaming trace API over HTTP, on asyncio and the standard library.
+
+Other tools can fetch traces without importing the generators::
+
+    python -m utils.trace_server --port 8765
+    curl 'http://127.0.0.1:8765/trace?algo=Bubble%20Sort&array=5,2,4,1,3'
+    curl 'http://127.0.0.1:8765/trace?algo=Merge%20Sort&random=5000&from=1000&to=1100&encoding=delta'
+
+Endpoints (GET only):
+
+- ``/algorithms``: JSON list of the sorting and search algorithms.
+- ``/trace``: NDJSON, one frame per line. Parameters:
+
+  - ``algo``: an algorithm name from ``/algorithms``.
+  - The input: ``array`` (comma separated integers), or ``random=N`` with
+    optional ``distribution`` and ``seed``. See :mod:`utils.ingest`.
+  - ``target`` for search algorithms, and only for them. Their input is
+    sorted first.
+  - ``granularity``: ``all``, ``mutations``, ``passes`` or an integer k.
+  - ``from`` and ``to``: the frame range ``[from, to)``; defaults to the
+    whole run.
+  - ``encoding``: ``full`` (the default) puts ``state`` on every line.
+    ``delta`` puts the full ``state`` on the first line only. Later lines
+    carry the compact ``op`` of :func:`utils.web_player.compact_op`:
+    ``["s", i, j]``, ``["w", i, v]``, ``["k", state]`` for a state replaced
+    wholesale, or ``0``.
+
+- ``/stats``: trace cache counters.
+
+Bad parameters get a 400 with a JSON ``error``; unexpected failures get a
+500 when no response has started yet, and a closed connection otherwise.
+
+Frames are streamed while the generator runs, in chunks of ``CHUNK``
+frames, or fewer for large inputs (see :func:`chunk_frames`). After each
+chunk the handler awaits ``drain()``, so a slow client pauses its
+generator instead of buffering its trace. It then yields to the event loop,
+so one long trace cannot starve other clients.
+
+Runs are recorded into a :class:`~utils.trace.LazyTrace` (ops plus
+keyframes, not a list of frames), and never into a list of frames.
+Finished traces go into a process-wide :class:`~utils.trace_cache.TraceCache`,
+so repeated and ranged requests seek into the cached trace without running
+the generator again. Unfinished runs stay in a small in-flight table that
+other requests for the same trace share. A client paging through a long
+run therefore continues it rather than restarting it.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import traceback
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from utils.frame import parse_granularity
+from utils.ingest import MAX_SIZE, generate, parse_text
+from utils.registry import Registry, default_registry
+from utils.trace import DeltaTrace, LazyTrace, keyframe_interval_for
+from utils.trace_cache import DEFAULT_MAX_BYTES, TraceCache, make_key
+from utils.web_player import compact_op
+
+# Frames per chunk are capped by count and by array elements copied, so one
+# chunk stays around a few milliseconds of generator and encoder work at any n
+CHUNK = 256
+CHUNK_ELEMENTS = 2 ** 18
+# Unfinished runs kept for other requests to continue, least recently used dropped first
+MAX_IN_FLIGHT = 32
+MAX_REQUEST_BYTES = 16 * 1024
+CATEGORIES = ("sorting", "search")
+ENCODINGS = ("full", "delta")
+
+
+def chunk_frames(n: int) -> int:
+    """Frames per chunk for an ``n``-element input."""
+    return max(1, min(CHUNK, CHUNK_ELEMENTS // max(n, 1)))
+
+
+class BadRequest(ValueError):
+    """A request the server answers with 400."""
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+
+def _highlight(highlight) -> List:
+    return list(highlight) if isinstance(highlight, (list, tuple)) else [highlight]
+
+
+class TraceServer:
+    """HTTP handler state: the trace cache and the in-flight runs."""
+
+    def __init__(self, cache: Optional[TraceCache] = None, registry: Optional[Registry] = None):
+        self.cache = cache or TraceCache(DEFAULT_MAX_BYTES)
+        self.registry = registry or default_registry()
+        self._in_flight: "OrderedDict[Hashable, LazyTrace]" = OrderedDict()
+        # Connections whose response head has been written
+        self._answered = set()
+
+    # -- requests -------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.LimitOverrunError:
+                await self._send_error(writer, 431, "request headers too large")
+                return
+            except asyncio.IncompleteReadError:
+                return
+            method, _, target = head.split(b"\r\n", 1)[0].decode("latin-1").partition(" ")
+            if method != "GET":
+                await self._send_error(writer, 405, "only GET is supported")
+                return
+            url = urlsplit(target.rsplit(" ", 1)[0])
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == "/trace":
+                await self._stream_trace(writer, params)
+            elif url.path == "/algorithms":
+                await self._send_json(writer, [
+                    {"name": spec.name, "category": spec.category, "input": spec.input,
+                     "complexity": spec.complexity}
+                    for spec in self.registry if spec.category in CATEGORIES])
+            elif url.path == "/stats":
+                await self._send_json(writer, dict(self.cache.stats(), in_flight=len(self._in_flight)))
+            else:
+                await self._send_error(writer, 404, f"no such endpoint {url.path!r}")
+        except ConnectionError:
+            pass  # client went away; its run stays in flight for others
+        except Exception as e:
+            # A server bug rather than a bad request: say so if the response has not started
+            traceback.print_exc()
+            if writer not in self._answered:
+                try:
+                    await self._send_error(writer, 500, f"{type(e).__name__}: {e}")
+                except ConnectionError:
+                    pass
+        finally:
+            self._answered.discard(writer)
+            writer.close()
+
+    def _parse(self, params: Dict[str, str]) -> Tuple[str, List[int], Optional[int], object, int, Optional[int], str]:
+        name = params.get("algo", "")
+        if name not in self.registry or self.registry.get(name).category not in CATEGORIES:
+            raise BadRequest(f"unknown algorithm {name!r}; see /algorithms")
+        try:
+            if "array" in params:
+                arr = parse_text(params["array"]).tolist()
+            elif "random" in params:
+                arr = generate(params.get("distribution", "random"), int(params["random"]),
+                               int(params.get("seed", 0))).tolist()
+            else:
+                raise BadRequest("give the input as array=... or random=N")
+            target = int(params["target"]) if "target" in params else None
+            granularity = parse_granularity(params.get("granularity", "all"))
+            start = int(params.get("from", 0))
+            stop = int(params["to"]) if "to" in params else None
+        except BadRequest:
+            raise
+        except ValueError as e:
+            raise BadRequest(str(e)) from e
+        if not arr:
+            raise BadRequest("the input array is empty")
+        if start < 0 or (stop is not None and stop < start):
+            raise BadRequest("need 0 <= from <= to")
+        encoding = params.get("encoding", "full")
+        if encoding not in ENCODINGS:
+            raise BadRequest(f"unknown encoding {encoding!r}; use {' or '.join(ENCODINGS)}")
+        if self.registry.get(name).category == "search":
+            if target is None:
+                raise BadRequest("search algorithms need a target")
+            arr = sorted(arr)
+        elif target is not None:
+            raise BadRequest(f"{name} takes no target; only search algorithms do")
+        return name, arr, target, granularity, start, stop, encoding
+
+    def open_trace(self, name: str, arr: List[int], target, granularity) -> Tuple[LazyTrace, str]:
+        """The run for these arguments: cached, in flight, or newly started."""
+        func = self.registry.get(name).load()
+        key = make_key(name, func, arr, target, granularity)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LazyTrace.from_trace(cached), "hit"
+        lazy = self._in_flight.get(key)
+        if lazy is not None and lazy.error is None:
+            self._in_flight.move_to_end(key)
+            return lazy, "in-flight"
+        gen = func(list(arr), granularity=granularity) if target is None else func(list(arr), target, granularity=granularity)
+
+        def done(trace, key=key):
+            self._in_flight.pop(key, None)
+            self.cache.put(key, trace)
+
+        lazy = self._in_flight[key] = LazyTrace(gen, keyframe_interval_for(len(arr)), on_complete=done)
+        while len(self._in_flight) > MAX_IN_FLIGHT:
+            self._in_flight.popitem(last=False)
+        return lazy, "miss"
+
+    async def _stream_trace(self, writer: asyncio.StreamWriter, params: Dict[str, str]) -> None:
+        try:
+            name, arr, target, granularity, start, stop, encoding = self._parse(params)
+        except BadRequest as e:
+            await self._send_error(writer, 400, str(e))
+            return
+        lazy, source = self.open_trace(name, arr, target, granularity)
+        self._write_head(writer, 200, "application/x-ndjson", {"X-Trace-Cache": source})
+        chunk = chunk_frames(len(arr))
+        encode = self._full_lines if encoding == "full" else self._delta_lines
+        pos = start
+        try:
+            # Seek in chunks too, so a far ``from`` does not block other clients
+            while not lazy.exhausted and len(lazy) < pos:
+                lazy.fill_to(len(lazy) + chunk)
+                await asyncio.sleep(0)
+            while stop is None or pos < stop:
+                # Generate (or look up) one chunk, send it, then wait for the client to take it.
+                # Other clients get a turn between each of those steps.
+                await asyncio.sleep(0)
+                end = pos + chunk if stop is None else min(stop, pos + chunk)
+                lazy.fill_to(end - 1)
+                end = min(end, len(lazy))
+                if pos >= end:
+                    break
+                await asyncio.sleep(0)
+                writer.writelines(encode(lazy.trace, pos, end, start))
+                await writer.drain()
+                pos = end
+        except Exception as e:  # a generator that raises ends the stream with an error line
+            if isinstance(e, ConnectionError):
+                raise
+            self._forget(lazy)
+            writer.write(_dumps({"error": f"{type(e).__name__}: {e}"}))
+        await writer.drain()
+
+    def _forget(self, lazy: LazyTrace) -> None:
+        """Drop a failed run, so the next request for it starts over."""
+        for key, running in list(self._in_flight.items()):
+            if running is lazy:
+                del self._in_flight[key]
+
+    @staticmethod
+    def _full_lines(trace: DeltaTrace, pos: int, end: int, start: int) -> List[bytes]:
+        return [_dumps({"i": i, "state": frame["state"],
+                        "op": list(frame["op"]) if frame["op"] is not None else None,
+                        "highlight": _highlight(frame["highlight"]), "info": frame["info"]})
+                for i, frame in enumerate(trace.iter_range(pos, end), pos)]
+
+    @staticmethod
+    def _delta_lines(trace: DeltaTrace, pos: int, end: int, start: int) -> List[bytes]:
+        # Only the stream's first line rebuilds a state; the rest are ops
+        lines = []
+        for i, (op, reset, highlight, info) in enumerate(trace.deltas(pos, end), pos):
+            line = {"i": i, "state": trace.state_at(i)} if i == start else {"i": i, "op": compact_op(op, reset)}
+            line["highlight"] = _highlight(highlight)
+            line["info"] = info
+            lines.append(_dumps(line))
+        return lines
+
+    # -- responses ------------------------------------------------------
+
+    @staticmethod
+    def _head(status: int, content_type: str, extra: Optional[Dict[str, str]] = None) -> bytes:
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                   431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+        headers = {"Content-Type": content_type, "Cache-Control": "no-store",
+                   "Access-Control-Allow-Origin": "*", "Connection": "close"}
+        headers.update(extra or {})
+        lines = [f"HTTP/1.1 {status} {reasons[status]}"] + [f"{k}: {v}" for k, v in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def _write_head(self, writer: asyncio.StreamWriter, status: int, content_type: str,
+                    extra: Optional[Dict[str, str]] = None) -> None:
+        self._answered.add(writer)
+        writer.write(self._head(status, content_type, extra))
+
+    async def _send_json(self, writer: asyncio.StreamWriter, payload, status: int = 200) -> None:
+        self._write_head(writer, status, "application/json")
+        writer.write(_dumps(payload))
+        await writer.drain()
+
+    async def _send_error(self, writer: asyncio.StreamWriter, status: int, message: str) -> None:
+        await self._send_json(writer, {"error": message}, status)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, cache: Optional[TraceCache] = None) -> asyncio.AbstractServer:
+    """Start a trace server; returns the listening ``asyncio`` server (``port=0`` picks a free port)."""
+    server = TraceServer(cache)
+    return await asyncio.start_server(server.handle, host, port, limit=MAX_REQUEST_BYTES)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve algorithm traces as streaming NDJSON over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_MAX_BYTES // 2**20, help="trace cache budget")
+    parser.add_argument("--cache-dir", help="directory evicted traces spill to")
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = await serve(args.host, args.port, TraceCache(args.cache_mb * 2**20, spill_dir=args.cache_dir))
+        print(f"Serving traces on http://{args.host}:{server.sockets[0].getsockname()[1]} "
+              f"(inputs up to {MAX_SIZE:,} values)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
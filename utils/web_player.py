@@ -0,0 +1,167 @@
+"""Browser-side playback for recorded traces.
+
+The whole trace is serialized once as compact JSON (initial state plus one
+small op per frame) and embedded in a self-contained HTML/JS canvas player,
+so animating it costs the server nothing per frame.
+"""
+import json
+from typing import Dict, List, Optional, Tuple, Union
+
+from utils.trace import DeltaTrace
+
+
+def compact_op(op: Optional[Tuple], reset: Optional[List] = None) -> Union[int, List]:
+    """One frame's op in the compact JSON form used by the player and the trace server."""
+    if reset is not None:
+        return ["k", list(reset)]
+    if op is not None and op[0] == "swap":
+        return ["s", op[1], op[2]]
+    if op is not None and op[0] == "set":
+        return ["w", op[1], op[2]]
+    return 0
+
+
+def trace_payload(trace: DeltaTrace) -> Dict:
+    """Compact, JSON-ready form of a trace.
+
+    ``ops`` holds one entry per frame: ``0`` for frames that do not change the
+    state, ``["s", i, j]`` for swaps, ``["w", i, v]`` for writes and
+    ``["k", state]`` where the state was replaced wholesale.
+    """
+    initial: List = []
+    ops: List = []
+    highlights: List = []
+    infos: List[str] = []
+    ymax = 0
+    for i, (op, reset, highlight, info) in enumerate(trace.deltas()):
+        if i == 0:
+            initial = list(reset)
+            ops.append(0)
+        else:
+            ops.append(compact_op(op, reset))
+        if reset is not None and reset:
+            ymax = max(ymax, max(reset))
+        elif op is not None and op[0] == "set":
+            ymax = max(ymax, op[2])
+        highlights.append(list(highlight) if isinstance(highlight, (list, tuple)) else [highlight])
+        infos.append(info)
+    return {"initial": initial, "ops": ops, "highlight": highlights, "info": infos, "ymax": ymax}
+
+
+def render_player_html(trace: DeltaTrace, bar_color="#4C78A8", highlight_color="#EE994F",
+                       fps: float = 2.0, speed: float = 1, height: int = 460) -> str:
+    """Return a standalone HTML page that animates ``trace`` on a canvas.
+
+    ``fps`` is the frame rate at 1x; ``speed`` preselects the speed multiplier.
+    """
+    payload = json.dumps(trace_payload(trace), separators=(",", ":"))
+    config = json.dumps({"barColor": bar_color, "highlightColor": highlight_color,
+                         "fps": fps, "speed": speed, "height": height - 90})
+    return _PLAYER_TEMPLATE.replace("__TRACE__", payload).replace("__CONFIG__", config)
+
+
+_PLAYER_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><style>
+body { margin: 0; font-family: sans-serif; }
+#bar { display: flex; gap: 6px; align-items: center; margin: 6px 0; }
+#scrub { flex: 1; }
+#info { font-size: 14px; margin: 4px 0; min-height: 18px; }
+</style></head><body>
+<div id="info"></div>
+<canvas id="cv"></canvas>
+<div id="bar">
+  <button id="play">&#9654; Play</button>
+  <button id="step">&#9197; Step</button>
+  <button id="reset">&#8634; Reset</button>
+  <select id="speed">
+    <option value="0.25">0.25x</option><option value="0.5">0.5x</option>
+    <option value="1">1x</option><option value="2">2x</option>
+    <option value="4">4x</option><option value="8">8x</option><option value="16">16x</option>
+  </select>
+  <input id="scrub" type="range" min="0" value="0">
+  <span id="count"></span>
+</div>
+<script>
+const T = __TRACE__;
+const C = __CONFIG__;
+const N = T.ops.length, SNAP = 256;
+const snaps = new Map([[0, T.initial.slice()]]);
+let state = T.initial.slice(), idx = 0, playing = false, acc = 0, last = null;
+const cv = document.getElementById("cv"), ctx = cv.getContext("2d");
+const scrub = document.getElementById("scrub"), playBtn = document.getElementById("play");
+scrub.max = Math.max(N - 1, 0);
+document.getElementById("speed").value = String(C.speed);
+
+function apply(op) {
+  if (!op) return;
+  if (op[0] === "s") { const t = state[op[1]]; state[op[1]] = state[op[2]]; state[op[2]] = t; }
+  else if (op[0] === "w") { state[op[1]] = op[2]; }
+  else if (op[0] === "k") { state = op[1].slice(); }
+}
+
+function forward() {
+  idx += 1;
+  apply(T.ops[idx]);
+  if (idx % SNAP === 0 && !snaps.has(idx)) snaps.set(idx, state.slice());
+}
+
+function seek(target) {
+  target = Math.max(0, Math.min(N - 1, target));
+  if (target < idx) {
+    let base = Math.floor(target / SNAP) * SNAP;
+    while (!snaps.has(base)) base -= SNAP;
+    idx = base;
+    state = snaps.get(base).slice();
+  }
+  while (idx < target) forward();
+}
+
+function draw() {
+  const w = cv.width = cv.clientWidth || document.body.clientWidth;
+  const h = cv.height = C.height;
+  ctx.clearRect(0, 0, w, h);
+  const n = state.length, ymax = (T.ymax || 1) * 1.1;
+  const hl = new Set(T.highlight[idx] || []);
+  const bw = w / Math.max(n, 1), labels = n <= 50;
+  ctx.font = "10px sans-serif";
+  ctx.textAlign = "center";
+  for (let i = 0; i < n; i++) {
+    const bh = (state[i] / ymax) * (h - 16);
+    ctx.fillStyle = hl.has(i) ? C.highlightColor : C.barColor;
+    ctx.fillRect(i * bw + bw * 0.1, h - bh, Math.max(bw * 0.8, 1), bh);
+    if (labels) { ctx.fillStyle = "#222"; ctx.fillText(String(state[i]), i * bw + bw / 2, h - bh - 3); }
+  }
+  document.getElementById("info").textContent = T.info[idx] || "";
+  document.getElementById("count").textContent = (idx + 1) + "/" + N;
+  scrub.value = idx;
+  playBtn.innerHTML = playing ? "&#9208; Pause" : "&#9654; Play";
+}
+
+function tick(now) {
+  if (playing) {
+    if (last !== null) acc += (now - last) / 1000 * C.fps * parseFloat(document.getElementById("speed").value);
+    last = now;
+    const due = Math.floor(acc);
+    if (due > 0) {
+      // Drop intermediate frames when behind; only the latest one is drawn
+      acc -= due;
+      seek(idx + due);
+      if (idx >= N - 1) playing = false;
+      draw();
+    }
+  }
+  requestAnimationFrame(tick);
+}
+
+playBtn.onclick = () => {
+  if (!playing && idx >= N - 1) seek(0);
+  playing = !playing; acc = 0; last = null; draw();
+};
+document.getElementById("step").onclick = () => { playing = false; seek(idx + 1); draw(); };
+document.getElementById("reset").onclick = () => { playing = false; seek(0); draw(); };
+scrub.oninput = () => { seek(parseInt(scrub.value, 10)); draw(); };
+window.onresize = draw;
+draw();
+requestAnimationFrame(tick);
+</script></body></html>
+"""
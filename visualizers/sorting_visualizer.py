@@ -1,20 +1,237 @@
-"""Simple sorting visualizer that consumes sorting generators."""
+"""Desktop sorting visualizer that consumes sorting generators.
+
+Bars are created once and animated with blitting: each frame restores the
+cached background only under the bars whose height or colour changed (and
+under the title), redraws those artists and blits just those regions, so
+the cost of a frame does not grow with the number of bars.
+
+``fps`` caps how often the screen is updated; frames that arrive before the
+next display slot are skipped, so a generator that outruns the display is
+never throttled to the display rate. ``speed`` paces the run at that many
+algorithm steps per second instead of as fast as the generator goes.
+``headless=True`` renders off screen and just reports throughput.
+
+Command line (from the repository root)::
+
+    python -m visualizers.sorting_visualizer "Bubble Sort" --random 200 --speed 2000
+    python -m visualizers.sorting_visualizer "Bubble Sort" --random 200 --headless --fps 0
+"""
+import argparse
+import sys
+from time import perf_counter, sleep
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 import matplotlib.pyplot as plt
-from typing import Callable, List
-from utils.draw_helpers import draw_state
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox
+
+from utils.frame import frame_fields
+
+DEFAULT_FPS = 30.0
+# Pixels restored around a bar to cover its antialiased edge
+BLIT_PAD = 1.0
+
+
+class BlitRenderer:
+    """Bar chart that redraws only the bars (and title) that changed."""
+
+    def __init__(self, state: List[int], bar_color="C0", highlight_color="C1", headless: bool = False,
+                 figsize=(9, 4)):
+        self.headless = headless
+        if headless:
+            self.fig = Figure(figsize=figsize)
+            FigureCanvasAgg(self.fig)
+        else:
+            self.fig = plt.figure(figsize=figsize)
+        self.ax = ax = self.fig.add_subplot()
+        self.bar_color = bar_color
+        self.highlight_color = highlight_color
+        self.heights = np.array(state, dtype=float)
+        n = len(self.heights)
+        self.bars = ax.bar(range(n), self.heights, color=bar_color, animated=True, antialiased=False)
+        ax.set_xlim(-0.5, max(n - 0.5, 0.5))
+        low = min(0.0, float(self.heights.min())) if n else 0.0
+        high = float(self.heights.max()) if n else 1.0
+        ax.set_ylim(low * 1.1, max(high, 1.0) * 1.1)
+        ax.set_xlabel('Index')
+        ax.set_ylabel('Value')
+        self.title = ax.set_title("", animated=True)
+        self.highlighted = set()
+        self._background = None
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+        if not headless:
+            plt.show(block=False)
+        self.fig.canvas.draw()
+
+    def _on_draw(self, event=None) -> None:
+        """Full redraw (first draw or window resize): snapshot the background and
+        recompute where each bar lands in pixels."""
+        canvas = self.fig.canvas
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+        n = len(self.bars)
+        if n:
+            x = np.arange(n)
+            width = self.bars[0].get_width()
+            to_px = self.ax.transData.transform
+            self._left_px = to_px(np.column_stack([x - width / 2, np.zeros(n)]))[:, 0]
+            self._right_px = to_px(np.column_stack([x + width / 2, np.zeros(n)]))[:, 0]
+        axes_box = self.ax.bbox
+        self._column_y = (axes_box.y0, axes_box.y1)
+        self._title_box = Bbox.from_extents(self.fig.bbox.x0, axes_box.y1, self.fig.bbox.x1, self.fig.bbox.y1)
+        for bar in self.bars:
+            self.ax.draw_artist(bar)
+        self.ax.draw_artist(self.title)
+        canvas.blit(self.fig.bbox)
+
+    def _restore(self, box: Bbox) -> None:
+        """Paint the cached background back over ``box`` (display coordinates)."""
+        # Agg addresses saved regions with the origin at the top left
+        height = self.fig.bbox.height
+        x0, y0 = int(np.floor(box.x0)), int(np.floor(height - box.y1))
+        x1, y1 = int(np.ceil(box.x1)), int(np.ceil(height - box.y0))
+        self.fig.canvas.restore_region(self._background, bbox=(x0, y0, x1, y1), xy=(0, 0))
+
+    def _dirty_spans(self, indices: Iterable[int]) -> List[Tuple[float, float]]:
+        """Merged pixel spans (padded by BLIT_PAD) covering the given bars."""
+        spans = sorted((self._left_px[i] - BLIT_PAD, self._right_px[i] + BLIT_PAD) for i in indices)
+        merged = [list(spans[0])]
+        for left, right in spans[1:]:
+            if left <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], right)
+            else:
+                merged.append([left, right])
+        return [(left, right) for left, right in merged]
+
+    def update(self, state, highlight=(), info: str = "") -> int:
+        """Show one frame; returns how many bars were redrawn."""
+        new = np.asarray(state, dtype=float)
+        changed = set(np.flatnonzero(new != self.heights).tolist()) if len(new) == len(self.heights) else set()
+        if not isinstance(highlight, (list, tuple)):
+            highlight = [highlight]
+        lit = {i for i in highlight if isinstance(i, (int, np.integer)) and 0 <= i < len(self.bars)}
+        recolor = lit ^ self.highlighted
+        for i in changed:
+            self.bars[i].set_height(new[i])
+        for i in recolor:
+            self.bars[i].set_facecolor(self.highlight_color if i in lit else self.bar_color)
+        self.heights = new
+        self.highlighted = lit
+
+        canvas = self.fig.canvas
+        redrawn = 0
+        dirty = changed | recolor
+        if dirty:
+            y0, y1 = self._column_y
+            for left, right in self._dirty_spans(dirty):
+                box = Bbox.from_extents(left, y0, right, y1)
+                self._restore(box)
+                # Neighbours reaching into the span are redrawn whole; bars are
+                # not antialiased, so painting one twice leaves it unchanged
+                first = int(np.searchsorted(self._right_px, left - BLIT_PAD, side="left"))
+                last = int(np.searchsorted(self._left_px, right + BLIT_PAD, side="right"))
+                for bar in self.bars[first:last]:
+                    self.ax.draw_artist(bar)
+                redrawn += last - first
+                canvas.blit(box)
+        if info != self.title.get_text():
+            self.title.set_text(info)
+            self._restore(self._title_box)
+            self.ax.draw_artist(self.title)
+            canvas.blit(self._title_box)
+        if not self.headless:
+            canvas.flush_events()
+        return redrawn
+
+    def image(self) -> np.ndarray:
+        """The current canvas as an RGBA array (headless use and tests)."""
+        return np.asarray(self.fig.canvas.buffer_rgba()).copy()
+
+
+def visualize_sort(gen, initial_state: List[int], fps: Optional[float] = DEFAULT_FPS,
+                   speed: Optional[float] = None, headless: bool = False,
+                   renderer: Optional[BlitRenderer] = None) -> Dict[str, float]:
+    """Animate a sorting generator; returns frame, draw and drop counts plus achieved FPS.
+
+    ``fps`` caps display updates (None or 0: draw every frame); ``speed``
+    paces the run at that many frames per second (None: as fast as the
+    generator). A frame is skipped when the display slot is not due yet, or
+    when the next frame is already due under ``speed``; the final frame is
+    always shown.
+    """
+    renderer = renderer or BlitRenderer(initial_state, headless=headless)
+    interval = 1.0 / fps if fps else 0.0
+    start = next_draw = perf_counter()
+    frames = drawn = 0
+    last = None
+    for k, frame in enumerate(gen):
+        frames += 1
+        if speed:
+            wait = start + k / speed - perf_counter()
+            if wait > 0:
+                plt.pause(wait) if not headless else sleep(wait)
+        now = perf_counter()
+        behind = speed and start + (k + 1) / speed <= now
+        if now < next_draw or behind:
+            last = frame
+            continue
+        renderer.update(*frame_fields(frame))
+        drawn += 1
+        last = None
+        next_draw = max(next_draw + interval, now)
+    if last is not None:
+        renderer.update(*frame_fields(last))
+        drawn += 1
+    seconds = perf_counter() - start
+    stats = {
+        "frames": frames,
+        "drawn": drawn,
+        "dropped": frames - drawn,
+        "seconds": seconds,
+        "fps": drawn / seconds if seconds > 0 else 0.0,
+    }
+    if not headless:
+        plt.show()
+    return stats
+
+
+def visualize_trace_file(path: str, every: int = 1, fps: Optional[float] = DEFAULT_FPS,
+                         speed: Optional[float] = None, headless: bool = False) -> Dict[str, float]:
+    """Play back a trace file recorded with ``utils.trace_file``.
+
+    The file is memory-mapped, so multi-million-step traces replay without
+    being loaded; ``every`` draws only every k-th frame.
+    """
+    from utils.trace_file import TraceFile
+    with TraceFile(path) as trace:
+        return visualize_sort(trace.iter_range(step=max(1, every)), trace.state_at(0),
+                              fps=fps, speed=speed, headless=headless)
+
 
+def main(argv=None) -> int:
+    from utils.algo_interface import ALGOS
+    from utils.ingest import DISTRIBUTIONS, generate, parse_text
+    parser = argparse.ArgumentParser(description="Animate a sorting algorithm in a desktop window.")
+    parser.add_argument("algorithm", help=", ".join(ALGOS))
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--array", help="comma separated integers")
+    source.add_argument("--random", type=int, metavar="N", help="N generated integers (see --distribution)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="display updates per second (0: every frame)")
+    parser.add_argument("--speed", type=float, help="algorithm steps per second (default: as fast as possible)")
+    parser.add_argument("--headless", action="store_true", help="render off screen and report throughput")
+    args = parser.parse_args(argv)
 
-def visualize_sort(gen, initial_state: List[int]):
-    plt.ion()
-    fig = plt.figure()
-    for frame in gen:
-        draw_state(frame['state'], frame.get('highlight', ()), frame.get('info', ''))
-    plt.ioff()
-    plt.show()
+    if args.algorithm not in ALGOS:
+        parser.error(f"unknown algorithm {args.algorithm!r}")
+    arr = parse_text(args.array).tolist() if args.array else generate(args.distribution, args.random, args.seed).tolist()
+    stats = visualize_sort(ALGOS[args.algorithm](arr), arr, fps=args.fps, speed=args.speed, headless=args.headless)
+    print(f"{stats['frames']:,} frames, {stats['drawn']:,} drawn, {stats['dropped']:,} skipped "
+          f"in {stats['seconds']:.2f}s ({stats['fps']:.1f} drawn frames/s)")
+    return 0
 
 
 if __name__ == '__main__':
-    # Quick manual demo
-    from algorithms.bubble_sort import bubble_sort
-    arr = [5, 3, 6, 2, 4, 1]
-    visualize_sort(bubble_sort(arr), arr)
+    sys.exit(main())